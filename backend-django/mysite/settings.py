@@ -108,6 +108,22 @@ LOGOUT_REDIRECT_URL = f'{FRONTEND_URL}/'
 ACCOUNT_LOGOUT_REDIRECT_URL = f'{FRONTEND_URL}/'
 SOCIALACCOUNT_LOGIN_ON_GET = True
 
+# Application cache. The default in-process cache is per worker; point CACHE_BACKEND /
+# CACHE_LOCATION at a shared backend (e.g. django.core.cache.backends.redis.RedisCache)
+# so that invalidations reach every worker.
+CACHE_BACKEND = os.getenv('CACHE_BACKEND', 'django.core.cache.backends.locmem.LocMemCache')
+CACHES = {
+    'default': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': os.getenv('CACHE_LOCATION', 'polls'),
+    }
+}
+# Whether every worker sees the same cache entries (and their invalidations)
+SHARED_CACHE = CACHE_BACKEND not in (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+
 # Session configuration for OAuth
 SESSION_COOKIE_HTTPONLY = False  # Allow JavaScript access for client-side auth checks
 SESSION_COOKIE_SECURE = ENVIRONMENT == 'production'  # Secure cookies in production (HTTPS only)
@@ -116,7 +132,51 @@ SESSION_COOKIE_DOMAIN = None  # Use default domain
 
 # Additional session settings for cross-domain OAuth
 SESSION_COOKIE_PATH = '/'
-SESSION_SAVE_EVERY_REQUEST = True  # Save session on every request
+# With a SHARED_CACHE, sessions are read from the cache and written through to the
+# database; a per-worker cache would keep serving a session logged out on another worker
+SESSION_ENGINE = (
+    'django.contrib.sessions.backends.cached_db' if SHARED_CACHE else 'django.contrib.sessions.backends.db'
+)
+# Sessions are saved when they change; unchanged ones are refreshed (new expiry)
+# at most once per SESSION_REFRESH_INTERVAL seconds, see polls.middleware
+SESSION_SAVE_EVERY_REQUEST = False
+SESSION_REFRESH_INTERVAL = int(os.getenv('SESSION_REFRESH_INTERVAL', str(24 * 3600)))
+
+# Shared-cache policy for guest traffic on public read-only endpoints (see polls/caching.py)
+GUEST_CACHE_S_MAXAGE = int(os.getenv('GUEST_CACHE_S_MAXAGE', '30'))
+GUEST_CACHE_STALE_WHILE_REVALIDATE = int(os.getenv('GUEST_CACHE_STALE_WHILE_REVALIDATE', '60'))
+
+# Seconds a user's admin status is cached across requests (see polls.permissions); 0
+# resolves it once per request. Only on by default with a SHARED_CACHE: a per-worker
+# entry would let a revoked admin keep their access on the other workers until it expires
+ADMIN_STATUS_CACHE_TIMEOUT = int(os.getenv('ADMIN_STATUS_CACHE_TIMEOUT', '300' if SHARED_CACHE else '0'))
+# Upper bound for a user's cached user_info payload; it is also dropped when they change (see polls.user_info)
+USER_INFO_CACHE_TIMEOUT = int(os.getenv('USER_INFO_CACHE_TIMEOUT', '3600'))
+# Upper bound for the admin_stats snapshot; it is also dropped when questions or votes change
+ADMIN_STATS_CACHE_TIMEOUT = int(os.getenv('ADMIN_STATS_CACHE_TIMEOUT', '3600'))
+# Results summary: rebuilt at most this often (and after changes) ...
+RESULTS_SUMMARY_CACHE_TIMEOUT = int(os.getenv('RESULTS_SUMMARY_CACHE_TIMEOUT', '30'))
+# ... and served stale for up to this long while one worker rebuilds it
+RESULTS_SUMMARY_STALE_TIMEOUT = int(os.getenv('RESULTS_SUMMARY_STALE_TIMEOUT', '300'))
+
+# Vote history (polls.history): days kept at minute and hour resolution, and in total
+VOTE_HISTORY_MINUTE_RETENTION_DAYS = int(os.getenv('VOTE_HISTORY_MINUTE_RETENTION_DAYS', '2'))
+VOTE_HISTORY_HOUR_RETENTION_DAYS = int(os.getenv('VOTE_HISTORY_HOUR_RETENTION_DAYS', '90'))
+VOTE_HISTORY_DAY_RETENTION_DAYS = int(os.getenv('VOTE_HISTORY_DAY_RETENTION_DAYS', '1830'))
+
+# Seconds the cross-tab ballot matrix (polls.analytics) is kept in process memory, at most
+BALLOT_MATRIX_MAX_AGE = int(os.getenv('BALLOT_MATRIX_MAX_AGE', '300'))
+
+# Seconds a process trusts its cached poll status (open, or the frozen results of a closed poll, see polls.frozen)
+POLL_STATUS_CACHE_TIMEOUT = int(os.getenv('POLL_STATUS_CACHE_TIMEOUT', '60'))
+
+# Deletions reported to results summary clients polling with ?since= for this long
+RESULTS_TOMBSTONE_RETENTION_DAYS = int(os.getenv('RESULTS_TOMBSTONE_RETENTION_DAYS', '7'))
+
+# Live updates (polls.pubsub): the in-process broker only reaches viewers of the same process
+POLLS_PUBSUB_BACKEND = os.getenv('POLLS_PUBSUB_BACKEND', 'polls.pubsub.LocalBroker')
+# Seconds between keep-alive comments on an idle results stream
+RESULTS_STREAM_HEARTBEAT = int(os.getenv('RESULTS_STREAM_HEARTBEAT', '15'))
 
 # CSRF configuration for OAuth
 CSRF_COOKIE_HTTPONLY = False  # Allow JavaScript to read CSRF token
@@ -129,6 +189,8 @@ REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
         'rest_framework.authentication.SessionAuthentication',
     ],
+    # ?format= selects the file format of exports (csv/ndjson), not a DRF renderer
+    'URL_FORMAT_OVERRIDE': None,
 }
 
 # Exempt API endpoints from CSRF (they use authentication instead)
@@ -155,7 +217,7 @@ else:
 MIDDLEWARE = [
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'polls.middleware.GuestSessionMiddleware',  # SessionMiddleware that skips saves for shared-cacheable guest responses
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
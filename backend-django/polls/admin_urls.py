@@ -3,7 +3,16 @@ from . import views
 
 urlpatterns = [
     path("create/", views.admin_create_question, name="admin_create_question"),
+    path("create/bulk/", views.admin_create_questions_bulk, name="admin_create_questions_bulk"),
+    path("import/", views.admin_import_questions, name="admin_import_questions"),
+    path("export/", views.admin_export, name="admin_export"),
     path("", views.admin_dashboard, name="admin_dashboard"),
     path("summary/", views.admin_results_summary, name="summary"),
     path("questions/<int:pk>/", views.admin_question_detail, name="admin_question_detail"),
+    path("questions/batch/", views.admin_question_batch, name="admin_question_batch"),
+    path("questions/bulk/", views.admin_question_bulk, name="admin_question_bulk"),
+    path("voters/", views.admin_voter_counts, name="admin_voter_counts"),
+    path("vote-history/", views.admin_vote_history, name="admin_vote_history"),
+    path("analytics/crosstab/", views.admin_crosstab, name="admin_crosstab"),
+    path("analytics/segments/", views.admin_segment, name="admin_segment"),
 ]
\ No newline at end of file
@@ -0,0 +1,142 @@
+"""
+Cross-tab analytics over the ballots: "of those who chose Pizza, what share chose Dog?"
+
+All ballots are loaded once into a BallotMatrix: one column per question holding,
+for every voter, the position of their choice among the question's choices (-1 if
+they didn't answer). A contingency matrix of two questions is then a bincount over
+two columns, and all pairs of a set of questions are counted column block by block.
+
+The loaded matrix is kept in process memory, tagged with the catalog and vote
+versions (see polls.versioning): it is reloaded after the first request that sees
+a changed version, in whichever process serves it. Versions only reach the processes
+sharing the cache, so a matrix is also reloaded once older than BALLOT_MATRIX_MAX_AGE.
+"""
+import threading
+import time
+from itertools import chain
+
+import numpy as np
+from django.conf import settings
+
+from polls.models import Choice, UserVote
+from polls.versioning import CATALOG, VOTES, get_version
+
+NO_ANSWER = -1
+# Voters one-hot encoded at a time by all_crosstabs
+VOTER_CHUNK_SIZE = 4096
+
+
+class BallotMatrix:
+    def __init__(self, choices, ballots):
+        """
+        `choices`: (question_id, choice_id, choice_text) rows ordered by question and choice id.
+        `ballots`: (user_id, choice_id) rows.
+        """
+        self.choices = {}
+        for question_id, choice_id, choice_text in choices:
+            self.choices.setdefault(question_id, []).append({'id': choice_id, 'choice_text': choice_text})
+        self.question_index = {question_id: column for column, question_id in enumerate(self.choices)}
+
+        # Column and position within its question of every choice, by choice id
+        choice_ids = np.array([c['id'] for question in self.choices.values() for c in question], dtype=np.int64)
+        choice_columns = np.repeat(np.arange(len(self.choices)), [len(c) for c in self.choices.values()])
+        choice_positions = np.concatenate(
+            [np.arange(len(c)) for c in self.choices.values()] or [np.zeros(0, dtype=np.int64)]
+        )
+        order = np.argsort(choice_ids)
+        choice_ids, choice_columns, choice_positions = choice_ids[order], choice_columns[order], choice_positions[order]
+
+        ballots = np.fromiter(chain.from_iterable(ballots), dtype=np.int64).reshape(-1, 2)
+        user_ids, ballot_choice_ids = ballots[:, 0], ballots[:, 1]
+        voters, rows = np.unique(user_ids, return_inverse=True)
+        ballot_choices = np.minimum(np.searchsorted(choice_ids, ballot_choice_ids), max(len(choice_ids) - 1, 0))
+        # Ballots for choices created after the choices were read are left out
+        known = choice_ids[ballot_choices] == ballot_choice_ids if len(choice_ids) else ballot_choice_ids < 0
+        rows, ballot_choices = rows[known], ballot_choices[known]
+
+        self.voter_count = len(voters)
+        self.positions = np.full((self.voter_count, len(self.choices)), NO_ANSWER, dtype=np.int16)
+        self.positions[rows, choice_columns[ballot_choices]] = choice_positions[ballot_choices]
+
+    @classmethod
+    def load(cls):
+        choices = Choice.objects.order_by('question_id', 'id').values_list('question_id', 'id', 'choice_text')
+        return cls(list(choices), UserVote.objects.values_list('user_id', 'choice_id').iterator(chunk_size=10_000))
+
+    def crosstab(self, first_id, second_id):
+        """Contingency matrix of two questions: counts[i][j] = voters who chose both i and j."""
+        first, second = self.positions[:, self.question_index[first_id]], self.positions[:, self.question_index[second_id]]
+        first_count, second_count = len(self.choices[first_id]), len(self.choices[second_id])
+        answered = (first >= 0) & (second >= 0)
+        cells = first[answered].astype(np.int64) * second_count + second[answered]
+        return np.bincount(cells, minlength=first_count * second_count).reshape(first_count, second_count)
+
+    def all_crosstabs(self, question_ids, chunk_size=VOTER_CHUNK_SIZE):
+        """Yields (first_id, second_id, counts) for every pair of the questions, in the given order."""
+        columns = [self.question_index[question_id] for question_id in question_ids]
+        sizes = [len(self.choices[question_id]) for question_id in question_ids]
+        offsets = np.concatenate([[0], np.cumsum(sizes)]).astype(np.int64)
+        # Every contingency matrix at once: the co-occurrence matrix of all the choices,
+        # accumulated as (one-hot ballots).T @ (one-hot ballots) over chunks of voters.
+        # float32 counts are exact up to 2**24 voters.
+        cooccurrences = np.zeros((offsets[-1], offsets[-1]), dtype=np.float32)
+        for start in range(0, self.voter_count, chunk_size):
+            positions = self.positions[start:start + chunk_size, columns].astype(np.int64)
+            voters, questions = np.nonzero(positions >= 0)
+            one_hot = np.zeros((positions.shape[0], offsets[-1]), dtype=np.float32)
+            one_hot[voters, offsets[questions] + positions[voters, questions]] = 1
+            cooccurrences += one_hot.T @ one_hot
+        counts = cooccurrences.astype(np.int64)
+        for i, j in zip(*np.triu_indices(len(question_ids), k=1)):
+            yield question_ids[i], question_ids[j], counts[offsets[i]:offsets[i + 1], offsets[j]:offsets[j + 1]]
+
+
+# (versions, loaded_at, BallotMatrix)
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def _current_matrix(versions):
+    with _matrix_lock:
+        current = _matrix
+    if current is None:
+        return None
+    matrix_versions, loaded_at, matrix = current
+    if matrix_versions != versions or time.monotonic() - loaded_at >= settings.BALLOT_MATRIX_MAX_AGE:
+        return None
+    return matrix
+
+
+def get_ballot_matrix():
+    """
+    The BallotMatrix of the current catalog and vote versions, loaded at most once per
+    version and BALLOT_MATRIX_MAX_AGE seconds. Loads run outside the lock, so other
+    threads keep reading the matrix they have meanwhile.
+    """
+    global _matrix
+    versions = (get_version(CATALOG), get_version(VOTES))
+    matrix = _current_matrix(versions)
+    if matrix is not None:
+        return matrix
+
+    loaded_at = time.monotonic()
+    matrix = BallotMatrix.load()
+    with _matrix_lock:
+        # A concurrent load that started later holds data at least as recent: keep it
+        if _matrix is None or _matrix[1] <= loaded_at:
+            _matrix = (versions, loaded_at, matrix)
+    return matrix
+
+
+def describe_crosstab(first_id, second_id, counts):
+    """Response payload of one contingency matrix, with each row as shares of its choice's voters."""
+    row_totals = counts.sum(axis=1, keepdims=True)
+    row_percentages = np.divide(counts, row_totals, out=np.zeros(counts.shape), where=row_totals > 0) * 100
+    return {
+        'q1': first_id,
+        'q2': second_id,
+        'respondents': int(counts.sum()),
+        'counts': counts.tolist(),
+        'row_percentages': row_percentages.round(2).tolist(),
+    }
+
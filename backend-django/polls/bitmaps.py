@@ -0,0 +1,123 @@
+"""
+Bitmap index of voters per choice, for segment queries ("voters who chose X and Y",
+"voters who skipped question Q").
+
+A bitmap is a Python int with bit N set when user N chose the choice, stored in
+ChoiceVoterBitmap rows zlib-compressed (runs of absent voters compress to almost
+nothing). Segments are then intersections, unions and differences of ints, and
+counting them is int.bit_count(): no join over UserVote.
+
+Setting or clearing a voter's bit is idempotent, so the vote path applies its
+changes to the bitmaps (built from the ballots first when missing) under row locks.
+"""
+import zlib
+
+from django.db import transaction
+from django.utils import timezone
+
+from polls.models import Choice, ChoiceVoterBitmap, UserVote
+
+
+def encode_bitmap(bits):
+    return zlib.compress(bits.to_bytes((bits.bit_length() + 7) // 8, 'little'))
+
+
+def decode_bitmap(data):
+    return int.from_bytes(zlib.decompress(data), 'little')
+
+
+def bitmap_of(user_ids):
+    bits = 0
+    for user_id in user_ids:
+        bits |= 1 << user_id
+    return bits
+
+
+def load_bitmaps(choice_ids):
+    """
+    Returns {choice_id: bitmap} for the given existing choices. Bitmaps that don't
+    exist yet are built from the recorded ballots once and stored.
+    """
+    choice_ids = set(choice_ids)
+    bitmaps = {
+        choice_id: decode_bitmap(bits)
+        for choice_id, bits in ChoiceVoterBitmap.objects.filter(choice_id__in=choice_ids).values_list('choice_id', 'bits')
+    }
+    missing = choice_ids - bitmaps.keys()
+    if missing:
+        voters = {}
+        for choice_id, user_id in UserVote.objects.filter(choice_id__in=missing).values_list('choice_id', 'user_id'):
+            voters.setdefault(choice_id, []).append(user_id)
+        rows = []
+        for choice_id, question_id in Choice.objects.filter(id__in=missing).values_list('id', 'question_id'):
+            bitmaps[choice_id] = bitmap_of(voters.get(choice_id, ()))
+            rows.append(ChoiceVoterBitmap(
+                choice_id=choice_id, question_id=question_id,
+                bits=encode_bitmap(bitmaps[choice_id]), voter_count=bitmaps[choice_id].bit_count(),
+            ))
+        ChoiceVoterBitmap.objects.bulk_create(rows, ignore_conflicts=True)
+    return bitmaps
+
+
+def update_bitmaps(added, removed):
+    """
+    Applies ballot changes to the bitmaps: `added` and `removed` are
+    {choice_id: iterable of user ids}. Rows are updated under a row lock, so
+    concurrent workers never lose each other's updates.
+    """
+    choice_ids = set(added) | set(removed)
+    if not choice_ids:
+        return
+    with transaction.atomic():
+        # Make sure every row exists before locking (built from ballots when new)
+        existing = set(ChoiceVoterBitmap.objects.filter(choice_id__in=choice_ids).values_list('choice_id', flat=True))
+        load_bitmaps(choice_ids - existing)
+        rows = list(ChoiceVoterBitmap.objects.select_for_update().filter(choice_id__in=choice_ids))
+        for row in rows:
+            bits = decode_bitmap(row.bits)
+            bits |= bitmap_of(added.get(row.choice_id, ()))
+            bits &= ~bitmap_of(removed.get(row.choice_id, ()))
+            row.bits = encode_bitmap(bits)
+            row.voter_count = bits.bit_count()
+            row.updated_at = timezone.now()
+        ChoiceVoterBitmap.objects.bulk_update(rows, ['bits', 'voter_count', 'updated_at'])
+
+
+def question_choice_ids(question_ids):
+    """{question_id: [choice ids]} of the given questions, in choice id order."""
+    choices = {question_id: [] for question_id in question_ids}
+    for question_id, choice_id in Choice.objects.filter(question_id__in=question_ids).order_by('id').values_list(
+        'question_id', 'id'
+    ):
+        choices[question_id].append(choice_id)
+    return choices
+
+
+def segment_bitmap(chose=(), answered=(), skipped=()):
+    """
+    Voters who chose every choice in `chose`, answered every question in `answered`
+    and none of the questions in `skipped` (among all voters, when that's the only criterion).
+    """
+    questions = question_choice_ids(set(answered) | set(skipped))
+    all_choice_ids = [] if chose or answered else list(Choice.objects.values_list('id', flat=True))
+    bitmaps = load_bitmaps(
+        set(chose) | {choice_id for choice_ids in questions.values() for choice_id in choice_ids} | set(all_choice_ids)
+    )
+
+    def voters_of(choice_ids):
+        bits = 0
+        for choice_id in choice_ids:
+            bits |= bitmaps.get(choice_id, 0)
+        return bits
+
+    if chose or answered:
+        criteria = [bitmaps.get(choice_id, 0) for choice_id in chose]
+        criteria += [voters_of(questions[question_id]) for question_id in answered]
+        segment = criteria[0]
+        for bits in criteria[1:]:
+            segment &= bits
+    else:
+        segment = voters_of(all_choice_ids)
+    for question_id in skipped:
+        segment &= ~voters_of(questions[question_id])
+    return segment
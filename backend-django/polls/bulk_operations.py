@@ -0,0 +1,116 @@
+"""
+Operations applied to many questions at once: delete, set pub_date, clear votes.
+
+Ids are processed in batches of BULK_OPERATION_BATCH_SIZE, one transaction per
+batch, with set-based statements: a batch costs a fixed handful of queries
+whatever its size, instead of one request (and a row-by-row cascade) per question.
+
+Rows referencing the questions or their choices are deleted first with set-based
+QuerySet.delete(), found from the models' relations, so a model that gets a foreign
+key to Question or Choice later is included. Choices and questions themselves are
+then deleted within versioning.batched_writes(): their per-row receivers would
+re-index and re-version once per row, so each batch sends catalog_changed /
+votes_changed instead, for the caches and the search index.
+"""
+from django.db import models, transaction
+
+from polls.history import record_vote_deltas
+from polls.hll import question_sketch_key
+from polls.models import Choice, ChoiceVoterBitmap, Question, UserVote, VoterSketch
+from polls.user_info import invalidate_user_info
+from polls.versioning import batched_writes, catalog_changed, votes_changed
+
+BULK_OPERATION_BATCH_SIZE = 500
+
+# Per-id outcomes
+DELETED = 'deleted'
+UPDATED = 'updated'
+VOTES_CLEARED = 'votes_cleared'
+NOT_FOUND = 'not_found'
+
+
+def dependent_relations():
+    """
+    (model, lookup to the question id) of every model referencing Question or Choice,
+    other than Choice itself; a model referencing both is reached through Question.
+    """
+    relations = {}
+    for relation in Question._meta.related_objects:
+        if relation.related_model is not Choice:
+            relations.setdefault(relation.related_model, (relation, relation.field.name))
+    for relation in Choice._meta.related_objects:
+        relations.setdefault(relation.related_model, (relation, f'{relation.field.name}__question'))
+    return [(model, relation, lookup) for model, (relation, lookup) in relations.items()]
+
+
+def _delete_dependents(question_ids):
+    for model, relation, lookup in dependent_relations():
+        rows = model._base_manager.filter(**{f'{lookup}__in': question_ids})
+        if relation.on_delete is models.SET_NULL:
+            rows.update(**{relation.field.name: None})
+        else:
+            rows.delete()
+
+
+def _delete_questions(question_ids):
+    # UserVote rows are deleted without per-row signals: drop the cached user_info of the voters
+    invalidate_user_info(UserVote.objects.filter(question_id__in=question_ids).values_list('user_id', flat=True).distinct())
+    _delete_dependents(question_ids)
+    VoterSketch.objects.filter(key__in=[question_sketch_key(question_id) for question_id in question_ids]).delete()
+    with batched_writes():
+        Choice.objects.filter(question_id__in=question_ids).delete()
+        Question.objects.filter(id__in=question_ids).delete()
+    # Drops the questions from the search index and the results, and bumps both cache versions
+    catalog_changed.send(sender=Question, question_ids=question_ids)
+    votes_changed.send(sender=Question)
+    return DELETED
+
+
+def _set_pub_date(question_ids, pub_date):
+    Question.objects.filter(id__in=question_ids).update(pub_date=pub_date)
+    catalog_changed.send(sender=Question, question_ids=question_ids)
+    return UPDATED
+
+
+def _clear_votes(question_ids):
+    # UserVote rows are deleted without per-row signals: drop the cached user_info of the voters
+    invalidate_user_info(UserVote.objects.filter(question_id__in=question_ids).values_list('user_id', flat=True).distinct())
+    UserVote.objects.filter(question_id__in=question_ids).delete()
+    # Rebuilt (empty) on next use
+    ChoiceVoterBitmap.objects.filter(question_id__in=question_ids).delete()
+    voted_choices = Choice.objects.filter(question_id__in=question_ids).exclude(votes=0)
+    # The cleared votes show up as a drop in the vote history
+    record_vote_deltas({
+        (question_id, choice_id): -votes
+        for question_id, choice_id, votes in voted_choices.values_list('question_id', 'id', 'votes')
+    })
+    voted_choices.update(votes=0)
+    catalog_changed.send(sender=Choice)
+    votes_changed.send(sender=Question, question_ids=question_ids)
+    return VOTES_CLEARED
+
+
+def apply_bulk_operation(operation, ids, pub_date=None, batch_size=BULK_OPERATION_BATCH_SIZE):
+    """
+    Applies an operation to the questions with the given ids.
+    Returns {id: outcome} in the order of the ids; unknown ids are NOT_FOUND.
+    A failing batch rolls back on its own; batches before it stay applied.
+    """
+    ids = list(dict.fromkeys(ids))
+    outcomes = {}
+    for start in range(0, len(ids), batch_size):
+        batch = ids[start:start + batch_size]
+        with transaction.atomic():
+            # Lock the batch's questions so concurrent edits can't interleave
+            found = list(Question.objects.select_for_update().filter(id__in=batch).values_list('id', flat=True))
+            if found:
+                if operation == 'delete':
+                    outcome = _delete_questions(found)
+                elif operation == 'set_pub_date':
+                    outcome = _set_pub_date(found, pub_date)
+                else:
+                    outcome = _clear_votes(found)
+                outcomes.update(dict.fromkeys(found, outcome))
+        for question_id in batch:
+            outcomes.setdefault(question_id, NOT_FOUND)
+    return {question_id: outcomes[question_id] for question_id in ids}
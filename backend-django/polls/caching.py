@@ -0,0 +1,132 @@
+import math
+import random
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.cache import patch_cache_control, patch_vary_headers
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def guest_cacheable(view_func):
+    """
+    Applies the shared-cache policy to a read-only DRF view.
+
+    Guest (anonymous) GET responses are identical for every visitor, so they are
+    marked `public` with `s-maxage` / `stale-while-revalidate` and the session is
+    left untouched (no Set-Cookie), letting a CDN or reverse proxy absorb them.
+    Authenticated responses depend on the user and stay `private`.
+    Both vary on Cookie so a shared cache never hands a guest copy to a logged-in user.
+
+    Must be placed below @api_view so that request.user reflects DRF authentication.
+    """
+    @wraps(view_func)
+    def wrapper(request, *args, **kwargs):
+        is_guest = not request.user.is_authenticated
+        if is_guest and request.method in ('GET', 'HEAD'):
+            # Read by polls.middleware.GuestSessionMiddleware
+            request._request.skip_session_save = True
+
+        response = view_func(request, *args, **kwargs)
+
+        if request.method not in ('GET', 'HEAD'):
+            return response
+
+        patch_vary_headers(response, ('Cookie',))
+        if is_guest and response.status_code in (status.HTTP_200_OK, status.HTTP_304_NOT_MODIFIED):
+            patch_cache_control(
+                response,
+                public=True,
+                max_age=0,
+                s_maxage=settings.GUEST_CACHE_S_MAXAGE,
+                stale_while_revalidate=settings.GUEST_CACHE_STALE_WHILE_REVALIDATE,
+            )
+        else:
+            patch_cache_control(response, private=True, max_age=0)
+        return response
+
+    return wrapper
+
+
+# How long a rebuild may hold the refresh lock before another worker may take over
+REFRESH_LOCK_TIMEOUT = 30
+# How long a request without any cached value waits for another worker's rebuild
+COLD_WAIT_TIMEOUT = 2.0
+COLD_WAIT_INTERVAL = 0.05
+
+
+def get_or_refresh(key, compute, timeout, stale_timeout, version=None, beta=1.0):
+    """
+    Returns the cached value of `key`, computing it with `compute()` at most once
+    at a time across workers (single flight).
+
+    An entry is fresh for `timeout` seconds and for as long as `version` doesn't change.
+    After that it is still served for up to `stale_timeout` seconds, while the one
+    worker that takes the refresh lock (cache.add) rebuilds it. Fresh entries are also
+    refreshed early with a probability that rises towards expiry, scaled by how long
+    the last rebuild took (XFetch), so entries rarely expire under load at all.
+    Only a request that finds no entry at all waits for a rebuild in progress.
+    """
+    entry = cache.get(key)
+    if entry is not None and entry['version'] == version:
+        # XFetch: -log(random) is exponentially distributed, mean 1
+        early_refresh = entry['compute_time'] * beta * -math.log(1.0 - random.random())
+        if time.time() + early_refresh < entry['expires_at']:
+            return entry['value']
+
+    lock_key = f'{key}:refresh-lock'
+    if cache.add(lock_key, True, REFRESH_LOCK_TIMEOUT):
+        try:
+            started = time.time()
+            value = compute()
+            finished = time.time()
+            cache.set(key, {
+                'value': value,
+                'version': version,
+                'expires_at': finished + timeout,
+                'compute_time': finished - started,
+            }, timeout + stale_timeout)
+            return value
+        finally:
+            cache.delete(lock_key)
+
+    if entry is not None:
+        # Another worker is rebuilding: serve the stale value meanwhile
+        return entry['value']
+
+    deadline = time.time() + COLD_WAIT_TIMEOUT
+    while time.time() < deadline:
+        time.sleep(COLD_WAIT_INTERVAL)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry['value']
+    # The rebuild is taking too long (or its worker died): compute without caching
+    return compute()
+
+
+# Cache lifetime of content-addressed responses: they never change
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+
+def frozen_response(request, data, etag):
+    """
+    A response served from frozen results (see polls.frozen), tagged with their
+    digest: a client or proxy revalidating a copy it holds gets a bodiless 304.
+    """
+    etag = f'"{etag}"'
+    if etag in [tag.strip() for tag in request.headers.get('If-None-Match', '').split(',')]:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(data, status=status.HTTP_200_OK)
+    response['ETag'] = etag
+    return response
+
+
+def immutable_response(data, digest):
+    """A response whose URL is content-addressed by `digest`: cacheable by anyone, forever."""
+    response = Response(data, status=status.HTTP_200_OK)
+    response['ETag'] = f'"{digest}"'
+    patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    return response
@@ -0,0 +1,247 @@
+"""
+Streaming export of poll data as CSV or NDJSON, optionally gzip-compressed.
+
+Each dataset is read with one ordered query iterated in chunks, and encoded rows
+are yielded in small batches, so memory use doesn't grow with the catalog or the
+number of ballots.
+
+Datasets:
+- results: one row per choice with its votes, percentage and question total
+  (choiceless questions get one row with empty choice columns).
+- ballots: one row per UserVote, joined with question and choice text.
+
+Very large ballot exports can be sharded by UserVote id range and encoded in a
+process pool (export_ballots_sharded), then stitched into one file.
+"""
+import csv
+import hashlib
+import io
+import json
+import os
+import shutil
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import groupby
+from operator import itemgetter
+
+from django.apps import apps
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils import timezone
+
+from polls.models import Question, UserVote
+
+EXPORT_CHUNK_SIZE = 2000
+ROWS_PER_WRITE = 500
+EXPORT_FORMATS = ('csv', 'ndjson')
+EXPORT_DATASETS = ('results', 'ballots')
+DEFAULT_SHARD_SIZE = 100_000
+MANIFEST_FILENAME = 'manifest.json'
+
+RESULTS_COLUMNS = (
+    'question_id', 'question_text', 'pub_date',
+    'choice_id', 'choice_text', 'votes', 'percentage', 'total_votes',
+)
+BALLOT_COLUMNS = (
+    'vote_id', 'user_id', 'question_id', 'question_text',
+    'choice_id', 'choice_text', 'voted_at',
+)
+DATASET_COLUMNS = {'results': RESULTS_COLUMNS, 'ballots': BALLOT_COLUMNS}
+CONTENT_TYPES = {'csv': 'text/csv', 'ndjson': 'application/x-ndjson'}
+
+
+def iter_results_rows(chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields RESULTS_COLUMNS tuples from a single LEFT JOIN of questions and choices,
+    ordered by question. Only one question's choices are buffered at a time,
+    to compute its total and percentages.
+    """
+    rows = Question.objects.order_by('pub_date', 'id', 'choice__id').values_list(
+        'id', 'question_text', 'pub_date', 'choice__id', 'choice__choice_text', 'choice__votes'
+    ).iterator(chunk_size=chunk_size)
+
+    for _question_id, question_rows in groupby(rows, key=itemgetter(0)):
+        question_rows = list(question_rows)
+        total_votes = sum(row[5] or 0 for row in question_rows)
+        for question_id, question_text, pub_date, choice_id, choice_text, votes in question_rows:
+            if choice_id is None:
+                percentage = None
+            else:
+                percentage = round(votes / total_votes * 100, 2) if total_votes > 0 else 0.0
+            yield (question_id, question_text, pub_date, choice_id, choice_text, votes, percentage, total_votes)
+
+
+def iter_ballot_rows(start_id=None, end_id=None, chunk_size=EXPORT_CHUNK_SIZE):
+    """
+    Yields BALLOT_COLUMNS tuples ordered by vote id, optionally limited to the
+    id range [start_id, end_id).
+    """
+    votes = UserVote.objects.order_by('id')
+    if start_id is not None:
+        votes = votes.filter(id__gte=start_id)
+    if end_id is not None:
+        votes = votes.filter(id__lt=end_id)
+    yield from votes.values_list(
+        'id', 'user_id', 'question_id', 'question__question_text',
+        'choice_id', 'choice__choice_text', 'voted_at'
+    ).iterator(chunk_size=chunk_size)
+
+
+def iter_dataset_rows(dataset):
+    return iter_results_rows() if dataset == 'results' else iter_ballot_rows()
+
+
+def encode_rows(rows, columns, export_format, include_header=True):
+    """Encodes row tuples as CSV or NDJSON text, yielded every ROWS_PER_WRITE rows."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer) if export_format == 'csv' else None
+    if writer and include_header:
+        writer.writerow(columns)
+
+    for count, row in enumerate(rows, start=1):
+        if writer:
+            writer.writerow(value.isoformat() if hasattr(value, 'isoformat') else value for value in row)
+        else:
+            buffer.write(json.dumps(dict(zip(columns, row)), cls=DjangoJSONEncoder))
+            buffer.write('\n')
+        if count % ROWS_PER_WRITE == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
+def gzip_chunks(text_chunks):
+    """Compresses a stream of text chunks into a gzip stream without buffering it."""
+    compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16)
+    for chunk in text_chunks:
+        compressed = compressor.compress(chunk.encode('utf-8'))
+        if compressed:
+            yield compressed
+    yield compressor.flush()
+
+
+def stream_export(dataset, export_format, compress=False):
+    """Yields the encoded (and optionally gzipped) bytes of a dataset export."""
+    text_chunks = encode_rows(iter_dataset_rows(dataset), DATASET_COLUMNS[dataset], export_format)
+    if compress:
+        return gzip_chunks(text_chunks)
+    return (chunk.encode('utf-8') for chunk in text_chunks)
+
+
+def export_filename(dataset, export_format, compress=False):
+    extension = 'csv' if export_format == 'csv' else 'ndjson'
+    return f"poll-{dataset}.{extension}{'.gz' if compress else ''}"
+
+
+# --- Sharded ballot export ---
+
+def plan_ballot_shards(shard_size=DEFAULT_SHARD_SIZE):
+    """Splits the UserVote id space into [start_id, end_id) ranges of shard_size ids."""
+    bounds = UserVote.objects.aggregate(min_id=Min('id'), max_id=Max('id'))
+    if bounds['min_id'] is None:
+        return []
+    return [
+        (start_id, min(start_id + shard_size, bounds['max_id'] + 1))
+        for start_id in range(bounds['min_id'], bounds['max_id'] + 1, shard_size)
+    ]
+
+
+def _init_export_worker():
+    """Process pool initializer: make sure Django is set up in spawned workers."""
+    if not apps.ready:
+        import django
+        django.setup()
+
+
+def export_ballot_shard(shard):
+    """
+    Encodes one id range of ballots into its own part file.
+    Runs in a worker process, which opens its own database connection.
+    """
+    index, start_id, end_id, path, export_format, compress, include_header = shard
+    row_count = 0
+
+    def counted_rows():
+        nonlocal row_count
+        for row in iter_ballot_rows(start_id, end_id):
+            row_count += 1
+            yield row
+
+    text_chunks = encode_rows(counted_rows(), BALLOT_COLUMNS, export_format, include_header)
+    chunks = gzip_chunks(text_chunks) if compress else (chunk.encode('utf-8') for chunk in text_chunks)
+
+    digest = hashlib.sha256()
+    size = 0
+    with open(path, 'wb') as part_file:
+        for chunk in chunks:
+            part_file.write(chunk)
+            digest.update(chunk)
+            size += len(chunk)
+    connections.close_all()
+
+    return {
+        'index': index,
+        'file': os.path.basename(path),
+        'start_id': start_id,
+        'end_id': end_id,
+        'rows': row_count,
+        'bytes': size,
+        'sha256': digest.hexdigest(),
+    }
+
+
+def export_ballots_sharded(directory, export_format='csv', compress=False, workers=None,
+                           shard_size=DEFAULT_SHARD_SIZE, include_header=True):
+    """
+    Exports ballots into a directory of part files, one per id-range shard,
+    encoded in parallel by a process pool, and writes a manifest describing them.
+    With workers=1 the shards are encoded in this process.
+    Returns the manifest.
+    """
+    os.makedirs(directory, exist_ok=True)
+    extension = f"{'csv' if export_format == 'csv' else 'ndjson'}{'.gz' if compress else ''}"
+    shards = [
+        (index, start_id, end_id, os.path.join(directory, f'part-{index:05d}.{extension}'),
+         export_format, compress, include_header)
+        for index, (start_id, end_id) in enumerate(plan_ballot_shards(shard_size))
+    ]
+
+    if workers == 1 or len(shards) <= 1:
+        parts = [export_ballot_shard(shard) for shard in shards]
+    else:
+        # Workers must not inherit this process's open database connections
+        connections.close_all()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_export_worker) as executor:
+            parts = list(executor.map(export_ballot_shard, shards))
+
+    manifest = {
+        'dataset': 'ballots',
+        'format': export_format,
+        'compressed': compress,
+        'columns': list(BALLOT_COLUMNS),
+        'parts_have_header': include_header and export_format == 'csv',
+        'total_rows': sum(part['rows'] for part in parts),
+        'created_at': timezone.now().isoformat(),
+        'parts': parts,
+    }
+    with open(os.path.join(directory, MANIFEST_FILENAME), 'w') as manifest_file:
+        json.dump(manifest, manifest_file, indent=2)
+    return manifest
+
+
+def stitch_parts(directory, manifest, output_path):
+    """
+    Concatenates headerless part files into one output, in shard order.
+    Gzip members can be concatenated as-is, so compressed parts are not re-encoded.
+    """
+    with open(output_path, 'wb') as output:
+        if manifest['format'] == 'csv':
+            header = next(encode_rows([], BALLOT_COLUMNS, 'csv'))
+            output.write(b''.join(gzip_chunks([header])) if manifest['compressed'] else header.encode('utf-8'))
+        for part in manifest['parts']:
+            with open(os.path.join(directory, part['file']), 'rb') as part_file:
+                shutil.copyfileobj(part_file, output)
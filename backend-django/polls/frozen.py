@@ -0,0 +1,106 @@
+"""
+Frozen results: while the poll is closed, votes can't change, so the results are
+computed once into an immutable snapshot and served from it.
+
+The snapshot is stored in the cache under its content digest (sha256 of its JSON);
+a pointer entry holds the digest of the current snapshot, or OPEN while the poll is
+open. Reading it costs no database query. When the pointer is missing (never set,
+evicted, or discarded), the poll status is read once and the pointer rebuilt: the
+snapshot frozen again if the poll is closed, OPEN otherwise.
+
+The pointer is discarded when the poll is closed or reopened, and when questions,
+choices or votes change while it's frozen (an admin edit, or a vote that was
+already in flight when the poll closed), so the next read freezes the final state.
+Those discards only reach the processes sharing the cache, and a reader may re-add
+OPEN just after a closure: the pointer also expires after POLL_STATUS_CACHE_TIMEOUT,
+so every process re-reads the poll status (and re-freezes, to the same digest if
+nothing changed) at least that often.
+"""
+import hashlib
+import json
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+
+from polls.models import PollStatus
+
+POINTER_KEY = 'polls:frozen-results'
+OPEN = 'open'
+# Snapshots are stored again each time they are re-frozen; replaced ones expire after this long
+SNAPSHOT_TIMEOUT = 7 * 24 * 3600
+
+
+def snapshot_key(digest):
+    return f'polls:frozen-results:{digest}'
+
+
+def freeze(snapshot):
+    """Stores a snapshot under its digest and makes it the current one. Returns the digest."""
+    content = json.dumps(snapshot, cls=DjangoJSONEncoder, sort_keys=True)
+    digest = hashlib.sha256(content.encode()).hexdigest()
+    cache.set(snapshot_key(digest), snapshot, timeout=SNAPSHOT_TIMEOUT)
+    cache.set(POINTER_KEY, digest, timeout=settings.POLL_STATUS_CACHE_TIMEOUT)
+    return digest
+
+
+def mark_open():
+    """Records that the poll is open, sparing the next reads the poll status lookup."""
+    cache.set(POINTER_KEY, OPEN, timeout=settings.POLL_STATUS_CACHE_TIMEOUT)
+
+
+def get_frozen_results(build_snapshot):
+    """
+    Returns (digest, snapshot) while the poll is closed, None while it is open.
+    `build_snapshot()` computes the snapshot when it has to be frozen (again).
+    """
+    pointer = cache.get(POINTER_KEY)
+    if pointer == OPEN:
+        return None
+    snapshot = cache.get(snapshot_key(pointer)) if pointer is not None else None
+    if snapshot is not None:
+        return pointer, snapshot
+
+    if not PollStatus.is_poll_closed():
+        cache.add(POINTER_KEY, OPEN, timeout=settings.POLL_STATUS_CACHE_TIMEOUT)
+        return None
+    snapshot = build_snapshot()
+    return freeze(snapshot), snapshot
+
+
+def get_frozen_user_votes(digest, user_id, load_user_votes):
+    """A user's {question_id: choice_id} while the poll is frozen, read once per snapshot."""
+    key = f'{snapshot_key(digest)}:user-votes:{user_id}'
+    user_votes = cache.get(key)
+    if user_votes is None:
+        user_votes = load_user_votes()
+        cache.set(key, user_votes, timeout=SNAPSHOT_TIMEOUT)
+    return user_votes
+
+
+def get_snapshot(digest, build_snapshot):
+    """A snapshot by digest, if it is still the current one (see get_frozen_results)."""
+    frozen = get_frozen_results(build_snapshot)
+    if frozen is None or frozen[0] != digest:
+        return None
+    return frozen[1]
+
+
+def discard_frozen_results():
+    """
+    Forgets the current snapshot (if any), now and when the current transaction
+    commits, so it is frozen again from the committed state on next use.
+    """
+    def discard():
+        if cache.get(POINTER_KEY) != OPEN:
+            cache.delete(POINTER_KEY)
+
+    discard()
+    transaction.on_commit(discard)
+
+
+def reset_frozen_results():
+    """Forgets the poll status too: to be called when the poll is closed or reopened."""
+    cache.delete(POINTER_KEY)
+    transaction.on_commit(lambda: cache.delete(POINTER_KEY))
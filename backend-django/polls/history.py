@@ -0,0 +1,144 @@
+"""
+Vote history: the net change in each choice's votes over time, for charts.
+
+Ballots are replaced on every submission, so UserVote only tells who votes for
+what now. Each submission instead adds its per-choice vote changes to the current
+minute's VoteBucket rows. `manage.py compact_vote_history` (run periodically) rolls
+minute buckets older than VOTE_HISTORY_MINUTE_RETENTION_DAYS up into hour buckets,
+hour buckets older than VOTE_HISTORY_HOUR_RETENTION_DAYS into day buckets, and drops
+day buckets older than VOTE_HISTORY_DAY_RETENTION_DAYS, which keeps the table bounded:
+recent history is fine-grained and older history only exists at coarser resolutions.
+"""
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Sum
+from django.db.models.functions import Trunc
+from django.utils import timezone
+
+from polls.models import VoteBucket
+
+RESOLUTIONS = [VoteBucket.MINUTE, VoteBucket.HOUR, VoteBucket.DAY]
+RESOLUTION_LENGTHS = {
+    VoteBucket.MINUTE: timedelta(minutes=1),
+    VoteBucket.HOUR: timedelta(hours=1),
+    VoteBucket.DAY: timedelta(days=1),
+}
+
+
+def truncate(moment, resolution):
+    """Start of the bucket containing `moment`; days follow the current time zone."""
+    if resolution == VoteBucket.MINUTE:
+        return moment.replace(second=0, microsecond=0)
+    if resolution == VoteBucket.HOUR:
+        return moment.replace(minute=0, second=0, microsecond=0)
+    return timezone.localtime(moment).replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+def record_vote_deltas(deltas, at=None):
+    """
+    Adds {(question_id, choice_id): net vote change} to the minute buckets of `at`
+    (default: now). Zero changes are skipped. Costs one query, plus one per distinct change.
+    """
+    deltas = {key: delta for key, delta in deltas.items() if delta}
+    if not deltas:
+        return
+    bucket_start = truncate(at or timezone.now(), VoteBucket.MINUTE)
+    # Create the missing buckets, then increment them all in place (safe under concurrency)
+    VoteBucket.objects.bulk_create(
+        [
+            VoteBucket(question_id=question_id, choice_id=choice_id, resolution=VoteBucket.MINUTE,
+                       bucket_start=bucket_start, delta=0)
+            for question_id, choice_id in deltas
+        ],
+        ignore_conflicts=True
+    )
+    choice_ids_by_delta = defaultdict(list)
+    for (_question_id, choice_id), delta in deltas.items():
+        choice_ids_by_delta[delta].append(choice_id)
+    for delta, choice_ids in choice_ids_by_delta.items():
+        VoteBucket.objects.filter(
+            resolution=VoteBucket.MINUTE, bucket_start=bucket_start, choice_id__in=choice_ids
+        ).update(delta=F('delta') + delta)
+
+
+def _roll_up(source, target, cutoff):
+    # Moves the `source` buckets starting before `cutoff` into `target` buckets
+    old_buckets = VoteBucket.objects.filter(resolution=source, bucket_start__lt=cutoff)
+    sums = {
+        (row['choice_id'], row['start']): row
+        for row in old_buckets.annotate(start=Trunc('bucket_start', target))
+        .values('question_id', 'choice_id', 'start').annotate(total=Sum('delta'))
+    }
+    if not sums:
+        return 0
+
+    existing = VoteBucket.objects.select_for_update().filter(
+        resolution=target,
+        choice_id__in={choice_id for choice_id, _start in sums},
+        bucket_start__in={start for _choice_id, start in sums},
+    )
+    updated = []
+    for bucket in existing:
+        row = sums.pop((bucket.choice_id, bucket.bucket_start), None)
+        if row is not None:
+            bucket.delta += row['total']
+            updated.append(bucket)
+    VoteBucket.objects.bulk_update(updated, ['delta'], batch_size=1000)
+    VoteBucket.objects.bulk_create(
+        [
+            VoteBucket(question_id=row['question_id'], choice_id=row['choice_id'], resolution=target,
+                       bucket_start=row['start'], delta=row['total'])
+            for row in sums.values() if row['total']
+        ],
+        batch_size=1000
+    )
+    return old_buckets.delete()[0]
+
+
+def compact_vote_history(now=None):
+    """
+    Applies the retention policy. Returns the number of minute and hour buckets
+    rolled up and of day buckets dropped, by resolution.
+    """
+    now = now or timezone.now()
+    retention = {
+        VoteBucket.MINUTE: timedelta(days=settings.VOTE_HISTORY_MINUTE_RETENTION_DAYS),
+        VoteBucket.HOUR: timedelta(days=settings.VOTE_HISTORY_HOUR_RETENTION_DAYS),
+        VoteBucket.DAY: timedelta(days=settings.VOTE_HISTORY_DAY_RETENTION_DAYS),
+    }
+    compacted = {}
+    with transaction.atomic():
+        # Cutoffs fall on target bucket boundaries, so rolled-up buckets are complete
+        compacted[VoteBucket.MINUTE] = _roll_up(
+            VoteBucket.MINUTE, VoteBucket.HOUR, truncate(now - retention[VoteBucket.MINUTE], VoteBucket.HOUR)
+        )
+    with transaction.atomic():
+        compacted[VoteBucket.HOUR] = _roll_up(
+            VoteBucket.HOUR, VoteBucket.DAY, truncate(now - retention[VoteBucket.HOUR], VoteBucket.DAY)
+        )
+    compacted[VoteBucket.DAY] = VoteBucket.objects.filter(
+        resolution=VoteBucket.DAY, bucket_start__lt=now - retention[VoteBucket.DAY]
+    ).delete()[0]
+    return compacted
+
+
+def vote_history(question_ids, start, end, resolution):
+    """
+    Net vote changes of the questions' choices in [start, end), summed per `resolution`
+    bucket: {(question_id, choice_id): [(bucket_start, votes), ...]} in time order.
+    Buckets already rolled up to a coarser resolution keep their own start.
+    """
+    rows = (
+        VoteBucket.objects.filter(question_id__in=question_ids, bucket_start__gte=start, bucket_start__lt=end)
+        .annotate(start=Trunc('bucket_start', resolution))
+        .values('question_id', 'choice_id', 'start')
+        .annotate(votes=Sum('delta'))
+        .order_by('question_id', 'choice_id', 'start')
+    )
+    series = defaultdict(list)
+    for row in rows:
+        series[row['question_id'], row['choice_id']].append((row['start'], row['votes']))
+    return series
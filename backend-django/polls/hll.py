@@ -0,0 +1,154 @@
+"""
+HyperLogLog sketches for approximate distinct-voter counts.
+
+A sketch keeps 2**HLL_PRECISION one-byte registers (4 KiB, ~1.6% standard error)
+whatever the number of voters. Adding a voter is idempotent and two sketches
+merge by taking the register-wise maximum, so sketches updated by different
+workers, or for different questions or days, can be combined in any order.
+
+Sketches are stored in VoterSketch rows, zlib-compressed (a sparse sketch is a
+few dozen bytes), under keys built by the *_sketch_key helpers below. Each key is
+split into VOTER_SKETCH_SHARDS rows, a voter always going to the shard of their
+user id: a vote locks the rows of its voter's shard only, so concurrent votes
+rarely wait for each other, and a key's sketch is the merge of its shards.
+
+New ballots are added by vote() once their submission commits; reads never write.
+Ballots recorded before sketches existed are added by migration 0011, and
+`manage.py rebuild_voter_sketches` adds any ballot written outside vote().
+"""
+import hashlib
+import math
+import zlib
+
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from polls.models import UserVote, VoterSketch
+
+HLL_PRECISION = 12
+HLL_REGISTERS = 1 << HLL_PRECISION
+_HASH_BITS = 64
+_RANK_BITS = _HASH_BITS - HLL_PRECISION
+
+GLOBAL_SKETCH_KEY = 'global'
+VOTER_SKETCH_SHARDS = 16
+
+
+def question_sketch_key(question_id):
+    return f'question:{question_id}'
+
+
+def day_sketch_key(day):
+    return f'day:{day.isoformat()}'
+
+
+class HyperLogLog:
+    def __init__(self, registers=None):
+        self.registers = bytearray(registers) if registers is not None else bytearray(HLL_REGISTERS)
+
+    def add(self, value):
+        hashed = int.from_bytes(hashlib.blake2b(str(value).encode(), digest_size=8).digest(), 'big')
+        index = hashed >> _RANK_BITS
+        remainder = hashed & ((1 << _RANK_BITS) - 1)
+        # Position of the leftmost 1-bit in the remaining bits
+        rank = _RANK_BITS - remainder.bit_length() + 1
+        self.registers[index] = max(self.registers[index], rank)
+
+    def update(self, values):
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other):
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self):
+        m = HLL_REGISTERS
+        alpha = 0.7213 / (1 + 1.079 / m)
+        estimate = alpha * m * m / sum(2.0 ** -register for register in self.registers)
+        empty_registers = self.registers.count(0)
+        if estimate <= 2.5 * m and empty_registers:
+            # Linear counting is more accurate for small cardinalities
+            estimate = m * math.log(m / empty_registers)
+        return round(estimate)
+
+    def to_bytes(self):
+        return zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data):
+        return cls(zlib.decompress(data))
+
+
+def load_sketches(keys):
+    """Returns {key: HyperLogLog} for the given keys, merged from their shards (empty when none is stored)."""
+    sketches = {key: HyperLogLog() for key in keys}
+    for key, registers in VoterSketch.objects.filter(key__in=sketches.keys()).values_list('key', 'registers'):
+        sketches[key].merge(HyperLogLog.from_bytes(registers))
+    return sketches
+
+
+def merge_into_shards(sketches_by_row):
+    """
+    Merges sketches into stored shards: {(key, shard): HyperLogLog}.
+    Each row is read, merged and written back under a row lock, so concurrent
+    workers never lose each other's updates; rows are locked in a fixed order.
+    """
+    if not sketches_by_row:
+        return
+    with transaction.atomic():
+        VoterSketch.objects.bulk_create(
+            [VoterSketch(key=key, shard=shard, registers=HyperLogLog().to_bytes()) for key, shard in sketches_by_row],
+            ignore_conflicts=True
+        )
+        rows_filter = Q()
+        for key, shard in sketches_by_row:
+            rows_filter |= Q(key=key, shard=shard)
+        rows = list(VoterSketch.objects.select_for_update().filter(rows_filter).order_by('key', 'shard'))
+        for row in rows:
+            sketch = HyperLogLog.from_bytes(row.registers).merge(sketches_by_row[row.key, row.shard])
+            row.registers = sketch.to_bytes()
+            row.updated_at = timezone.now()
+        VoterSketch.objects.bulk_update(rows, ['registers', 'updated_at'])
+
+
+def record_voters(voters_by_key):
+    """Adds voters to sketches: {key: iterable of user ids}, each in the shard of its user id."""
+    sketches_by_row = {}
+    for key, user_ids in voters_by_key.items():
+        for user_id in user_ids:
+            sketches_by_row.setdefault((key, user_id % VOTER_SKETCH_SHARDS), HyperLogLog()).add(user_id)
+    merge_into_shards(sketches_by_row)
+
+
+def sketch_keys_of_ballot(question_id, voted_at):
+    return (GLOBAL_SKETCH_KEY, question_sketch_key(question_id), day_sketch_key(timezone.localdate(voted_at)))
+
+
+def record_ballots(ballots):
+    """Adds the voters of new UserVote rows to the global, per-question and per-day sketches."""
+    voters_by_key = {}
+    for ballot in ballots:
+        for key in sketch_keys_of_ballot(ballot.question_id, ballot.voted_at):
+            voters_by_key.setdefault(key, set()).add(ballot.user_id)
+    record_voters(voters_by_key)
+
+
+def build_sketches_from_ballots(chunk_size=10_000):
+    """{key: HyperLogLog} of every recorded ballot, for every sketch key, in one pass over the ballots."""
+    sketches = {GLOBAL_SKETCH_KEY: HyperLogLog()}
+    ballots = UserVote.objects.values_list('user_id', 'question_id', 'voted_at').iterator(chunk_size=chunk_size)
+    for user_id, question_id, voted_at in ballots:
+        for key in sketch_keys_of_ballot(question_id, voted_at):
+            sketches.setdefault(key, HyperLogLog()).add(user_id)
+    return sketches
+
+
+def estimate_voters(keys):
+    """Approximate number of distinct voters across the union of the given sketches."""
+    merged = HyperLogLog()
+    for sketch in load_sketches(keys).values():
+        merged.merge(sketch)
+    return merged.count()
@@ -0,0 +1,158 @@
+"""
+Streaming import of questions and choices from CSV or NDJSON.
+
+Input is read line by line, validated with NewQuestionSchema in chunks and written
+with Question.create_with_choices(), one transaction per chunk. Only the current
+chunk is held in memory, so very large files import with flat memory usage.
+A file that stops being readable part way (bad encoding, malformed CSV) keeps
+the chunks imported before that point; the report says where reading stopped.
+
+CSV columns: question_text, pub_date (optional, ISO 8601), choices (optional,
+separated by "|"). NDJSON: one NewQuestionSchema object per line.
+"""
+import csv
+import json
+from itertools import islice
+
+from pydantic import ValidationError
+
+from polls.models import Question
+from polls.schemas import NewQuestionSchema
+
+IMPORT_CHUNK_SIZE = 500
+MAX_REPORTED_ERRORS = 100
+IMPORT_FORMATS = ('csv', 'ndjson')
+CSV_CHOICE_SEPARATOR = '|'
+
+
+class ImportReport:
+    """Progress and per-row errors of an import. Only the first MAX_REPORTED_ERRORS errors are kept."""
+
+    def __init__(self):
+        self.processed = 0
+        self.created = 0
+        self.failed = 0
+        self.chunks = 0
+        self.errors = []
+        # {'line': first line not imported, 'error': ...} when the file could not be read to the end
+        self.read_error = None
+
+    def add_error(self, line, errors):
+        self.failed += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self):
+        return {
+            'processed': self.processed,
+            'created': self.created,
+            'failed': self.failed,
+            'chunks': self.chunks,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+            'complete': self.read_error is None,
+            'read_error': self.read_error,
+        }
+
+
+class CountedLines:
+    """Iterates over lines, counting those read so far."""
+
+    def __init__(self, lines):
+        self.lines = iter(lines)
+        self.count = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        line = next(self.lines)
+        self.count += 1
+        return line
+
+
+def detect_format(filename, requested_format=None):
+    """Returns 'csv' or 'ndjson' from an explicit format or the file extension, or None."""
+    if requested_format:
+        return requested_format if requested_format in IMPORT_FORMATS else None
+    extension = filename.rsplit('.', 1)[-1].lower() if '.' in filename else ''
+    if extension == 'csv':
+        return 'csv'
+    if extension in ('ndjson', 'jsonl'):
+        return 'ndjson'
+    return None
+
+
+def iter_csv_rows(lines):
+    """Yields (line, data, error) for each CSV record; data is shaped like NewQuestionSchema."""
+    reader = csv.DictReader(lines)
+    for record in reader:
+        data = {'question_text': (record.get('question_text') or '').strip() or None}
+        if record.get('pub_date'):
+            data['pub_date'] = record['pub_date']
+        data['choices'] = [
+            {'choice_text': choice_text.strip()}
+            for choice_text in (record.get('choices') or '').split(CSV_CHOICE_SEPARATOR)
+            if choice_text.strip()
+        ]
+        yield reader.line_num, data, None
+
+
+def iter_ndjson_rows(lines):
+    """Yields (line, data, error) for each non-blank NDJSON line."""
+    for line_number, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except json.JSONDecodeError as e:
+            yield line_number, None, f"Invalid JSON: {e.msg}"
+            continue
+        if not isinstance(data, dict):
+            yield line_number, None, "Each line must be a JSON object"
+            continue
+        yield line_number, data, None
+
+
+def import_questions(lines, import_format, chunk_size=IMPORT_CHUNK_SIZE, on_chunk=None):
+    """
+    Imports questions from an iterable of text lines.
+    Each chunk of valid rows is created in its own transaction, so a failing row
+    only affects itself. `on_chunk(report)` is called after every chunk.
+    Reading stops at the first undecodable line or malformed CSV record, after
+    importing the rows before it (see ImportReport.read_error).
+    """
+    lines = CountedLines(lines)
+    rows = iter_csv_rows(lines) if import_format == 'csv' else iter_ndjson_rows(lines)
+    report = ImportReport()
+
+    while report.read_error is None:
+        chunk = []
+        try:
+            chunk.extend(islice(rows, chunk_size))
+        except (UnicodeDecodeError, csv.Error) as e:
+            # A CSV error is raised once its line has been read, a decoding error before
+            failed_line = lines.count if isinstance(e, csv.Error) else lines.count + 1
+            report.read_error = {'line': failed_line, 'error': str(e)}
+        if not chunk:
+            break
+
+        valid_questions = []
+        for line, data, error in chunk:
+            report.processed += 1
+            if error:
+                report.add_error(line, [{'msg': error}])
+                continue
+            try:
+                valid_questions.append(NewQuestionSchema.model_validate(data))
+            except ValidationError as e:
+                report.add_error(line, e.errors(include_url=False, include_context=False, include_input=False))
+
+        if valid_questions:
+            Question.create_with_choices(valid_questions)
+            report.created += len(valid_questions)
+        report.chunks += 1
+        if on_chunk:
+            on_chunk(report)
+
+    return report
@@ -0,0 +1,78 @@
+"""
+Management command to compare the array-backed results computation (polls.results)
+with validating every question through ResultsSummarySchema.
+It fills a synthetic catalog inside a transaction that is rolled back afterwards,
+so it can be pointed at any database.
+"""
+import random
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from polls.models import Choice, Question
+from polls.results import build_results_summary, compute_results
+from polls.schemas import ResultsSummarySchema
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the results summary computation on a synthetic catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--questions', type=int, default=10_000, help='Synthetic questions to create')
+        parser.add_argument('--choices', type=int, default=10, help='Choices per question')
+        parser.add_argument('--repeat', type=int, default=3, help='Runs per method; the best one is reported')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['questions'], options['choices'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, question_count, choice_count, repeat):
+        now = timezone.now()
+        questions = Question.objects.bulk_create(
+            [Question(question_text=f'Benchmark question {i}', pub_date=now) for i in range(question_count)],
+            batch_size=1000
+        )
+        Choice.objects.bulk_create(
+            [
+                Choice(question=question, choice_text=f'Choice {i}', votes=random.randint(0, 1000))
+                for question in questions for i in range(choice_count)
+            ],
+            batch_size=1000
+        )
+        question_ids = [question.id for question in questions]
+
+        def schema_summary():
+            questions = Question.objects.filter(id__in=question_ids).order_by('id').prefetch_related('choice_set')
+            return ResultsSummarySchema.model_validate(list(questions)).model_dump()
+
+        def array_summary():
+            results = compute_results(question_ids)
+            return build_results_summary(results[question_id] for question_id in sorted(results))
+
+        timings = {}
+        for name, method in (('schema', schema_summary), ('arrays', array_summary)):
+            best = float('inf')
+            for _ in range(repeat):
+                started = time.perf_counter()
+                summary = method()
+                best = min(best, time.perf_counter() - started)
+            timings[name] = best
+            self.stdout.write(
+                f"{name:>7}: {best:.3f}s for {summary['total_questions']} questions, "
+                f"{summary['total_votes_all_questions']} votes"
+            )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{question_count} questions x {choice_count} choices: "
+            f"{timings['schema'] / timings['arrays']:.1f}x faster with arrays"
+        ))
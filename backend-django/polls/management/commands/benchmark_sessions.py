@@ -0,0 +1,74 @@
+"""
+Management command to count the database queries the session of a logged-in user costs
+per request, with sessions saved on every request from the database (the former
+configuration) and with the current configuration (see polls.middleware).
+It runs inside a transaction that is rolled back afterwards.
+"""
+from django.conf import settings
+from django.contrib.auth import SESSION_KEY
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from polls.middleware import GuestSessionMiddleware
+
+
+class Rollback(Exception):
+    pass
+
+
+def get_response(request):
+    # Like AuthenticationMiddleware, read who is logged in
+    request.session.get(SESSION_KEY)
+    return HttpResponse()
+
+
+class Command(BaseCommand):
+    help = 'Benchmark the database reads and writes of sessions per request'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=1000, help='Requests to simulate per configuration')
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self.run(options['requests'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def run(self, request_count):
+        configurations = [
+            ('every request', {
+                'SESSION_ENGINE': 'django.contrib.sessions.backends.db', 'SESSION_SAVE_EVERY_REQUEST': True
+            }),
+            ('current', {
+                'SESSION_ENGINE': settings.SESSION_ENGINE, 'SESSION_SAVE_EVERY_REQUEST': settings.SESSION_SAVE_EVERY_REQUEST
+            }),
+        ]
+        factory = RequestFactory()
+        writes = {}
+        for name, overrides in configurations:
+            with override_settings(**overrides):
+                middleware = GuestSessionMiddleware(get_response)
+                session = middleware.SessionStore()
+                session[SESSION_KEY] = '1'
+                session.save()
+                factory.cookies[settings.SESSION_COOKIE_NAME] = session.session_key
+
+                with CaptureQueriesContext(connection) as queries:
+                    for _ in range(request_count):
+                        middleware(factory.get('/polls/'))
+                statements = [query['sql'].lstrip().split(None, 1)[0].upper() for query in queries]
+                reads = statements.count('SELECT')
+                writes[name] = sum(statement in ('INSERT', 'UPDATE', 'DELETE') for statement in statements)
+                self.stdout.write(
+                    f"{name:>13}: {reads / request_count:.3f} reads, "
+                    f"{writes[name] / request_count:.3f} writes per request"
+                )
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{request_count} requests: {writes['every request'] - writes['current']} fewer session writes"
+        ))
@@ -0,0 +1,19 @@
+"""
+Management command to apply the vote history retention policy (see polls.history):
+rolls minute buckets up into hours and hours into days, and drops expired days.
+Meant to run periodically, e.g. hourly from cron.
+"""
+from django.core.management.base import BaseCommand
+
+from polls.history import compact_vote_history
+
+
+class Command(BaseCommand):
+    help = 'Roll up and expire old vote history buckets'
+
+    def handle(self, *args, **options):
+        compacted = compact_vote_history()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rolled up {compacted['minute']} minute and {compacted['hour']} hour buckets, "
+            f"dropped {compacted['day']} day buckets"
+        ))
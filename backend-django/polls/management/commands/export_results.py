@@ -0,0 +1,93 @@
+"""
+Management command to export questions, choices and results (or individual ballots)
+as CSV or NDJSON. Rows are streamed to the output, see polls/exporting.py.
+
+Ballot exports can be split by vote id range and encoded in parallel with
+--workers; the parts are stitched into --output, or kept in --parts-dir with a manifest.
+"""
+import os
+import shutil
+import sys
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.exporting import (
+    DEFAULT_SHARD_SIZE,
+    EXPORT_DATASETS,
+    EXPORT_FORMATS,
+    export_ballots_sharded,
+    stitch_parts,
+    stream_export,
+)
+
+
+class Command(BaseCommand):
+    help = 'Export poll results or ballots as CSV or NDJSON'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--format', choices=EXPORT_FORMATS, default='csv')
+        parser.add_argument('--dataset', choices=EXPORT_DATASETS, default='results')
+        parser.add_argument('--output', default='-', help='Output file path, "-" for stdout')
+        parser.add_argument('--gzip', action='store_true', help='Gzip-compress the output')
+        parser.add_argument('--workers', type=int, default=0,
+                            help='Encode ballots in this many worker processes (0 = single stream)')
+        parser.add_argument('--shard-size', type=int, default=DEFAULT_SHARD_SIZE,
+                            help='Vote ids per shard in a parallel ballot export')
+        parser.add_argument('--parts-dir', help='Keep a directory of part files and manifest.json '
+                                                'instead of stitching them into --output')
+
+    def handle(self, *args, **options):
+        if options['workers'] or options['parts_dir']:
+            return self.handle_sharded(options)
+
+        chunks = stream_export(options['dataset'], options['format'], options['gzip'])
+
+        if options['output'] == '-':
+            output = sys.stdout.buffer
+            for chunk in chunks:
+                output.write(chunk)
+            output.flush()
+            return
+
+        written = 0
+        with open(options['output'], 'wb') as output:
+            for chunk in chunks:
+                output.write(chunk)
+                written += len(chunk)
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {options['dataset']} to {options['output']} ({written} bytes)"
+        ))
+
+    def handle_sharded(self, options):
+        if options['dataset'] != 'ballots':
+            raise CommandError('Parallel export is only supported for --dataset ballots')
+        if options['shard_size'] < 1:
+            raise CommandError('--shard-size must be positive')
+        workers = options['workers'] or None
+
+        if options['parts_dir']:
+            manifest = export_ballots_sharded(
+                options['parts_dir'], options['format'], options['gzip'], workers, options['shard_size']
+            )
+            self.stderr.write(self.style.SUCCESS(
+                f"Exported {manifest['total_rows']} ballots to {len(manifest['parts'])} parts "
+                f"in {options['parts_dir']}"
+            ))
+            return
+
+        if options['output'] == '-':
+            raise CommandError('Parallel export needs --output or --parts-dir')
+        parts_dir = tempfile.mkdtemp(prefix='.export-parts-', dir=os.path.dirname(os.path.abspath(options['output'])))
+        try:
+            manifest = export_ballots_sharded(
+                parts_dir, options['format'], options['gzip'], workers, options['shard_size'],
+                include_header=False
+            )
+            stitch_parts(parts_dir, manifest, options['output'])
+        finally:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+        self.stderr.write(self.style.SUCCESS(
+            f"Exported {manifest['total_rows']} ballots from {len(manifest['parts'])} shards "
+            f"to {options['output']} ({os.path.getsize(options['output'])} bytes)"
+        ))
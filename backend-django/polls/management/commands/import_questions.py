@@ -0,0 +1,46 @@
+"""
+Management command to bulk import questions from a CSV or NDJSON file.
+The file is streamed and written in chunks, see polls/importing.py for the formats.
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from polls.importing import (
+    IMPORT_CHUNK_SIZE,
+    IMPORT_FORMATS,
+    detect_format,
+    import_questions,
+)
+
+
+class Command(BaseCommand):
+    help = 'Import questions and choices from a CSV or NDJSON file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Path to the .csv or .ndjson file')
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help='Override format detection by extension')
+        parser.add_argument('--chunk-size', type=int, default=IMPORT_CHUNK_SIZE, help='Rows per transaction')
+
+    def handle(self, *args, **options):
+        import_format = detect_format(options['path'], options['format'])
+        if import_format is None:
+            raise CommandError(f"Cannot detect format of {options['path']}, use --format")
+
+        def report_progress(report):
+            self.stdout.write(f'  chunk {report.chunks}: {report.processed} rows processed, '
+                              f'{report.created} created, {report.failed} failed')
+
+        with open(options['path'], encoding='utf-8-sig', newline='') as lines:
+            report = import_questions(lines, import_format, options['chunk_size'], on_chunk=report_progress)
+
+        for error in report.errors:
+            self.stdout.write(self.style.WARNING(f"  line {error['line']}: {error['errors']}"))
+        if report.failed > len(report.errors):
+            self.stdout.write(self.style.WARNING(f'  ... {report.failed - len(report.errors)} more errors'))
+        if report.read_error is not None:
+            self.stdout.write(self.style.ERROR(
+                f"  could not read the file from line {report.read_error['line']} on: {report.read_error['error']}"
+            ))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {report.created} of {report.processed} questions ({report.failed} failed)'
+        ))
@@ -0,0 +1,33 @@
+"""
+Management command to delete expired sessions from the database in small batches,
+so that it never holds long locks on django_session (unlike `clearsessions`, which
+deletes them all in one statement). Their cached copies expire on their own.
+Meant to run periodically, e.g. daily from cron.
+"""
+import time
+
+from django.contrib.sessions.models import Session
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+
+class Command(BaseCommand):
+    help = 'Delete expired sessions in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help='Sessions deleted per statement')
+        parser.add_argument('--pause', type=float, default=0.0, help='Seconds to sleep between batches')
+
+    def handle(self, *args, **options):
+        now = timezone.now()
+        purged = 0
+        while True:
+            keys = list(
+                Session.objects.filter(expire_date__lt=now).values_list('session_key', flat=True)[:options['batch_size']]
+            )
+            if not keys:
+                break
+            purged += Session.objects.filter(session_key__in=keys).delete()[0]
+            if options['pause']:
+                time.sleep(options['pause'])
+        self.stdout.write(self.style.SUCCESS(f'Purged {purged} expired sessions'))
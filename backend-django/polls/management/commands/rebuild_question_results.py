@@ -0,0 +1,19 @@
+"""
+Management command to recompute the materialized question results (QuestionResult).
+The rows are kept up to date incrementally; this is for recovery, e.g. after
+writes that bypassed polls.signals.
+"""
+from django.core.management.base import BaseCommand
+
+from polls.results import rebuild_question_results
+
+
+class Command(BaseCommand):
+    help = 'Recompute the materialized results of every question'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Questions recomputed per batch')
+
+    def handle(self, *args, **options):
+        written = rebuild_question_results(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt results of {written} questions'))
@@ -0,0 +1,21 @@
+"""
+Management command to rebuild the full-text search index of questions and choices.
+The index is kept up to date incrementally; this is for the initial fill on databases
+without a native full-text index, or after writes that bypassed polls.signals.
+"""
+from django.core.management.base import BaseCommand
+
+from polls.search import get_search_backend, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the full-text search index of questions and choices'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--chunk-size', type=int, default=1000, help='Questions indexed per batch')
+
+    def handle(self, *args, **options):
+        indexed = rebuild_index(options['chunk_size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Indexed {indexed} questions ({type(get_search_backend()).__name__})'
+        ))
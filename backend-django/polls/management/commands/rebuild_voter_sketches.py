@@ -0,0 +1,23 @@
+"""
+Management command to add every recorded ballot to the distinct-voter sketches
+(see polls.hll), e.g. after deploying them onto a database that already has votes.
+Sketches only grow by merging, so it is safe to run while votes are coming in,
+and running it again changes nothing.
+"""
+from django.core.management.base import BaseCommand
+
+from polls.hll import build_sketches_from_ballots, merge_into_shards
+
+
+class Command(BaseCommand):
+    help = 'Add the recorded ballots to the distinct-voter sketches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500, help='Sketches written per transaction')
+
+    def handle(self, *args, **options):
+        sketches = sorted(build_sketches_from_ballots().items())
+        batch_size = options['batch_size']
+        for start in range(0, len(sketches), batch_size):
+            merge_into_shards({(key, 0): sketch for key, sketch in sketches[start:start + batch_size]})
+        self.stdout.write(self.style.SUCCESS(f'Merged the recorded ballots into {len(sketches)} sketches'))
@@ -0,0 +1,34 @@
+import time
+
+from django.conf import settings
+from django.contrib.sessions.middleware import SessionMiddleware
+
+# Session key holding when the session was last saved (Unix time)
+REFRESHED_AT_KEY = '_session_refreshed_at'
+
+
+class GuestSessionMiddleware(SessionMiddleware):
+    """
+    Drop-in replacement for Django's SessionMiddleware.
+
+    Sessions are written when they change, and otherwise only refreshed (saved
+    again with a new expiry, and the cookie re-sent) once SESSION_REFRESH_INTERVAL
+    has passed since their last save, instead of on every request. An active
+    session therefore never gets closer to expiry than SESSION_COOKIE_AGE minus
+    that interval, at one write per interval.
+
+    Views decorated with polls.caching.guest_cacheable flag guest requests with
+    `skip_session_save`; for those, an unmodified session is neither saved nor
+    re-sent, so shared caches can store the response.
+    """
+    def process_response(self, request, response):
+        session = request.session
+        if getattr(request, 'skip_session_save', False) and not session.modified:
+            return response
+        # A cookie of a missing or expired session leaves an empty session without a key
+        if session.session_key is not None:
+            refreshed_at = session.get(REFRESHED_AT_KEY, 0)
+            now = int(time.time())
+            if session.modified or now - refreshed_at >= settings.SESSION_REFRESH_INTERVAL:
+                session[REFRESHED_AT_KEY] = now
+        return super().process_response(request, response)
@@ -0,0 +1,66 @@
+# Generated by Django 5.2.4 on 2026-10-19 05:51
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def create_fulltext_index(apps, schema_editor):
+    """
+    Creates the native full-text table of SQLite (FTS5) or MySQL (FULLTEXT) and
+    indexes the existing questions. Other databases use SearchTerm, filled by
+    `manage.py rebuild_search_index`.
+    """
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute(
+            "CREATE VIRTUAL TABLE polls_question_fts USING fts5(question_text, choice_text, tokenize='unicode61')"
+        )
+        schema_editor.execute(
+            "INSERT INTO polls_question_fts (rowid, question_text, choice_text) "
+            "SELECT q.id, q.question_text, COALESCE(GROUP_CONCAT(c.choice_text, ' '), '') "
+            "FROM polls_question q LEFT JOIN polls_choice c ON c.question_id = q.id GROUP BY q.id, q.question_text"
+        )
+    elif vendor == 'mysql':
+        schema_editor.execute(
+            "CREATE TABLE polls_question_search ("
+            "question_id BIGINT NOT NULL PRIMARY KEY, question_text TEXT NOT NULL, choice_text TEXT NOT NULL, "
+            "FULLTEXT KEY polls_question_search_text (question_text, choice_text)"
+            ") ENGINE=InnoDB DEFAULT CHARSET=utf8mb4"
+        )
+        schema_editor.execute(
+            "INSERT INTO polls_question_search (question_id, question_text, choice_text) "
+            "SELECT q.id, q.question_text, COALESCE(GROUP_CONCAT(c.choice_text ORDER BY c.id SEPARATOR ' '), '') "
+            "FROM polls_question q LEFT JOIN polls_choice c ON c.question_id = q.id GROUP BY q.id, q.question_text"
+        )
+
+
+def drop_fulltext_index(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    if vendor == 'sqlite':
+        schema_editor.execute("DROP TABLE IF EXISTS polls_question_fts")
+    elif vendor == 'mysql':
+        schema_editor.execute("DROP TABLE IF EXISTS polls_question_search")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0004_votersketch'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SearchTerm',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('term', models.CharField(max_length=64)),
+                ('weight', models.PositiveIntegerField()),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['term', 'question'], name='polls_searc_term_d7c027_idx')],
+                'unique_together': {('question', 'term')},
+            },
+        ),
+        migrations.RunPython(create_fulltext_index, drop_fulltext_index),
+    ]
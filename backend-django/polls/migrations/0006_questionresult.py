@@ -0,0 +1,57 @@
+# Generated by Django 5.2.4 on 2026-10-19 05:57
+
+import time
+
+from django.db import migrations, models
+
+
+def fill_question_results(apps, schema_editor):
+    """Materializes the results of the existing questions."""
+    Question = apps.get_model('polls', 'Question')
+    Choice = apps.get_model('polls', 'Choice')
+    QuestionResult = apps.get_model('polls', 'QuestionResult')
+
+    version = time.time_ns()
+    results = {
+        question_id: QuestionResult(
+            question_id=question_id, question_text=question_text, pub_date=pub_date,
+            choice_count=0, total_votes=0, choices=[], version=version,
+        )
+        for question_id, question_text, pub_date in Question.objects.values_list('id', 'question_text', 'pub_date')
+    }
+    for question_id, choice_id, choice_text, votes in Choice.objects.order_by('id').values_list(
+        'question_id', 'id', 'choice_text', 'votes'
+    ):
+        results[question_id].choices.append({'id': choice_id, 'choice_text': choice_text, 'votes': votes})
+    for result in results.values():
+        result.choice_count = len(result.choices)
+        result.total_votes = sum(choice['votes'] for choice in result.choices)
+        for choice in result.choices:
+            choice['percentage'] = (choice['votes'] / result.total_votes) * 100 if result.total_votes > 0 else 0.0
+    QuestionResult.objects.bulk_create(results.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0005_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionResult',
+            fields=[
+                ('question_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('question_text', models.CharField(max_length=200)),
+                ('pub_date', models.DateTimeField()),
+                ('choice_count', models.PositiveIntegerField()),
+                ('total_votes', models.IntegerField()),
+                ('choices', models.JSONField()),
+                ('version', models.BigIntegerField(db_index=True)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['pub_date', 'question_id'], name='polls_quest_pub_dat_0b21e3_idx')],
+            },
+        ),
+        migrations.RunPython(fill_question_results, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:11
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0006_questionresult'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='VoteBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('resolution', models.CharField(choices=[('minute', 'Minute'), ('hour', 'Hour'), ('day', 'Day')], max_length=6)),
+                ('bucket_start', models.DateTimeField()),
+                ('delta', models.IntegerField(default=0)),
+                ('choice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.choice')),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['question', 'bucket_start'], name='polls_voteb_questio_5d3e5d_idx'), models.Index(fields=['resolution', 'bucket_start'], name='polls_voteb_resolut_793211_idx')],
+                'unique_together': {('resolution', 'choice', 'bucket_start')},
+            },
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:18
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0007_votebucket'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionResultTombstone',
+            fields=[
+                ('question_id', models.BigIntegerField(primary_key=True, serialize=False)),
+                ('version', models.BigIntegerField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.2.4 on 2026-10-19 06:27
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0008_questionresulttombstone'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChoiceVoterBitmap',
+            fields=[
+                ('choice', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, serialize=False, to='polls.choice')),
+                ('bits', models.BinaryField()),
+                ('voter_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='polls.question')),
+            ],
+        ),
+    ]
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-19 07:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0009_choicevoterbitmap'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='votersketch',
+            name='shard',
+            field=models.PositiveSmallIntegerField(default=0),
+        ),
+        migrations.AlterField(
+            model_name='votersketch',
+            name='key',
+            field=models.CharField(max_length=64),
+        ),
+        migrations.AlterUniqueTogether(
+            name='votersketch',
+            unique_together={('key', 'shard')},
+        ),
+    ]
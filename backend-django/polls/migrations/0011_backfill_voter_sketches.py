@@ -0,0 +1,39 @@
+# Generated by Django 5.2.4 on 2026-10-19 08:10
+
+from django.db import migrations
+
+from polls.hll import HyperLogLog, sketch_keys_of_ballot
+
+
+def backfill_voter_sketches(apps, schema_editor):
+    """Adds the ballots recorded before the sketches existed, merged into shard 0 of each key."""
+    UserVote = apps.get_model('polls', 'UserVote')
+    VoterSketch = apps.get_model('polls', 'VoterSketch')
+
+    sketches = {}
+    for user_id, question_id, voted_at in UserVote.objects.values_list(
+        'user_id', 'question_id', 'voted_at'
+    ).iterator(chunk_size=10_000):
+        for key in sketch_keys_of_ballot(question_id, voted_at):
+            sketches.setdefault(key, HyperLogLog()).add(user_id)
+
+    # Ballots already added since the sketches were deployed are added again, which changes nothing
+    existing = [row for row in VoterSketch.objects.filter(shard=0) if row.key in sketches]
+    for row in existing:
+        row.registers = HyperLogLog.from_bytes(row.registers).merge(sketches.pop(row.key)).to_bytes()
+    VoterSketch.objects.bulk_update(existing, ['registers'], batch_size=500)
+    VoterSketch.objects.bulk_create(
+        [VoterSketch(key=key, shard=0, registers=sketch.to_bytes()) for key, sketch in sketches.items()],
+        batch_size=500
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polls', '0010_votersketch_shard'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_voter_sketches, migrations.RunPython.noop),
+    ]
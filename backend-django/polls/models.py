@@ -1,8 +1,10 @@
-from django.db import models
+from django.db import connection, models, transaction
 from django.contrib.auth.models import User
 from django.utils import timezone
 import os
 
+from polls.versioning import batched_writes, catalog_changed
+
 class Question(models.Model):
     """
     Question is a model inherited from models.Model of django.
@@ -13,6 +15,37 @@ class Question(models.Model):
 
     def __str__(self):
         return str(self.question_text)
+
+    @classmethod
+    def create_with_choices(cls, new_questions):
+        """
+        Create questions and all their choices in one transaction.
+        `new_questions` are validated NewQuestionSchema objects.
+        Choices are written with a single bulk insert, so one question costs two queries.
+        """
+        with transaction.atomic():
+            questions = [
+                cls(question_text=new_question.question_text, pub_date=new_question.pub_date)
+                for new_question in new_questions
+            ]
+            if connection.features.can_return_rows_from_bulk_insert:
+                cls.objects.bulk_create(questions)
+            else:
+                # MySQL doesn't return primary keys from bulk inserts, and choices need them;
+                # catalog_changed below covers the rows, once
+                with batched_writes():
+                    for question in questions:
+                        question.save()
+
+            choices = [
+                Choice(question=question, choice_text=new_choice.choice_text, votes=new_choice.votes)
+                for question, new_question in zip(questions, new_questions)
+                for new_choice in new_question.choices
+            ]
+            if choices:
+                Choice.objects.bulk_create(choices)
+        catalog_changed.send(sender=cls, question_ids=[question.id for question in questions])
+        return questions
         
 class Choice(models.Model):
     """
@@ -112,3 +145,116 @@ class PollStatus(models.Model):
     
     def __str__(self):
         return f"Poll {'Closed' if self.is_closed else 'Open'}"
+
+
+class VoterSketch(models.Model):
+    """
+    One shard of a HyperLogLog sketch of distinct voters (see polls/hll.py), stored compressed.
+    Keys: 'global', 'question:<id>' and 'day:<YYYY-MM-DD>'; a key's sketch is the merge of its shards.
+    """
+    key = models.CharField(max_length=64)
+    shard = models.PositiveSmallIntegerField(default=0)
+    registers = models.BinaryField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        unique_together = ['key', 'shard']
+
+    def __str__(self):
+        return f"Voter sketch {self.key} (shard {self.shard})"
+
+
+class SearchTerm(models.Model):
+    """
+    One term of a question's search document, with its weighted frequency.
+    Portable full-text index used when the database has no native one (see polls/search.py).
+    """
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    term = models.CharField(max_length=64)
+    weight = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ['question', 'term']
+        indexes = [models.Index(fields=['term', 'question'])]
+
+    def __str__(self):
+        return f"{self.term} ({self.weight}) in question {self.question_id}"
+
+
+class QuestionResult(models.Model):
+    """
+    Materialized results of one question, read by the results summary (see polls/results.py).
+    Refreshed in the same transaction as the votes and edits that change them.
+    question_id is deliberately not a foreign key: rows are refreshed while their
+    question's choices are being cascade-deleted, and dropped with the question.
+    """
+    question_id = models.BigIntegerField(primary_key=True)
+    question_text = models.CharField(max_length=200)
+    pub_date = models.DateTimeField()
+    choice_count = models.PositiveIntegerField()
+    total_votes = models.IntegerField()
+    # [{"id", "choice_text", "votes", "percentage"}, ...] in choice id order
+    choices = models.JSONField()
+    # time.time_ns() of the last refresh
+    version = models.BigIntegerField(db_index=True)
+
+    class Meta:
+        indexes = [models.Index(fields=['pub_date', 'question_id'])]
+
+    def __str__(self):
+        return f"Results of question {self.question_id}"
+
+
+class QuestionResultTombstone(models.Model):
+    """
+    Marks the QuestionResult of a deleted question, so clients polling for changes
+    (?since=<version>) learn about the deletion. Kept for RESULTS_TOMBSTONE_RETENTION_DAYS.
+    """
+    question_id = models.BigIntegerField(primary_key=True)
+    # time.time_ns() of the deletion
+    version = models.BigIntegerField(db_index=True)
+
+    def __str__(self):
+        return f"Deleted results of question {self.question_id}"
+
+
+class VoteBucket(models.Model):
+    """
+    Net change in one choice's votes over one time bucket (see polls/history.py).
+    Votes land in minute buckets; compaction rolls them up into hour, then day buckets.
+    """
+    MINUTE = 'minute'
+    HOUR = 'hour'
+    DAY = 'day'
+    RESOLUTION_CHOICES = [(MINUTE, 'Minute'), (HOUR, 'Hour'), (DAY, 'Day')]
+
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    choice = models.ForeignKey(Choice, on_delete=models.CASCADE)
+    resolution = models.CharField(max_length=6, choices=RESOLUTION_CHOICES)
+    bucket_start = models.DateTimeField()
+    delta = models.IntegerField(default=0)
+
+    class Meta:
+        unique_together = ['resolution', 'choice', 'bucket_start']
+        indexes = [
+            models.Index(fields=['question', 'bucket_start']),
+            models.Index(fields=['resolution', 'bucket_start']),
+        ]
+
+    def __str__(self):
+        return f"{self.delta:+d} votes for choice {self.choice_id} ({self.resolution} of {self.bucket_start})"
+
+
+class ChoiceVoterBitmap(models.Model):
+    """
+    The ids of the users who chose a choice, as a zlib-compressed bitmap (see polls/bitmaps.py).
+    Kept up to date by the vote path; built from UserVote when missing.
+    """
+    choice = models.OneToOneField(Choice, on_delete=models.CASCADE, primary_key=True)
+    question = models.ForeignKey(Question, on_delete=models.CASCADE)
+    bits = models.BinaryField()
+    voter_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Voters of choice {self.choice_id} ({self.voter_count})"
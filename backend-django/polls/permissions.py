@@ -0,0 +1,97 @@
+"""
+DRF permission classes for the admin API.
+
+Admin status comes from UserProfile (is_admin) and the main admin email.
+It is resolved at most once per request (memoized on the request) and, when
+settings.ADMIN_STATUS_CACHE_TIMEOUT is set (by default with a shared cache only),
+cached per user across requests; polls.signals drops the cached entry whenever a
+UserProfile is saved or deleted.
+"""
+from collections import namedtuple
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.permissions import SAFE_METHODS, BasePermission
+
+from polls.models import AdminUserManagement, UserProfile
+
+AdminStatus = namedtuple('AdminStatus', ['has_profile', 'is_admin', 'google_email'])
+NO_PROFILE = AdminStatus(has_profile=False, is_admin=False, google_email=None)
+
+
+def admin_status_cache_key(user_id):
+    return f'polls:admin-status:{user_id}'
+
+
+def invalidate_admin_status(user_id):
+    cache.delete(admin_status_cache_key(user_id))
+
+
+def get_admin_status(request):
+    """
+    Returns the AdminStatus of request.user (NO_PROFILE for guests and users without a profile).
+    """
+    memoized = getattr(request, '_poll_admin_status', None)
+    if memoized is not None:
+        return memoized
+
+    timeout = settings.ADMIN_STATUS_CACHE_TIMEOUT
+    if not request.user.is_authenticated:
+        admin_status = NO_PROFILE
+    else:
+        key = admin_status_cache_key(request.user.pk)
+        cached = cache.get(key) if timeout > 0 else None
+        if cached is not None:
+            admin_status = AdminStatus(*cached)
+        else:
+            profile = UserProfile.objects.filter(user=request.user).values_list('is_admin', 'google_email').first()
+            admin_status = AdminStatus(True, *profile) if profile else NO_PROFILE
+            if timeout > 0:
+                cache.set(key, tuple(admin_status), timeout)
+
+    request._poll_admin_status = admin_status
+    return admin_status
+
+
+def is_main_admin(admin_status):
+    # The main admin email comes from the environment, so it is compared on every check
+    return admin_status.is_admin and admin_status.google_email == AdminUserManagement.get_main_admin_email()
+
+
+class IsPollAdmin(BasePermission):
+    """Allows access to authenticated users whose profile has is_admin set."""
+
+    def __init__(self):
+        # Replaced by a more specific message when the check fails for another reason
+        self.message = {'error': 'Admin access required'}
+
+    def has_permission(self, request, view):
+        if not request.user.is_authenticated:
+            return False
+        admin_status = get_admin_status(request)
+        if not admin_status.has_profile:
+            self.message = {'error': 'User profile not found'}
+        return admin_status.is_admin
+
+
+class IsMainPollAdmin(BasePermission):
+    """Allows access only to the main admin (MAIN_ADMIN_EMAIL)."""
+
+    def __init__(self):
+        # Replaced by a more specific message when the check fails for another reason
+        self.message = {'error': 'Admin access required'}
+
+    def has_permission(self, request, view):
+        if not request.user.is_authenticated:
+            return False
+        admin_status = get_admin_status(request)
+        if admin_status.is_admin and not is_main_admin(admin_status):
+            self.message = {'error': 'Main admin access required'}
+        return is_main_admin(admin_status)
+
+
+class IsMainPollAdminOrReadOnly(IsMainPollAdmin):
+    """Read-only requests are public; writes require the main admin."""
+
+    def has_permission(self, request, view):
+        return request.method in SAFE_METHODS or super().has_permission(request, view)
@@ -0,0 +1,95 @@
+"""
+Publish/subscribe for live updates (e.g. the results stream).
+
+Publishers are regular (sync) code such as signal receivers; subscribers are async
+views, each holding a Subscription for as long as its client stays connected.
+The backend is picked by settings.POLLS_PUBSUB_BACKEND (a dotted path), so a
+cross-process broker can replace LocalBroker, which only reaches subscribers of the
+same process, with the same interface: publish(channel, message) and
+subscribe(channel), an async context manager yielding a Subscription.
+"""
+import asyncio
+import threading
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+# Messages buffered per subscriber before it is marked as overflowed
+SUBSCRIBER_QUEUE_SIZE = 100
+
+
+class Subscription:
+    def __init__(self, loop):
+        self.loop = loop
+        self.queue = asyncio.Queue(SUBSCRIBER_QUEUE_SIZE)
+        # Set when messages were dropped because the subscriber fell behind:
+        # it should resynchronize from a full snapshot
+        self.overflowed = False
+
+    def deliver(self, message):
+        # Runs on the subscriber's event loop
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+    def reset(self):
+        """Drops the buffered messages and clears the overflow flag."""
+        while not self.queue.empty():
+            self.queue.get_nowait()
+        self.overflowed = False
+
+    async def get(self, timeout=None):
+        """Returns the next message, or None if none arrived within `timeout` seconds."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except TimeoutError:
+            return None
+
+
+class LocalBroker:
+    """In-process broker: messages reach the subscribers of the current process only."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.subscriptions = {}
+
+    def publish(self, channel, message):
+        """Delivers a message to every current subscriber of the channel; safe to call from any thread."""
+        with self.lock:
+            subscriptions = list(self.subscriptions.get(channel, ()))
+        for subscription in subscriptions:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription.deliver, message)
+            except RuntimeError:
+                # The subscriber's event loop is closed; it unsubscribes on its way out
+                pass
+        return len(subscriptions)
+
+    @asynccontextmanager
+    async def subscribe(self, channel):
+        subscription = Subscription(asyncio.get_running_loop())
+        with self.lock:
+            self.subscriptions.setdefault(channel, set()).add(subscription)
+        try:
+            yield subscription
+        finally:
+            with self.lock:
+                self.subscriptions[channel].discard(subscription)
+
+    def subscriber_count(self, channel):
+        with self.lock:
+            return len(self.subscriptions.get(channel, ()))
+
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            _broker = import_string(settings.POLLS_PUBSUB_BACKEND)()
+        return _broker
@@ -0,0 +1,249 @@
+"""
+Materialized per-question results (QuestionResult), the read model of the results summary.
+
+A row holds everything the summary shows for one question: its text, pub_date,
+total votes and per-choice votes and percentages, plus the version (time.time_ns())
+of its last refresh. Rows are refreshed from Question and Choice, in the caller's
+transaction, by the receivers in polls.signals:
+- Question and Choice saves and deletes,
+- catalog_changed / votes_changed sent with question_ids by bulk writes and votes.
+Vote counter saves (update_fields=['votes']) are left to votes_changed, so a
+submission refreshes each question once.
+
+Rows are computed from flat (question_id, choice_id, votes) columns, grouped per
+question with NumPy, so a rebuild at catalog scale builds no ORM or Pydantic
+object per choice. `manage.py rebuild_question_results` recomputes every row;
+`manage.py benchmark_results` compares it with the per-question schema path.
+
+After votes change, the refreshed counts are published once on RESULTS_CHANNEL
+(see polls.pubsub) for the live results stream.
+
+Row versions also let clients fetch only what changed since their last fetch
+(changed_results). Deleted rows leave a QuestionResultTombstone behind for
+RESULTS_TOMBSTONE_RETENTION_DAYS; a client that is further behind reloads everything.
+"""
+import time
+from datetime import datetime, timedelta
+
+import numpy as np
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from polls.models import Choice, Question, QuestionResult, QuestionResultTombstone
+from polls.pubsub import get_broker
+
+RESULTS_CHANNEL = 'results'
+
+# Changes committed up to this long after their version was taken are still picked up
+# by changed_results (a row's version is taken before its transaction commits)
+CHANGES_OVERLAP_NS = 5 * 10**9
+
+REFRESHED_FIELDS = ['question_text', 'pub_date', 'choice_count', 'total_votes', 'choices', 'version']
+
+
+def tally_votes(question_ids, votes):
+    """
+    Groups flat choice columns by question. `question_ids` must be sorted.
+    Returns (ids, choice_counts, totals) per question and the percentage of each choice.
+    """
+    ids, choice_counts = np.unique(question_ids, return_counts=True)
+    totals = np.add.reduceat(votes, np.cumsum(choice_counts) - choice_counts) if len(votes) else votes
+    choice_totals = np.repeat(totals, choice_counts)
+    percentages = np.divide(votes, choice_totals, out=np.zeros(len(votes)), where=choice_totals > 0) * 100
+    return ids, choice_counts, totals, percentages
+
+
+def compute_results(question_ids):
+    """Returns {question_id: QuestionResult} computed from the current questions and choices."""
+    version = time.time_ns()
+    results = {
+        question_id: QuestionResult(
+            question_id=question_id, question_text=question_text, pub_date=pub_date,
+            choice_count=0, total_votes=0, choices=[], version=version,
+        )
+        for question_id, question_text, pub_date
+        in Question.objects.filter(id__in=question_ids).values_list('id', 'question_text', 'pub_date')
+    }
+    rows = Choice.objects.filter(question_id__in=results.keys()).order_by('question_id', 'id').values_list(
+        'question_id', 'id', 'votes', 'choice_text'
+    )
+    columns = list(zip(*rows))
+    if not columns:
+        return results
+
+    choice_question_ids, choice_ids, votes, choice_texts = columns
+    ids, choice_counts, totals, percentages = tally_votes(
+        np.array(choice_question_ids, dtype=np.int64), np.array(votes, dtype=np.int64)
+    )
+    choices = [
+        {'id': choice_id, 'choice_text': choice_text, 'votes': choice_votes, 'percentage': percentage}
+        for choice_id, choice_text, choice_votes, percentage in zip(choice_ids, choice_texts, votes, percentages.tolist())
+    ]
+    start = 0
+    for question_id, choice_count, total_votes in zip(ids.tolist(), choice_counts.tolist(), totals.tolist()):
+        result = results[question_id]
+        result.choice_count = choice_count
+        result.total_votes = total_votes
+        result.choices = choices[start:start + choice_count]
+        start += choice_count
+    return results
+
+
+def _upsert(model, rows, update_fields):
+    """
+    Inserts rows keyed by question_id, updating update_fields of those that already exist.
+    Backends whose upsert takes no conflict target (MySQL) update the existing rows, locked
+    so that no concurrent transaction inserts the missing ones, then insert the others.
+    """
+    if connections[router.db_for_write(model)].features.supports_update_conflicts_with_target:
+        model.objects.bulk_create(rows, update_conflicts=True, unique_fields=['question_id'], update_fields=update_fields)
+        return
+    with transaction.atomic():
+        existing_ids = set(
+            model.objects.select_for_update().filter(question_id__in=[row.question_id for row in rows])
+            .values_list('question_id', flat=True)
+        )
+        model.objects.bulk_update([row for row in rows if row.question_id in existing_ids], update_fields)
+        model.objects.bulk_create([row for row in rows if row.question_id not in existing_ids])
+
+
+def _save_results(results):
+    _upsert(QuestionResult, results, REFRESHED_FIELDS)
+
+
+def drop_question_results(question_ids):
+    """Deletes the rows of deleted questions, leaving tombstones behind (and expiring old ones)."""
+    version = time.time_ns()
+    QuestionResult.objects.filter(question_id__in=question_ids).delete()
+    _upsert(
+        QuestionResultTombstone,
+        [QuestionResultTombstone(question_id=question_id, version=version) for question_id in question_ids],
+        ['version']
+    )
+    QuestionResultTombstone.objects.filter(version__lt=tombstone_horizon()).delete()
+
+
+def tombstone_horizon():
+    """Oldest version from which changed_results still knows every deletion."""
+    retention = timedelta(days=settings.RESULTS_TOMBSTONE_RETENTION_DAYS)
+    return int((timezone.now() - retention).timestamp() * 10**9)
+
+
+def refresh_question_results(question_ids):
+    """Recomputes the rows of the given questions; rows of deleted questions are dropped."""
+    question_ids = set(question_ids)
+    if not question_ids:
+        return
+    results = compute_results(question_ids)
+    with transaction.atomic():
+        if results:
+            _save_results(list(results.values()))
+        deleted_ids = question_ids - results.keys()
+        if deleted_ids:
+            drop_question_results(deleted_ids)
+
+
+def rebuild_question_results(chunk_size=1000):
+    """Recomputes every row, in chunks of questions. Returns the number of rows written."""
+    written = 0
+    with transaction.atomic():
+        question_ids = list(Question.objects.order_by('id').values_list('id', flat=True))
+        stale_ids = set(QuestionResult.objects.values_list('question_id', flat=True)) - set(question_ids)
+        if stale_ids:
+            drop_question_results(stale_ids)
+        for start in range(0, len(question_ids), chunk_size):
+            results = compute_results(question_ids[start:start + chunk_size])
+            _save_results(list(results.values()))
+            written += len(results)
+    return written
+
+
+def serialize_choices(result):
+    return [
+        {
+            'id': choice['id'], 'choice_text': choice['choice_text'],
+            'votes': choice['votes'], 'percentage': choice['percentage'],
+        }
+        for choice in result.choices
+    ]
+
+
+def serialize_result(result, collapsed=False):
+    """
+    One question of the results summary. Collapsed, it has its choice count
+    instead of its choices (which then needn't be loaded: defer('choices')).
+    """
+    data = {
+        'id': result.question_id,
+        'question_text': result.question_text,
+        'pub_date': result.pub_date,
+        'total_votes': result.total_votes,
+    }
+    if collapsed:
+        data['choice_count'] = result.choice_count
+    else:
+        data['choices'] = serialize_choices(result)
+    return data
+
+
+def build_results_summary(results):
+    """The results summary payload, from an ordered QuestionResult queryset (one query)."""
+    questions_results = [serialize_result(result) for result in results]
+    return {
+        'total_questions': len(questions_results),
+        'total_votes_all_questions': sum(result['total_votes'] for result in questions_results),
+        'questions_results': questions_results,
+    }
+
+
+def changed_results(results, since, visible=None):
+    """
+    Splits the rows changed after version `since` into (changed, removed_ids):
+    rows of `results` (an ordered QuestionResult queryset) that changed, or whose
+    pub_date was reached, after `since`; and the ids of questions deleted since then,
+    or no longer matching `visible` (a Q() of the rows the caller may see).
+    Returns None if deletions that old are no longer known.
+    """
+    if since < tombstone_horizon():
+        return None
+    since -= CHANGES_OVERLAP_NS
+    since_time = datetime.fromtimestamp(since / 10**9, tz=timezone.get_current_timezone())
+    # Rows of questions that were scheduled and have been published since
+    touched = Q(version__gt=since) | Q(pub_date__gt=since_time, pub_date__lte=timezone.now())
+    changed = list(results.filter(touched))
+    removed_ids = list(
+        QuestionResultTombstone.objects.filter(version__gt=since).order_by('question_id')
+        .values_list('question_id', flat=True)
+    )
+    if visible is not None:
+        # Rows that changed but can't be seen (anymore): e.g. rescheduled, or their choices deleted
+        hidden = QuestionResult.objects.filter(touched).exclude(visible)
+        removed_ids.extend(hidden.order_by('question_id').values_list('question_id', flat=True))
+    return changed, removed_ids
+
+
+def publish_results(question_ids):
+    """
+    Publishes the current vote counts of the given questions on RESULTS_CHANNEL,
+    read from their result rows in one query whatever the number of subscribers.
+    """
+    question_ids = set(question_ids)
+    if not question_ids:
+        return
+    results = QuestionResult.objects.filter(question_id__in=question_ids).order_by('question_id')
+    questions = [
+        {
+            'id': result.question_id,
+            'pub_date': result.pub_date,
+            'total_votes': result.total_votes,
+            'choices': [
+                {'id': choice['id'], 'votes': choice['votes'], 'percentage': choice['percentage']}
+                for choice in result.choices
+            ],
+        }
+        for result in results
+    ]
+    if questions:
+        get_broker().publish(RESULTS_CHANNEL, {'questions': questions})
@@ -1,7 +1,7 @@
 from pydantic import BaseModel, ConfigDict, Field, computed_field, model_validator
 from django.utils import timezone
 from datetime import datetime
-from typing import Optional
+from typing import Literal, Optional
 
 # --- Client Schemas ---
 
@@ -104,7 +104,18 @@ class NewQuestionSchema(BaseModel):
     pub_date: datetime = Field(default_factory=timezone.now)
     choices: list[NewChoiceSchema] = []
 
+class NewQuestionsBatchSchema(BaseModel):
+    """
+    Schema for creating several questions (e.g. a whole survey) in one request.
+    """
+    questions: list[NewQuestionSchema] = Field(min_length=1, max_length=1000)
+
 class ChoiceUpdateSchema(BaseModel):
+    """
+    Schema for a choice in a question update.
+    Choices without an id are created with the given votes; for existing choices the
+    vote counter is maintained by voting, and only recounted when the choice text changes.
+    """
     id: Optional[int] = None
     choice_text: str
     votes: Optional[int] = 0
@@ -121,6 +132,21 @@ class QuestionUpdateSchema(BaseModel):
     pub_date: datetime = Field(default_factory=timezone.now)
     choices: list[ChoiceUpdateSchema] = []
 
+class BulkQuestionOperationSchema(BaseModel):
+    """
+    Schema for an operation applied to many questions at once (POST /admin/questions/bulk/).
+    set_pub_date requires pub_date.
+    """
+    operation: Literal['delete', 'set_pub_date', 'clear_votes']
+    ids: list[int] = Field(min_length=1, max_length=1000)
+    pub_date: datetime | None = None
+
+    @model_validator(mode='after')
+    def check_pub_date(self):
+        if self.operation == 'set_pub_date' and self.pub_date is None:
+            raise ValueError("pub_date is required for the set_pub_date operation")
+        return self
+
 class ResultsChoiceSchema(BaseModel):
     choice_text: str
     votes: int
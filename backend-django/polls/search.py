@@ -0,0 +1,266 @@
+"""
+Full-text search over question and choice text, for the admin dashboard.
+
+The index holds one document per question: its text and the text of its choices.
+Three backends share one interface and are picked by database vendor:
+- SQLite: an FTS5 virtual table (polls_question_fts, rowid = question id), ranked by bm25.
+- MySQL: a table with a FULLTEXT index (polls_question_search), ranked by MATCH ... AGAINST.
+  InnoDB leaves words shorter than innodb_ft_min_token_size and stopwords out of
+  the index, so terms that could match such a word are matched with REGEXP instead.
+- Anything else: an inverted index of SearchTerm rows, tokenized in Python and
+  ranked by summed term frequency.
+All of them rank and paginate in the database.
+
+Documents are re-indexed by the receivers in polls.signals when questions or
+choices change (catalog_changed carries the question ids of bulk writes).
+`manage.py rebuild_search_index` rebuilds the whole index.
+"""
+import re
+from collections import Counter
+
+from django.db import connection
+from django.db.models import Exists, OuterRef, Q, Subquery, Sum
+
+from polls.models import Choice, Question, SearchTerm
+
+MAX_QUERY_TERMS = 8
+SEARCH_TERM_MAX_LENGTH = 64
+QUESTION_TEXT_WEIGHT = 2
+_TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(text):
+    return [token[:SEARCH_TERM_MAX_LENGTH] for token in _TOKEN_RE.findall(text.lower())]
+
+
+def query_terms(query):
+    """Distinct search terms of a user query; every term must match (as a prefix)."""
+    return list(dict.fromkeys(tokenize(query)))[:MAX_QUERY_TERMS]
+
+
+def load_documents(question_ids):
+    """Returns {question_id: (question_text, choices_text)} for the questions that still exist."""
+    documents = {
+        question_id: (question_text, [])
+        for question_id, question_text in Question.objects.filter(id__in=question_ids).values_list('id', 'question_text')
+    }
+    choices = Choice.objects.filter(question_id__in=documents.keys()).order_by('id')
+    for question_id, choice_text in choices.values_list('question_id', 'choice_text'):
+        documents[question_id][1].append(choice_text)
+    return {question_id: (text, ' '.join(choice_texts)) for question_id, (text, choice_texts) in documents.items()}
+
+
+class SQLiteFTS5Backend:
+    table = 'polls_question_fts'
+
+    def replace(self, documents):
+        with connection.cursor() as cursor:
+            self._delete(cursor, documents.keys())
+            cursor.executemany(
+                f'INSERT INTO {self.table} (rowid, question_text, choice_text) VALUES (%s, %s, %s)',
+                [(question_id, text, choices) for question_id, (text, choices) in documents.items()]
+            )
+
+    def remove(self, question_ids):
+        with connection.cursor() as cursor:
+            self._delete(cursor, question_ids)
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def _delete(self, cursor, question_ids):
+        cursor.executemany(f'DELETE FROM {self.table} WHERE rowid = %s', [(question_id,) for question_id in question_ids])
+
+    def search(self, terms, limit, offset):
+        # Each term is quoted (no FTS5 syntax from user input) and matched as a prefix
+        match = ' '.join(f'"{term}"*' for term in terms)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {self.table} WHERE {self.table} MATCH %s', [match])
+            total = cursor.fetchone()[0]
+            cursor.execute(
+                f'SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s '
+                f'ORDER BY bm25({self.table}, {QUESTION_TEXT_WEIGHT}.0, 1.0), rowid LIMIT %s OFFSET %s',
+                [match, limit, offset]
+            )
+            return total, [row[0] for row in cursor.fetchall()]
+
+
+class MySQLFulltextBackend:
+    table = 'polls_question_search'
+
+    def __init__(self, min_token_size=None, stopwords=None):
+        # Read from the server when not given (see index_limits)
+        self.min_token_size = min_token_size
+        self.stopwords = stopwords
+
+    def index_limits(self):
+        """(innodb_ft_min_token_size, stopwords) of the server: the words InnoDB leaves out of the index."""
+        if self.min_token_size is None:
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    'SELECT @@innodb_ft_min_token_size, @@innodb_ft_enable_stopword, '
+                    '@@innodb_ft_server_stopword_table, @@innodb_ft_user_stopword_table'
+                )
+                min_token_size, stopwords_enabled, server_table, user_table = cursor.fetchone()
+                stopwords = set()
+                if stopwords_enabled:
+                    stopword_table = user_table or server_table
+                    if stopword_table:
+                        # 'db_name/table_name'
+                        table = '.'.join(connection.ops.quote_name(part) for part in stopword_table.split('/'))
+                        cursor.execute(f'SELECT value FROM {table}')
+                    else:
+                        cursor.execute('SELECT value FROM INFORMATION_SCHEMA.INNODB_FT_DEFAULT_STOPWORD')
+                    stopwords = {row[0].lower() for row in cursor.fetchall()}
+            self.min_token_size, self.stopwords = min_token_size, stopwords
+        return self.min_token_size, self.stopwords
+
+    def split_terms(self, terms):
+        """
+        Returns (indexed, scanned): terms whose matching words are all in the FULLTEXT
+        index, and terms that could match a word InnoDB doesn't index (a word shorter
+        than the minimum token size, or a stopword), to be matched by scanning.
+        """
+        min_token_size, stopwords = self.index_limits()
+        indexed, scanned = [], []
+        for term in terms:
+            unindexed = len(term) < min_token_size or any(stopword.startswith(term) for stopword in stopwords)
+            (scanned if unindexed else indexed).append(term)
+        return indexed, scanned
+
+    def replace(self, documents):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'REPLACE INTO {self.table} (question_id, question_text, choice_text) VALUES (%s, %s, %s)',
+                [(question_id, text, choices) for question_id, (text, choices) in documents.items()]
+            )
+
+    def remove(self, question_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {self.table} WHERE question_id = %s', [(question_id,) for question_id in question_ids]
+            )
+
+    def clear(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {self.table}')
+
+    def search(self, terms, limit, offset):
+        indexed, scanned = self.split_terms(terms)
+        conditions, params = [], []
+        # Terms are \w+ tokens, so they need no escaping in the boolean query or the pattern
+        for term in scanned:
+            conditions.append('(question_text REGEXP %s OR choice_text REGEXP %s)')
+            params += [rf'\b{term}', rf'\b{term}']
+        order, rank_params = 'question_id', []
+        if indexed:
+            # Boolean mode: every term required, matched as a prefix
+            against = ' '.join(f'+{term}*' for term in indexed)
+            rank = 'MATCH (question_text, choice_text) AGAINST (%s IN BOOLEAN MODE)'
+            rank_params = [against]
+            order = f'{rank} DESC, question_id'
+            conditions.append(rank)
+            params += rank_params
+        where = ' AND '.join(conditions)
+        with connection.cursor() as cursor:
+            cursor.execute(f'SELECT COUNT(*) FROM {self.table} WHERE {where}', params)
+            total = cursor.fetchone()[0]
+            cursor.execute(
+                f'SELECT question_id FROM {self.table} WHERE {where} '
+                f'ORDER BY {order} LIMIT %s OFFSET %s',
+                [*params, *rank_params, limit, offset]
+            )
+            return total, [row[0] for row in cursor.fetchall()]
+
+
+class InvertedIndexBackend:
+    """Portable fallback: one SearchTerm row per (question, term) with its weighted frequency."""
+
+    def replace(self, documents):
+        SearchTerm.objects.filter(question_id__in=documents.keys()).delete()
+        terms = []
+        for question_id, (text, choices) in documents.items():
+            weights = Counter()
+            for token in tokenize(text):
+                weights[token] += QUESTION_TEXT_WEIGHT
+            weights.update(tokenize(choices))
+            terms.extend(
+                SearchTerm(question_id=question_id, term=term, weight=weight) for term, weight in weights.items()
+            )
+        SearchTerm.objects.bulk_create(terms, batch_size=1000)
+
+    def remove(self, question_ids):
+        SearchTerm.objects.filter(question_id__in=question_ids).delete()
+
+    def clear(self):
+        SearchTerm.objects.all().delete()
+
+    def search(self, terms, limit, offset):
+        matches_any_term = Q()
+        questions = Question.objects.all()
+        for term in terms:
+            matches_any_term |= Q(term__startswith=term)
+            questions = questions.filter(
+                Exists(SearchTerm.objects.filter(question=OuterRef('pk'), term__startswith=term))
+            )
+        rank = SearchTerm.objects.filter(matches_any_term, question=OuterRef('pk')).values('question').annotate(
+            rank=Sum('weight')
+        ).values('rank')
+        total = questions.count()
+        page = questions.annotate(rank=Subquery(rank)).order_by('-rank', 'id')[offset:offset + limit]
+        return total, list(page.values_list('id', flat=True))
+
+
+_mysql_backend = None
+
+
+def get_search_backend():
+    global _mysql_backend
+    if connection.vendor == 'sqlite':
+        return SQLiteFTS5Backend()
+    if connection.vendor == 'mysql':
+        # Kept, so the server's index limits are read once per process
+        if _mysql_backend is None:
+            _mysql_backend = MySQLFulltextBackend()
+        return _mysql_backend
+    return InvertedIndexBackend()
+
+
+def index_questions(question_ids):
+    """(Re-)indexes the given questions; ids of deleted questions are dropped from the index."""
+    question_ids = set(question_ids)
+    if not question_ids:
+        return
+    backend = get_search_backend()
+    documents = load_documents(question_ids)
+    backend.remove(question_ids - documents.keys())
+    backend.replace(documents)
+
+
+def remove_questions(question_ids):
+    get_search_backend().remove(list(question_ids))
+
+
+def rebuild_index(chunk_size=1000):
+    """Rebuilds the whole index, in chunks of questions. Returns the number of indexed questions."""
+    backend = get_search_backend()
+    backend.clear()
+    indexed = 0
+    question_ids = list(Question.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(question_ids), chunk_size):
+        documents = load_documents(question_ids[start:start + chunk_size])
+        backend.replace(documents)
+        indexed += len(documents)
+    return indexed
+
+
+def search_questions(query, limit, offset=0):
+    """
+    Returns (total, question_ids) of the questions matching every term of the query,
+    best match first. An empty query matches nothing.
+    """
+    terms = query_terms(query)
+    if not terms:
+        return 0, []
+    return get_search_backend().search(terms, limit, offset)
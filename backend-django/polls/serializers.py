@@ -29,7 +29,10 @@ def serialize_question_with_choices_admin(admin_question_obj: Question) -> Quest
     the rest.
     """
     
-    question_with_choices = Question.objects.prefetch_related("choice_set").get(id=admin_question_obj.id)
+    # Reuse choices prefetched by the caller (e.g. a dashboard page) instead of querying per question
+    question_with_choices = admin_question_obj
+    if not hasattr(admin_question_obj, "_prefetched_objects_cache") or "choice_set" not in admin_question_obj._prefetched_objects_cache:
+        question_with_choices = Question.objects.prefetch_related("choice_set").get(id=admin_question_obj.id)
     
     question_data = {
         "id": question_with_choices.id,
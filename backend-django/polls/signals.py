@@ -1,7 +1,18 @@
-from django.db.models.signals import post_save
+import functools
+
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save, pre_delete
 from django.dispatch import receiver
 from django.contrib.auth.models import User
-from .models import UserProfile
+from .models import Choice, PollStatus, Question, UserProfile, UserVote, VoterSketch
+from .bitmaps import update_bitmaps
+from .frozen import discard_frozen_results, reset_frozen_results
+from .hll import question_sketch_key
+from .permissions import invalidate_admin_status
+from .results import drop_question_results, publish_results, refresh_question_results
+from .search import index_questions, remove_questions
+from .user_info import invalidate_user_info
+from .versioning import CATALOG, VOTES, catalog_changed, in_batched_writes, mark_changed, votes_changed
 
 @receiver(post_save, sender=User)
 def create_user_profile(sender, instance, created, **kwargs):
@@ -42,3 +53,209 @@ def save_user_profile(sender, instance, created, **kwargs):
             is_admin=False
         )
         print(f"✅ Created missing UserProfile for user: {instance.username}")
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def invalidate_cached_admin_status(sender, instance, **kwargs):
+    """
+    Drop the cached admin status of the profile's user (see polls.permissions).
+    Dropped again on commit, in case a concurrent request re-cached the old value meanwhile.
+    """
+    invalidate_admin_status(instance.user_id)
+    transaction.on_commit(lambda: invalidate_admin_status(instance.user_id))
+
+
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+@receiver(post_save, sender=UserVote)
+def invalidate_cached_user_info(sender, instance, **kwargs):
+    """Drop the cached user_info payload of the profile's or ballot's user (see polls.user_info)."""
+    invalidate_user_info([instance.user_id])
+
+
+def per_row(receiver_function):
+    """
+    For receivers of per-row question and choice signals: does nothing within
+    versioning.batched_writes(), whose caller reports the whole batch instead.
+    """
+    @functools.wraps(receiver_function)
+    def wrapper(*args, **kwargs):
+        if not in_batched_writes():
+            receiver_function(*args, **kwargs)
+    return wrapper
+
+
+def deleted_with_question(origin):
+    """
+    True for the choices deleted along with their question (`origin` being the question,
+    or a queryset of questions): the question's own receivers cover them, once.
+    """
+    return isinstance(origin, Question) or getattr(origin, 'model', None) is Question
+
+
+@receiver(pre_delete, sender=Question)
+@receiver(pre_delete, sender=Choice)
+@per_row
+def invalidate_cached_user_info_of_voters(sender, instance, origin=None, **kwargs):
+    # UserVote has no delete receivers, so that its rows can be deleted in bulk without
+    # fetching them: ballots are dropped with their question or choice (here), or by
+    # code that invalidates their voters itself (the vote view, polls.bulk_operations)
+    if sender is Choice and deleted_with_question(origin):
+        return
+    lookup = 'question' if sender is Question else 'choice'
+    invalidate_user_info(UserVote.objects.filter(**{lookup: instance}).values_list('user_id', flat=True))
+
+
+@receiver(post_save, sender=User)
+def invalidate_cached_user_info_on_user_change(sender, instance, **kwargs):
+    invalidate_user_info([instance.pk])
+
+
+# --- Cache versions (see polls.versioning) ---
+
+@receiver(catalog_changed)
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=Choice)
+@per_row
+def bump_catalog_version(sender, **kwargs):
+    mark_changed(CATALOG)
+
+
+@receiver(votes_changed)
+@receiver(post_save, sender=UserVote)
+def bump_votes_version(sender, **kwargs):
+    mark_changed(VOTES)
+
+
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=Choice)
+@per_row
+def bump_versions_on_catalog_delete(sender, origin=None, **kwargs):
+    # Deleting questions or choices also cascades to their ballots
+    if sender is Choice and deleted_with_question(origin):
+        return
+    mark_changed(CATALOG, VOTES)
+
+
+@receiver(post_delete, sender=User)
+def bump_votes_version_on_user_delete(sender, **kwargs):
+    # A deleted user's ballots are cascade-deleted without signals
+    mark_changed(VOTES)
+
+
+# --- Frozen results of a closed poll (see polls.frozen) ---
+
+@receiver(catalog_changed)
+@receiver(votes_changed)
+@receiver(post_save, sender=Question)
+@receiver(post_save, sender=Choice)
+@receiver(post_save, sender=UserVote)
+@receiver(post_delete, sender=Question)
+@receiver(post_delete, sender=Choice)
+@receiver(post_delete, sender=User)
+@per_row
+def discard_changed_frozen_results(sender, origin=None, **kwargs):
+    if sender is Choice and deleted_with_question(origin):
+        return
+    discard_frozen_results()
+
+
+@receiver(post_save, sender=PollStatus)
+def reset_frozen_results_on_poll_status_change(sender, **kwargs):
+    reset_frozen_results()
+
+
+@receiver(pre_delete, sender=User)
+def remove_user_from_voter_bitmaps(sender, instance, **kwargs):
+    # Before their ballots are cascade-deleted (without signals), while they can still be read
+    choice_ids = UserVote.objects.filter(user=instance).values_list('choice_id', flat=True)
+    update_bitmaps({}, {choice_id: [instance.pk] for choice_id in choice_ids})
+
+
+@receiver(post_delete, sender=Question)
+@per_row
+def delete_question_voter_sketch(sender, instance, **kwargs):
+    VoterSketch.objects.filter(key=question_sketch_key(instance.pk)).delete()
+
+
+# --- Full-text search index (see polls.search) ---
+
+@receiver(post_save, sender=Question)
+@per_row
+def index_saved_question(sender, instance, **kwargs):
+    index_questions([instance.pk])
+
+
+@receiver(post_save, sender=Choice)
+@per_row
+def index_saved_choice(sender, instance, update_fields=None, **kwargs):
+    # Vote counter updates don't change the indexed text
+    if update_fields is not None and 'choice_text' not in update_fields:
+        return
+    index_questions([instance.question_id])
+
+
+@receiver(post_delete, sender=Choice)
+@per_row
+def index_deleted_choice(sender, instance, origin=None, **kwargs):
+    # A deleted question is removed from the index once by remove_deleted_question
+    if deleted_with_question(origin):
+        return
+    index_questions([instance.question_id])
+
+
+@receiver(post_delete, sender=Question)
+@per_row
+def remove_deleted_question(sender, instance, **kwargs):
+    remove_questions([instance.pk])
+
+
+@receiver(catalog_changed)
+def index_changed_questions(sender, question_ids=(), **kwargs):
+    index_questions(question_ids)
+
+
+# --- Materialized results (see polls.results) ---
+
+@receiver(post_save, sender=Question)
+@per_row
+def refresh_saved_question_results(sender, instance, **kwargs):
+    refresh_question_results([instance.pk])
+
+
+@receiver(post_save, sender=Choice)
+@per_row
+def refresh_saved_choice_results(sender, instance, update_fields=None, **kwargs):
+    # Vote counter saves are followed by votes_changed for the whole submission
+    if update_fields is not None and set(update_fields) == {'votes'}:
+        return
+    refresh_question_results([instance.question_id])
+
+
+@receiver(post_delete, sender=Choice)
+@per_row
+def refresh_deleted_choice_results(sender, instance, origin=None, **kwargs):
+    # A deleted question's row is dropped once by delete_question_results
+    if deleted_with_question(origin):
+        return
+    refresh_question_results([instance.question_id])
+
+
+@receiver(post_delete, sender=Question)
+@per_row
+def delete_question_results(sender, instance, **kwargs):
+    drop_question_results([instance.pk])
+
+
+@receiver(catalog_changed)
+@receiver(votes_changed)
+def refresh_changed_results(sender, question_ids=(), **kwargs):
+    refresh_question_results(question_ids)
+
+
+@receiver(votes_changed)
+def publish_changed_results(sender, question_ids=(), **kwargs):
+    # Once committed, so live viewers never see counts that are rolled back
+    question_ids = list(question_ids)
+    if question_ids:
+        transaction.on_commit(lambda: publish_results(question_ids))
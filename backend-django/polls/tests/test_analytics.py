@@ -0,0 +1,123 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from polls import analytics
+from polls.analytics import BallotMatrix, get_ballot_matrix
+from polls.models import UserVote
+from polls.tests.utils import (
+    create_question_with_choices,
+    create_test_user_with_profile,
+)
+
+
+class TestCrosstab(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin, _profile = create_test_user_with_profile(
+            username='admin', email='admin@example.com', google_email='admin@gmail.com', is_admin=True
+        )
+        self.client.force_authenticate(user=admin)
+        self.url = reverse('admin_crosstab')
+
+        self.food = create_question_with_choices(question_text="Food?", days=-1, choice_texts=["Pizza", "Sushi"])
+        self.pet = create_question_with_choices(question_text="Pet?", days=-1, choice_texts=["Dog", "Cat", "Fish"])
+        self.drink = create_question_with_choices(question_text="Drink?", days=-1, choice_texts=["Tea", "Coffee"])
+        pizza, sushi = self.food.choice_set.order_by('id')
+        dog, cat, _fish = self.pet.choice_set.order_by('id')
+        tea, _coffee = self.drink.choice_set.order_by('id')
+        ballots = {
+            'ann': [pizza, dog, tea],
+            'bob': [pizza, dog],
+            'cid': [pizza, cat],
+            'dee': [sushi, cat],
+            'eve': [pizza],
+        }
+        for username, choices in ballots.items():
+            user = User.objects.create(username=username, email=f'{username}@example.com')
+            UserVote.objects.bulk_create(UserVote(user=user, question=c.question, choice=c) for c in choices)
+
+    def test_crosstab_counts_and_shares(self):
+        """
+        Tests the contingency matrix of two questions and the share of each row among those who answered both.
+        """
+        response = self.client.get(self.url, {'q1': self.food.id, 'q2': self.pet.id})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['respondents'], 4)
+        self.assertEqual(response.data['counts'], [[2, 1, 0], [0, 1, 0]])
+        self.assertEqual(response.data['row_percentages'], [[66.67, 33.33, 0.0], [0.0, 100.0, 0.0]])
+        self.assertEqual([c['choice_text'] for c in response.data['questions'][self.pet.id]], ["Dog", "Cat", "Fish"])
+
+    def test_all_pairs_match_single_crosstabs(self):
+        """
+        Tests that the all-pairs mode returns every pair, each equal to its single crosstab.
+        """
+        response = self.client.get(self.url, {'pairs': 'all'})
+
+        pairs = {(pair['q1'], pair['q2']): pair['counts'] for pair in response.data['pairs']}
+        self.assertEqual(len(pairs), 3)
+        matrix = get_ballot_matrix()
+        for (first_id, second_id), counts in pairs.items():
+            self.assertEqual(counts, matrix.crosstab(first_id, second_id).tolist())
+        self.assertEqual(pairs[self.food.id, self.drink.id], [[1, 0], [0, 0]])
+
+    def test_all_pairs_are_chunked_consistently(self):
+        """
+        Tests that accumulating the counts over small chunks of voters gives the same result.
+        """
+        matrix = BallotMatrix.load()
+        question_ids = [self.food.id, self.pet.id, self.drink.id]
+        whole = [counts.tolist() for _q1, _q2, counts in matrix.all_crosstabs(question_ids)]
+        chunked = [counts.tolist() for _q1, _q2, counts in matrix.all_crosstabs(question_ids, chunk_size=2)]
+        self.assertEqual(whole, chunked)
+
+    def test_matrix_is_reloaded_after_votes_change(self):
+        """
+        Tests that the cached matrix is reused until the vote version changes.
+        """
+        matrix = get_ballot_matrix()
+        self.assertIs(get_ballot_matrix(), matrix)
+
+        user = User.objects.create(username='fay', email='fay@example.com')
+        UserVote.objects.create(user=user, question=self.food, choice=self.food.choice_set.first())
+        self.assertIsNot(get_ballot_matrix(), matrix)
+        self.assertEqual(get_ballot_matrix().voter_count, 6)
+
+    def test_matrix_is_reloaded_once_older_than_max_age(self):
+        """
+        Tests that the cached matrix is reloaded after BALLOT_MATRIX_MAX_AGE even if no version changed,
+        as when the votes were cast in a process that doesn't share the cache.
+        """
+        matrix = get_ballot_matrix()
+        self.assertIs(get_ballot_matrix(), matrix)
+        with self.settings(BALLOT_MATRIX_MAX_AGE=0):
+            self.assertIsNot(get_ballot_matrix(), matrix)
+
+    def test_matrix_is_loaded_outside_the_lock(self):
+        """
+        Tests that loading a new matrix doesn't hold the lock that readers take.
+        """
+        load = BallotMatrix.load
+
+        def load_unlocked():
+            self.assertFalse(analytics._matrix_lock.locked())
+            return load()
+
+        get_ballot_matrix()
+        user = User.objects.create(username='fay', email='fay@example.com')
+        UserVote.objects.create(user=user, question=self.food, choice=self.food.choice_set.first())
+        with patch.object(BallotMatrix, 'load', side_effect=load_unlocked) as patched:
+            self.assertEqual(get_ballot_matrix().voter_count, 6)
+        patched.assert_called_once()
+
+    def test_invalid_requests(self):
+        """
+        Tests the errors for missing parameters and unknown questions.
+        """
+        self.assertEqual(self.client.get(self.url, {'q1': self.food.id}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'q1': self.food.id, 'q2': 999999}).status_code, 404)
+        self.assertEqual(self.client.get(self.url, {'pairs': 'all', 'questions': 'x'}).status_code, 400)
@@ -0,0 +1,122 @@
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from polls.bitmaps import bitmap_of, decode_bitmap, encode_bitmap, load_bitmaps
+from polls.models import ChoiceVoterBitmap, UserVote
+from polls.tests.utils import (
+    create_question_with_choices,
+    create_test_user_with_profile,
+    make_json_post_request,
+)
+
+
+class TestVoterBitmaps(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.food = create_question_with_choices(question_text="Food?", days=-1, choice_texts=["Pizza", "Sushi"])
+        self.pet = create_question_with_choices(question_text="Pet?", days=-1, choice_texts=["Dog", "Cat"])
+        self.pizza, self.sushi = self.food.choice_set.order_by('id')
+        self.dog, self.cat = self.pet.choice_set.order_by('id')
+        self.users = {}
+        for username in ['ann', 'bob', 'cid']:
+            self.users[username], _profile = create_test_user_with_profile(
+                username=username, email=f'{username}@example.com', google_email=f'{username}@gmail.com'
+            )
+
+    def vote(self, username, choices):
+        self.client.force_authenticate(user=self.users[username])
+        response = make_json_post_request(
+            self.client, reverse('polls:vote'), {'votes': {choice.question_id: choice.id for choice in choices}}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def voters(self, choice):
+        return decode_bitmap(ChoiceVoterBitmap.objects.get(choice=choice).bits)
+
+    def test_encoding_round_trips_sparse_ids(self):
+        """
+        Tests that a bitmap of far-apart user ids is stored compactly and decoded unchanged.
+        """
+        bits = bitmap_of([3, 70_000, 1_000_000])
+        data = encode_bitmap(bits)
+        self.assertEqual(decode_bitmap(data), bits)
+        self.assertLess(len(data), 1_000)
+        self.assertEqual(decode_bitmap(encode_bitmap(0)), 0)
+
+    def test_votes_update_bitmaps_incrementally(self):
+        """
+        Tests that votes set bits, changed votes move them, and re-voting the same choice keeps them.
+        """
+        self.vote('ann', [self.pizza, self.dog])
+        self.vote('bob', [self.pizza])
+        self.assertEqual(self.voters(self.pizza), bitmap_of([self.users['ann'].id, self.users['bob'].id]))
+
+        self.vote('ann', [self.sushi, self.dog])
+        self.assertEqual(self.voters(self.pizza), bitmap_of([self.users['bob'].id]))
+        self.assertEqual(self.voters(self.sushi), bitmap_of([self.users['ann'].id]))
+        self.assertEqual(self.voters(self.dog), bitmap_of([self.users['ann'].id]))
+        self.assertEqual(ChoiceVoterBitmap.objects.get(choice=self.dog).voter_count, 1)
+
+    def test_missing_bitmaps_are_built_from_ballots(self):
+        """
+        Tests that a bitmap is built from UserVote when it doesn't exist yet, and that deleted users are removed.
+        """
+        for username in ['ann', 'cid']:
+            UserVote.objects.create(user=self.users[username], question=self.pet, choice=self.cat)
+        ChoiceVoterBitmap.objects.all().delete()
+
+        self.assertEqual(load_bitmaps([self.cat.id]), {self.cat.id: bitmap_of([self.users['ann'].id, self.users['cid'].id])})
+
+        self.users['cid'].delete()
+        self.assertEqual(self.voters(self.cat), bitmap_of([self.users['ann'].id]))
+
+
+class TestAdminSegment(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        admin, _profile = create_test_user_with_profile(
+            username='admin', email='admin@example.com', google_email='admin@gmail.com', is_admin=True
+        )
+        self.client.force_authenticate(user=admin)
+        self.url = reverse('admin_segment')
+
+        self.food = create_question_with_choices(question_text="Food?", days=-1, choice_texts=["Pizza", "Sushi"])
+        self.pet = create_question_with_choices(question_text="Pet?", days=-1, choice_texts=["Dog", "Cat"])
+        self.pizza, self.sushi = self.food.choice_set.order_by('id')
+        self.dog, self.cat = self.pet.choice_set.order_by('id')
+        ballots = {'ann': [self.pizza, self.dog], 'bob': [self.pizza, self.cat], 'cid': [self.sushi], 'dee': [self.dog]}
+        for username, choices in ballots.items():
+            user = User.objects.create(username=username, email=f'{username}@example.com')
+            UserVote.objects.bulk_create(UserVote(user=user, question=c.question, choice=c) for c in choices)
+
+    def test_segment_counts(self):
+        """
+        Tests counts for chosen choices, answered questions and skipped questions.
+        """
+        def count(**params):
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 200)
+            return response.data['voters']
+
+        self.assertEqual(count(chose=f'{self.pizza.id},{self.dog.id}'), 1)
+        self.assertEqual(count(answered=f'{self.food.id},{self.pet.id}'), 2)
+        self.assertEqual(count(skipped=self.pet.id), 1)
+        self.assertEqual(count(answered=self.pet.id, skipped=self.food.id), 1)
+
+    def test_segment_breakdown(self):
+        """
+        Tests how the voters who chose Pizza split on the pet question.
+        """
+        response = self.client.get(self.url, {'chose': self.pizza.id, 'breakdown': self.pet.id})
+        self.assertEqual(response.data['breakdown']['choices'], [
+            {'id': self.dog.id, 'voters': 1}, {'id': self.cat.id, 'voters': 1}
+        ])
+
+    def test_segment_requires_a_criterion(self):
+        """
+        Tests that a request without criteria, or with malformed ids, is rejected.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'chose': 'pizza'}).status_code, 400)
@@ -0,0 +1,246 @@
+import threading
+import time
+
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from polls.caching import get_or_refresh
+from polls.tests.utils import (
+    SharedCacheProxy,
+    create_question_with_choices,
+    create_test_user_with_profile,
+    make_json_post_request,
+)
+
+
+class TestGuestCachePolicy(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.question = create_question_with_choices(
+            question_text="Cached question",
+            days=-1,
+            choice_texts=["A", "B"]
+        )
+        self.guest_urls = [
+            reverse('polls:client_poll_list'),
+            reverse('polls:client_poll_detail', args=[self.question.id]),
+            reverse('summary'),
+            reverse('polls:poll_closure'),
+        ]
+
+    def test_guest_responses_are_publicly_cacheable(self):
+        """
+        Tests that guest GET responses carry a shared-cache policy and vary on Cookie.
+        """
+        for url in self.guest_urls:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200, url)
+            cache_control = response.headers['Cache-Control']
+            self.assertIn('public', cache_control, url)
+            self.assertIn('s-maxage=', cache_control, url)
+            self.assertIn('stale-while-revalidate=', cache_control, url)
+            self.assertIn('Cookie', response.headers['Vary'], url)
+
+    def test_guest_responses_do_not_write_the_session(self):
+        """
+        Tests that a guest with an existing session gets no Set-Cookie back,
+        even though the session is due for a refresh.
+        """
+        session = self.client.session
+        session['visited'] = True
+        session.save()
+        self.client.cookies['sessionid'] = session.session_key
+
+        for url in self.guest_urls:
+            response = self.client.get(url)
+            self.assertNotIn('sessionid', response.cookies, url)
+
+    def test_authenticated_responses_stay_private(self):
+        """
+        Tests that logged-in users get private responses.
+        """
+        user, _profile = create_test_user_with_profile()
+        self.client.force_login(user)
+
+        for url in self.guest_urls:
+            response = self.client.get(url)
+            cache_control = response.headers['Cache-Control']
+            self.assertIn('private', cache_control, url)
+            self.assertNotIn('public', cache_control, url)
+
+    def test_missing_question_is_not_publicly_cached(self):
+        """
+        Tests that error responses are never marked public.
+        """
+        response = self.client.get(reverse('polls:client_poll_detail', args=[9999]))
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('public', response.headers.get('Cache-Control', ''))
+
+    def test_unsafe_methods_are_not_cached(self):
+        """
+        Tests that POST on a guest-cacheable view keeps no shared-cache headers.
+        """
+        response = make_json_post_request(self.client, reverse('polls:poll_closure'), {})
+        self.assertNotIn('public', response.headers.get('Cache-Control', ''))
+
+
+class TestSharedCacheAbsorbsGuestTraffic(TestCase):
+    def setUp(self):
+        create_question_with_choices(
+            question_text="Popular question",
+            days=-1,
+            choice_texts=["A", "B"]
+        )
+        self.url = reverse('polls:client_poll_list')
+
+    def test_guest_traffic_is_served_by_the_proxy(self):
+        """
+        Tests that repeated guest requests reach the origin only once.
+        """
+        proxy = SharedCacheProxy(Client())
+        for _ in range(20):
+            response = proxy.get(self.url)
+            self.assertEqual(response.status_code, 200)
+        self.assertEqual(proxy.origin_hits, 1)
+
+    def test_authenticated_traffic_bypasses_the_proxy(self):
+        """
+        Tests that the proxy never stores or serves responses for logged-in users.
+        """
+        user, _profile = create_test_user_with_profile()
+        client = Client()
+        client.force_login(user)
+        proxy = SharedCacheProxy(client)
+        for _ in range(3):
+            proxy.get(self.url)
+        self.assertEqual(proxy.origin_hits, 3)
+
+    def test_guest_copy_is_not_served_to_logged_in_user(self):
+        """
+        Tests that Vary: Cookie keeps a cached guest response away from a user with a session.
+        """
+        client = Client()
+        proxy = SharedCacheProxy(client)
+        proxy.get(self.url)
+
+        user, _profile = create_test_user_with_profile()
+        client.force_login(user)
+        response = proxy.get(self.url)
+        self.assertEqual(proxy.origin_hits, 2)
+        self.assertIn('private', response.headers['Cache-Control'])
+
+
+class TestSingleFlightRefresh(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.calls = 0
+
+    def compute(self, value='fresh', delay=0):
+        def compute():
+            self.calls += 1
+            time.sleep(delay)
+            return value
+        return compute
+
+    def test_stale_value_is_served_while_another_worker_refreshes(self):
+        """
+        Tests that an outdated entry is returned as-is while the refresh lock is held elsewhere.
+        """
+        get_or_refresh('key', self.compute('old'), timeout=60, stale_timeout=60, version=1)
+        cache.add('key:refresh-lock', True)
+
+        self.assertEqual(get_or_refresh('key', self.compute('new'), timeout=60, stale_timeout=60, version=2), 'old')
+        self.assertEqual(self.calls, 1)
+
+        cache.delete('key:refresh-lock')
+        self.assertEqual(get_or_refresh('key', self.compute('new'), timeout=60, stale_timeout=60, version=2), 'new')
+
+    def test_expired_entry_is_rebuilt_by_a_single_worker(self):
+        """
+        Tests that concurrent requests for an expired entry trigger one rebuild and are all answered.
+        """
+        # Expires as soon as it is stored
+        get_or_refresh('key', self.compute('old'), timeout=0, stale_timeout=60)
+        self.calls = 0
+        results = []
+
+        def request():
+            results.append(get_or_refresh('key', self.compute('new', delay=0.2), timeout=60, stale_timeout=60))
+
+        threads = [threading.Thread(target=request) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(len(results), 10)
+        self.assertEqual(set(results) - {'old'}, {'new'})
+
+    def test_cold_requests_wait_for_the_rebuild(self):
+        """
+        Tests that requests finding no entry wait for the worker that is computing it.
+        """
+        results = []
+
+        def request():
+            results.append(get_or_refresh('key', self.compute('value', delay=0.2), timeout=60, stale_timeout=60))
+
+        threads = [threading.Thread(target=request) for _ in range(5)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.calls, 1)
+        self.assertEqual(results, ['value'] * 5)
+
+
+class TestResultsSummaryCache(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.question = create_question_with_choices(question_text="Published", days=-1, choice_texts=["A", "B"])
+        create_question_with_choices(question_text="Scheduled", days=3, choice_texts=["C"])
+
+    def test_guest_flood_reads_the_summary_once(self):
+        """
+        Tests that a burst of guest summary requests costs one database query.
+        """
+        # Caches the poll status (open), looked up once per cache lifetime (see polls.frozen)
+        self.client.get(reverse('polls:client_poll_list'))
+        with self.assertNumQueries(1):
+            for _ in range(25):
+                response = self.client.get(reverse('summary'))
+                self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['total_questions'], 1)
+
+    def test_summary_is_rebuilt_after_a_vote(self):
+        """
+        Tests that a vote changes the cache version, so the next request sees the new count.
+        """
+        self.client.get(reverse('summary'))
+
+        voter, _profile = create_test_user_with_profile(username='voter', google_email='voter@gmail.com')
+        self.client.force_login(voter)
+        choice = self.question.choice_set.first()
+        make_json_post_request(self.client, reverse('polls:vote'), {'votes': {self.question.id: choice.id}})
+        self.client.logout()
+
+        self.assertEqual(self.client.get(reverse('summary')).json()['total_votes_all_questions'], 1)
+
+    def test_admin_and_public_summaries_are_cached_separately(self):
+        """
+        Tests that a cached public summary is never served to an admin, or the other way around.
+        """
+        self.assertEqual(self.client.get(reverse('summary')).json()['total_questions'], 1)
+
+        admin, _profile = create_test_user_with_profile(
+            username='admin', email='admin@example.com', google_email='admin@gmail.com', is_admin=True
+        )
+        self.client.force_login(admin)
+        self.assertEqual(self.client.get(reverse('summary')).json()['total_questions'], 2)
+
+        self.client.logout()
+        self.assertEqual(self.client.get(reverse('summary')).json()['total_questions'], 1)
@@ -0,0 +1,268 @@
+import csv
+import gzip
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import tempfile
+from itertools import pairwise
+
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from polls.exporting import (
+    BALLOT_COLUMNS,
+    MANIFEST_FILENAME,
+    RESULTS_COLUMNS,
+    encode_rows,
+    export_ballots_sharded,
+    iter_results_rows,
+    plan_ballot_shards,
+    stream_export,
+)
+from polls.models import UserVote
+from polls.tests.utils import (
+    create_question_with_choices,
+    create_test_user_with_profile,
+    create_user_vote,
+)
+
+
+class ExportDataMixin:
+    def create_export_data(self):
+        self.question = create_question_with_choices(
+            question_text="Favorite color?",
+            days=-2,
+            choice_texts=["Red", "Blue"]
+        )
+        self.red, self.blue = self.question.choice_set.order_by('id')
+        self.red.votes = 3
+        self.red.save()
+        self.blue.votes = 1
+        self.blue.save()
+        self.choiceless = create_question_with_choices(
+            question_text="Choiceless question",
+            days=-1,
+            choice_texts=[]
+        )
+        self.voter, _profile = create_test_user_with_profile(username='voter', google_email='voter@gmail.com')
+        create_user_vote(user=self.voter, question=self.question, choice=self.red)
+
+
+class TestExportRows(ExportDataMixin, TestCase):
+    def setUp(self):
+        self.create_export_data()
+
+    def test_results_rows_include_percentages_and_choiceless_questions(self):
+        """
+        Tests that result rows carry per-choice percentages and question totals.
+        """
+        rows = [dict(zip(RESULTS_COLUMNS, row)) for row in iter_results_rows()]
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual((rows[0]['choice_text'], rows[0]['percentage'], rows[0]['total_votes']), ("Red", 75.0, 4))
+        self.assertEqual((rows[1]['choice_text'], rows[1]['percentage']), ("Blue", 25.0))
+        self.assertEqual(rows[2]['question_id'], self.choiceless.id)
+        self.assertIsNone(rows[2]['choice_id'])
+
+    def test_results_rows_come_from_one_query(self):
+        """
+        Tests that results are read with a single ordered join.
+        """
+        with self.assertNumQueries(1):
+            list(iter_results_rows())
+
+    def test_encode_rows_batches_output(self):
+        """
+        Tests that encoded output is yielded in batches rather than all at once.
+        """
+        rows = ((i, f"text {i}") for i in range(1200))
+        chunks = list(encode_rows(rows, ('id', 'text'), 'csv'))
+
+        self.assertEqual(len(chunks), 3)
+        self.assertEqual(len(list(csv.reader(io.StringIO("".join(chunks))))), 1201)
+
+
+class TestAdminExport(ExportDataMixin, TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('admin_export')
+        self.admin_user, self.admin_profile = create_test_user_with_profile(
+            username='admin',
+            email='admin@example.com',
+            google_email='admin@gmail.com',
+            is_admin=True
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.create_export_data()
+
+    def test_export_results_as_csv(self):
+        """
+        Tests that the default export streams results as CSV.
+        """
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertIn('poll-results.csv', response['Content-Disposition'])
+        rows = list(csv.DictReader(io.StringIO(b"".join(response.streaming_content).decode())))
+        self.assertEqual([row['choice_text'] for row in rows], ["Red", "Blue", ""])
+
+    def test_export_ballots_as_gzipped_ndjson(self):
+        """
+        Tests that ballots can be exported as NDJSON and gzip-compressed.
+        """
+        response = self.client.get(self.url, {'format': 'ndjson', 'dataset': 'ballots', 'compress': 'gzip'})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        lines = gzip.decompress(b"".join(response.streaming_content)).decode().splitlines()
+        ballot = json.loads(lines[0])
+        self.assertEqual(len(lines), 1)
+        self.assertEqual(set(ballot), set(BALLOT_COLUMNS))
+        self.assertEqual(ballot['choice_text'], "Red")
+        self.assertEqual(ballot['user_id'], self.voter.id)
+
+    def test_export_rejects_unknown_format(self):
+        """
+        Tests that unknown formats and datasets return 400 Bad Request.
+        """
+        self.assertEqual(self.client.get(self.url, {'format': 'xml'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'dataset': 'users'}).status_code, 400)
+
+    def test_export_requires_admin(self):
+        """
+        Tests that regular users get 403 Forbidden.
+        """
+        self.client.force_authenticate(user=self.voter)
+        self.assertEqual(self.client.get(self.url).status_code, 403)
+
+
+class TestExportResultsCommand(ExportDataMixin, TestCase):
+    def setUp(self):
+        self.create_export_data()
+
+    def test_command_writes_export_file(self):
+        """
+        Tests that the management command writes a (compressed) export file.
+        """
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'results.csv.gz')
+            call_command('export_results', '--output', path, '--gzip', stderr=io.StringIO())
+            with gzip.open(path, 'rt', newline='') as export_file:
+                rows = list(csv.DictReader(export_file))
+
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[0]['question_text'], "Favorite color?")
+
+
+class TestShardedBallotExport(ExportDataMixin, TestCase):
+    def setUp(self):
+        self.create_export_data()
+        for i in range(6):
+            user, _profile = create_test_user_with_profile(username=f'shard{i}', google_email=f'shard{i}@gmail.com')
+            create_user_vote(user=user, question=self.question, choice=self.blue if i % 2 else self.red)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_plan_splits_vote_ids_into_ranges(self):
+        """
+        Tests that shards cover the vote id range without gaps or overlaps.
+        """
+        ids = list(UserVote.objects.order_by('id').values_list('id', flat=True))
+        shards = plan_ballot_shards(shard_size=3)
+
+        self.assertEqual(len(shards), 3)
+        self.assertEqual(shards[0][0], ids[0])
+        self.assertEqual(shards[-1][1], ids[-1] + 1)
+        for (_start, end), (next_start, _end) in pairwise(shards):
+            self.assertEqual(end, next_start)
+
+    def test_parts_directory_has_manifest(self):
+        """
+        Tests that each shard is written to its own part file, described by the manifest.
+        """
+        manifest = export_ballots_sharded(self.directory, 'ndjson', workers=1, shard_size=3)
+
+        self.assertEqual(manifest['total_rows'], 7)
+        self.assertEqual([part['rows'] for part in manifest['parts']], [3, 3, 1])
+        with open(os.path.join(self.directory, MANIFEST_FILENAME)) as manifest_file:
+            self.assertEqual(json.load(manifest_file)['parts'], manifest['parts'])
+        with open(os.path.join(self.directory, manifest['parts'][0]['file'])) as part_file:
+            self.assertEqual(len(part_file.read().splitlines()), 3)
+
+    def test_stitched_output_matches_single_stream_export(self):
+        """
+        Tests that stitched shards are identical to the single-stream export, with one header.
+        """
+        path = os.path.join(self.directory, 'ballots.csv')
+        call_command('export_results', '--dataset', 'ballots', '--workers', '1', '--shard-size', '2',
+                     '--output', path, stderr=io.StringIO())
+
+        with open(path, 'rb') as export_file:
+            self.assertEqual(export_file.read(), b"".join(stream_export('ballots', 'csv')))
+        self.assertEqual(os.listdir(self.directory), ['ballots.csv'])
+
+    def test_stitched_gzip_output_is_one_readable_stream(self):
+        """
+        Tests that concatenated gzip parts decompress to the complete export.
+        """
+        path = os.path.join(self.directory, 'ballots.csv.gz')
+        call_command('export_results', '--dataset', 'ballots', '--workers', '1', '--shard-size', '2',
+                     '--gzip', '--output', path, stderr=io.StringIO())
+
+        with gzip.open(path, 'rt', newline='') as export_file:
+            rows = list(csv.DictReader(export_file))
+        self.assertEqual(len(rows), 7)
+
+    def test_parallel_export_rejects_results_dataset(self):
+        """
+        Tests that only the ballots dataset can be exported in parallel.
+        """
+        with self.assertRaises(CommandError):
+            call_command('export_results', '--workers', '2', '--output', os.path.join(self.directory, 'r.csv'))
+
+
+class TestParallelBallotExport(ExportDataMixin, TransactionTestCase):
+    """
+    Runs the export through the process pool. Workers read the ballots over their own
+    connections, so the data is committed (TransactionTestCase); an in-memory SQLite test
+    database only reaches them when they are forked from this process.
+    """
+
+    def setUp(self):
+        if connection.vendor == 'sqlite' and connection.is_in_memory_db() and (
+            multiprocessing.get_start_method() != 'fork'
+        ):
+            self.skipTest('Worker processes cannot reach an in-memory database unless forked')
+        self.create_export_data()
+        for i in range(6):
+            user, _profile = create_test_user_with_profile(username=f'worker{i}', google_email=f'worker{i}@gmail.com')
+            create_user_vote(user=user, question=self.question, choice=self.blue if i % 2 else self.red)
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+
+    def test_worker_processes_export_every_shard(self):
+        """
+        Tests that shards encoded by two worker processes stitch into the single-stream export.
+        """
+        path = os.path.join(self.directory, 'ballots.csv')
+        call_command('export_results', '--dataset', 'ballots', '--workers', '2', '--shard-size', '2',
+                     '--output', path, stderr=io.StringIO())
+
+        with open(path, 'rb') as export_file:
+            self.assertEqual(export_file.read(), b"".join(stream_export('ballots', 'csv')))
+
+    def test_worker_processes_write_the_manifest(self):
+        """
+        Tests that the manifest lists the parts of every worker, in shard order.
+        """
+        manifest = export_ballots_sharded(self.directory, 'ndjson', workers=2, shard_size=3)
+
+        self.assertEqual(manifest['total_rows'], 7)
+        self.assertEqual([part['index'] for part in manifest['parts']], [0, 1, 2])
+        self.assertEqual(sum(part['rows'] for part in manifest['parts']), 7)
@@ -0,0 +1,137 @@
+import os
+import time
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from polls.frozen import OPEN, POINTER_KEY
+from polls.models import PollStatus, UserVote
+from polls.tests.utils import (
+    create_question_with_choices,
+    create_test_user_with_profile,
+)
+
+
+class TestFrozenResults(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.main_admin, _profile = create_test_user_with_profile(
+            username='main', email='main@example.com', google_email='main@gmail.com', is_admin=True
+        )
+        self.voter, _profile = create_test_user_with_profile(username='voter', google_email='voter@gmail.com')
+        self.question = create_question_with_choices(question_text="Final?", days=-1, choice_texts=["Yes", "No"])
+        self.yes = self.question.choice_set.order_by('id').first()
+        UserVote.objects.create(user=self.voter, question=self.question, choice=self.yes)
+        self.yes.votes = 1
+        self.yes.save()
+
+    def close_poll(self):
+        self.client.force_authenticate(user=self.main_admin)
+        # The closure commits before freezing in production; in a test case its commit
+        # callbacks would run after, so they are left out
+        with patch.dict(os.environ, {'MAIN_ADMIN_EMAIL': 'main@gmail.com'}):
+            response = self.client.post(reverse('polls:poll_closure'))
+        self.assertEqual(response.status_code, 200)
+        self.client.force_authenticate(user=None)
+        return response.data['results_digest']
+
+    def test_closed_poll_is_served_without_queries(self):
+        """
+        Tests that, once closed, the summary and the poll list cost guests no database query.
+        """
+        digest = self.close_poll()
+
+        with self.assertNumQueries(0):
+            summary = self.client.get(reverse('summary'))
+            polls = self.client.get(reverse('polls:client_poll_list'))
+
+        self.assertEqual(summary.data['total_votes_all_questions'], 1)
+        self.assertEqual(summary['ETag'], f'"public-{digest}"')
+        self.assertIn(reverse('polls:frozen_results_summary', args=[digest]), summary['Link'])
+        self.assertEqual([q['id'] for q in polls.data['results']], [self.question.id])
+
+        not_modified = self.client.get(reverse('summary'), HTTP_IF_NONE_MATCH=summary['ETag'])
+        self.assertEqual(not_modified.status_code, 304)
+
+    def test_frozen_summary_url_is_immutable(self):
+        """
+        Tests that the content-addressed summary is cacheable forever and disappears on reopening.
+        """
+        digest = self.close_poll()
+        url = reverse('polls:frozen_results_summary', args=[digest])
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertIn('immutable', response['Cache-Control'])
+        self.assertIn('max-age=31536000', response['Cache-Control'])
+
+        self.client.force_authenticate(user=self.main_admin)
+        with patch.dict(os.environ, {'MAIN_ADMIN_EMAIL': 'main@gmail.com'}):
+            self.client.delete(reverse('polls:poll_closure'))
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+        # Open again: the summary is live
+        self.yes.votes = 5
+        self.yes.save()
+        self.assertEqual(self.client.get(reverse('summary')).data['total_votes_all_questions'], 5)
+
+    def test_user_votes_are_read_once_while_frozen(self):
+        """
+        Tests that a user's selections are served from the snapshot after the first request.
+        """
+        self.close_poll()
+        self.client.force_authenticate(user=self.voter)
+        self.client.get(reverse('polls:user_votes'))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('polls:user_votes'))
+        self.assertEqual(response.data['results'][0]['user_selected_choice_id'], self.yes.id)
+
+    def test_same_results_have_the_same_digest(self):
+        """
+        Tests that the snapshot is content-addressed: refreezing unchanged results gives the same digest,
+        and a change committed while closed (e.g. a late vote) gives a new one.
+        """
+        digest = self.close_poll()
+        self.assertEqual(self.close_poll(), digest)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.yes.votes = 2
+            self.yes.save()
+        response = self.client.get(reverse('summary'))
+        self.assertEqual(response.data['total_votes_all_questions'], 2)
+        self.assertNotEqual(response['ETag'], f'"public-{digest}"')
+        self.assertTrue(PollStatus.is_poll_closed())
+
+    def test_closure_freezes_despite_a_stale_open_pointer(self):
+        """
+        Tests that closing the poll freezes the results even if a concurrent reader
+        cached OPEN again after the closure reset the pointer.
+        """
+        with patch('polls.signals.reset_frozen_results'):
+            cache.set(POINTER_KEY, OPEN)
+            digest = self.close_poll()
+
+        self.assertEqual(self.client.get(reverse('summary'))['ETag'], f'"public-{digest}"')
+
+    def test_cached_poll_status_expires(self):
+        """
+        Tests that a process whose cache missed a reopening (e.g. a per-process cache)
+        serves the frozen results for POLL_STATUS_CACHE_TIMEOUT at most.
+        """
+        digest = self.close_poll()
+        url = reverse('polls:frozen_results_summary', args=[digest])
+        # Reopened, then voted on, through other processes
+        with patch('polls.signals.reset_frozen_results'), patch('polls.signals.discard_frozen_results'):
+            PollStatus.reopen_poll(self.main_admin)
+            self.yes.votes = 5
+            self.yes.save()
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        with patch('time.time', return_value=time.time() + 61):
+            self.assertEqual(self.client.get(url).status_code, 404)
+            self.assertEqual(self.client.get(reverse('summary')).data['total_votes_all_questions'], 5)
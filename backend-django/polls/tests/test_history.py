@@ -0,0 +1,167 @@
+import datetime
+import io
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from polls.bulk_operations import apply_bulk_operation
+from polls.history import compact_vote_history, record_vote_deltas
+from polls.models import VoteBucket
+from polls.tests.utils import (
+    create_question_with_choices,
+    create_test_user_with_profile,
+    make_json_post_request,
+)
+
+
+class VoteHistoryMixin:
+    def create_history_data(self):
+        self.question = create_question_with_choices(question_text="Tea or coffee?", days=-1, choice_texts=["Tea", "Coffee"])
+        self.tea, self.coffee = self.question.choice_set.order_by('id')
+
+    def buckets(self, resolution=VoteBucket.MINUTE):
+        return sorted(
+            VoteBucket.objects.filter(resolution=resolution).values_list('choice_id', 'bucket_start', 'delta'),
+            key=lambda row: (row[1], row[0])
+        )
+
+
+class TestVoteRecording(VoteHistoryMixin, TestCase):
+    def setUp(self):
+        self.create_history_data()
+        self.client = APIClient()
+        self.voter, _profile = create_test_user_with_profile(username='voter', google_email='voter@gmail.com')
+        self.client.force_authenticate(user=self.voter)
+
+    def vote(self, choice):
+        response = make_json_post_request(self.client, reverse('polls:vote'), {'votes': {self.question.id: choice.id}})
+        self.assertEqual(response.status_code, 200)
+
+    def test_submissions_record_net_changes(self):
+        """
+        Tests that a changed vote moves one vote between choices in the current minute bucket.
+        """
+        self.vote(self.tea)
+        self.vote(self.coffee)
+
+        deltas = dict(VoteBucket.objects.values_list('choice_id', 'delta'))
+        self.assertEqual(deltas, {self.tea.id: 0, self.coffee.id: 1})
+        self.assertEqual(VoteBucket.objects.get(choice=self.coffee).bucket_start.second, 0)
+
+    def test_unchanged_resubmission_records_nothing(self):
+        """
+        Tests that submitting the same ballot again leaves the history untouched.
+        """
+        self.vote(self.tea)
+        VoteBucket.objects.all().delete()
+        self.vote(self.tea)
+        self.assertFalse(VoteBucket.objects.exists())
+
+    def test_cleared_votes_are_recorded_as_a_drop(self):
+        """
+        Tests that clearing a question's votes in bulk adds the removed votes as negative changes.
+        """
+        self.vote(self.tea)
+        apply_bulk_operation('clear_votes', [self.question.id])
+        self.assertEqual(VoteBucket.objects.get(choice=self.tea).delta, 0)
+
+
+@override_settings(
+    VOTE_HISTORY_MINUTE_RETENTION_DAYS=1, VOTE_HISTORY_HOUR_RETENTION_DAYS=7, VOTE_HISTORY_DAY_RETENTION_DAYS=30
+)
+class TestVoteHistoryCompaction(VoteHistoryMixin, TestCase):
+    def setUp(self):
+        self.create_history_data()
+        self.now = timezone.make_aware(datetime.datetime(2026, 6, 15, 12, 30))
+
+    def test_compaction_rolls_up_and_expires_buckets(self):
+        """
+        Tests that old minutes become hours, old hours become days and expired days are dropped.
+        """
+        two_days_ago = self.now - datetime.timedelta(days=2)
+        record_vote_deltas({(self.question.id, self.tea.id): 2}, at=two_days_ago.replace(minute=5))
+        record_vote_deltas({(self.question.id, self.tea.id): 1}, at=two_days_ago.replace(minute=45))
+        record_vote_deltas({(self.question.id, self.coffee.id): 1}, at=self.now)
+        VoteBucket.objects.create(
+            question=self.question, choice=self.tea, resolution=VoteBucket.HOUR, delta=4,
+            bucket_start=(self.now - datetime.timedelta(days=10)).replace(minute=0)
+        )
+        VoteBucket.objects.create(
+            question=self.question, choice=self.tea, resolution=VoteBucket.DAY, delta=9,
+            bucket_start=self.now - datetime.timedelta(days=60)
+        )
+
+        compacted = compact_vote_history(now=self.now)
+
+        self.assertEqual(compacted, {'minute': 2, 'hour': 1, 'day': 1})
+        self.assertEqual(self.buckets(VoteBucket.MINUTE), [(self.coffee.id, self.now, 1)])
+        self.assertEqual(self.buckets(VoteBucket.HOUR), [(self.tea.id, two_days_ago.replace(minute=0), 3)])
+        day = timezone.localtime(self.now - datetime.timedelta(days=10)).replace(hour=0, minute=0)
+        self.assertEqual(self.buckets(VoteBucket.DAY), [(self.tea.id, day, 4)])
+
+    def test_compaction_adds_to_existing_rollups(self):
+        """
+        Tests that rolling up into an hour that already has a bucket adds to it, and that the command reports counts.
+        """
+        hour = (timezone.now() - datetime.timedelta(days=2)).replace(minute=0, second=0, microsecond=0)
+        VoteBucket.objects.create(
+            question=self.question, choice=self.tea, resolution=VoteBucket.HOUR, bucket_start=hour, delta=5
+        )
+        record_vote_deltas({(self.question.id, self.tea.id): -1}, at=hour)
+
+        out = io.StringIO()
+        call_command('compact_vote_history', stdout=out)
+
+        self.assertIn('Rolled up 1 minute', out.getvalue())
+        self.assertEqual(self.buckets(VoteBucket.HOUR), [(self.tea.id, hour, 4)])
+
+
+class TestAdminVoteHistory(VoteHistoryMixin, TestCase):
+    def setUp(self):
+        self.create_history_data()
+        self.client = APIClient()
+        admin, _profile = create_test_user_with_profile(
+            username='admin', email='admin@example.com', google_email='admin@gmail.com', is_admin=True
+        )
+        self.client.force_authenticate(user=admin)
+        self.url = reverse('admin_vote_history')
+
+    def test_history_is_summed_per_requested_resolution(self):
+        """
+        Tests that minute buckets are returned summed per hour, per choice.
+        """
+        start = timezone.make_aware(datetime.datetime(2026, 6, 15, 10, 0))
+        record_vote_deltas({(self.question.id, self.tea.id): 2}, at=start.replace(minute=10))
+        record_vote_deltas({(self.question.id, self.tea.id): -1, (self.question.id, self.coffee.id): 1},
+                           at=start.replace(minute=50))
+        record_vote_deltas({(self.question.id, self.tea.id): 1}, at=start.replace(hour=11))
+
+        response = self.client.get(self.url, {
+            'questions': self.question.id, 'resolution': 'hour',
+            'from': '2026-06-15T10:00:00', 'to': '2026-06-15T12:00:00',
+        })
+
+        self.assertEqual(response.status_code, 200)
+        series = {(s['question_id'], s['choice_id']): s['buckets'] for s in response.data['series']}
+        self.assertEqual(series[self.question.id, self.tea.id], [
+            {'start': start, 'votes': 1}, {'start': start.replace(hour=11), 'votes': 1}
+        ])
+        self.assertEqual(series[self.question.id, self.coffee.id], [{'start': start, 'votes': 1}])
+
+    def test_invalid_parameters_are_rejected(self):
+        """
+        Tests the errors for missing questions, unknown resolutions, bad dates and oversized ranges.
+        """
+        for params in [
+            {},
+            {'questions': self.question.id, 'resolution': 'second'},
+            {'questions': self.question.id, 'from': 'yesterday'},
+            {'questions': self.question.id, 'from': '2026-06-15', 'to': '2026-06-14'},
+            {'questions': self.question.id, 'resolution': 'minute', 'from': '2026-01-01', 'to': '2026-06-01'},
+        ]:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 400, params)
+            self.assertIn('error', response.data)
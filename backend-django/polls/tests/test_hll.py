@@ -0,0 +1,192 @@
+import io
+from importlib import import_module
+from unittest.mock import patch
+
+from django.apps import apps
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from polls.hll import (
+    GLOBAL_SKETCH_KEY,
+    VOTER_SKETCH_SHARDS,
+    HyperLogLog,
+    day_sketch_key,
+    estimate_voters,
+    question_sketch_key,
+)
+from polls.models import VoterSketch
+from polls.tests.utils import (
+    create_question_with_choices,
+    create_test_user_with_profile,
+    create_user_vote,
+    make_json_post_request,
+)
+
+
+class TestHyperLogLog(TestCase):
+    def test_estimate_is_close_to_cardinality(self):
+        """
+        Tests that the estimate stays within a few percent of the true count.
+        """
+        for cardinality in (10, 1000, 50000):
+            estimate = HyperLogLog().update(range(cardinality)).count()
+            self.assertLess(abs(estimate - cardinality) / cardinality, 0.05, cardinality)
+
+    def test_adds_are_idempotent_and_merges_are_unions(self):
+        """
+        Tests that re-adding a voter changes nothing and merging two sketches counts their union.
+        """
+        first = HyperLogLog().update(range(600))
+        second = HyperLogLog().update(range(400, 1000))
+        self.assertEqual(HyperLogLog().update(list(range(600)) * 3).registers, first.registers)
+
+        merged = HyperLogLog(first.registers).merge(second)
+        self.assertLess(abs(merged.count() - 1000), 50)
+
+    def test_serialized_sketch_is_compact(self):
+        """
+        Tests that sketches round-trip through their compressed form.
+        """
+        sketch = HyperLogLog().update(range(20))
+        data = sketch.to_bytes()
+        self.assertLess(len(data), 200)
+        self.assertEqual(HyperLogLog.from_bytes(data).registers, sketch.registers)
+
+
+class TestVoterSketches(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.question = create_question_with_choices(question_text="Q1", days=-1, choice_texts=["A", "B"])
+        self.other_question = create_question_with_choices(question_text="Q2", days=-1, choice_texts=["C"])
+        self.admin_user, _profile = create_test_user_with_profile(
+            username='admin', google_email='admin@gmail.com', is_admin=True
+        )
+        self.voters = [
+            create_test_user_with_profile(username=f'voter{i}', email=f'voter{i}@example.com',
+                                          google_email=f'voter{i}@gmail.com')[0]
+            for i in range(3)
+        ]
+
+    def vote(self, user, votes):
+        self.client.force_authenticate(user=user)
+        # Ballots are added to the sketches once the submission commits
+        with self.captureOnCommitCallbacks(execute=True):
+            response = make_json_post_request(self.client, reverse('polls:vote'), {'votes': votes})
+        self.assertEqual(response.status_code, 200)
+
+    def test_votes_update_global_question_and_day_sketches(self):
+        """
+        Tests that submitted votes are added to the global, per-question and per-day sketches.
+        """
+        choice = self.question.choice_set.first()
+        other_choice = self.other_question.choice_set.first()
+        for voter in self.voters:
+            self.vote(voter, {self.question.id: choice.id})
+        self.vote(self.voters[0], {self.question.id: choice.id, self.other_question.id: other_choice.id})
+
+        self.assertEqual(estimate_voters([GLOBAL_SKETCH_KEY]), 3)
+        self.assertEqual(estimate_voters([question_sketch_key(self.question.id)]), 3)
+        self.assertEqual(estimate_voters([question_sketch_key(self.other_question.id)]), 1)
+        self.assertEqual(estimate_voters([day_sketch_key(timezone.localdate())]), 3)
+
+    def test_sketches_are_recorded_once_per_submission_after_commit(self):
+        """
+        Tests that a submission adds all its ballots to the sketches in one call, once the vote has committed.
+        """
+        self.client.force_authenticate(user=self.voters[0])
+        votes = {self.question.id: self.question.choice_set.first().id,
+                 self.other_question.id: self.other_question.choice_set.first().id}
+        with patch('polls.views.record_ballots') as record_ballots:
+            with self.captureOnCommitCallbacks() as callbacks:
+                make_json_post_request(self.client, reverse('polls:vote'), {'votes': votes})
+            record_ballots.assert_not_called()
+            self.assertFalse(VoterSketch.objects.exists())
+
+            for callback in callbacks:
+                callback()
+
+        record_ballots.assert_called_once()
+        ballots = record_ballots.call_args.args[0]
+        self.assertEqual({ballot.question_id for ballot in ballots}, set(votes))
+
+    def test_votes_are_written_to_their_voters_shards(self):
+        """
+        Tests that each voter's votes go to the shard of their user id, which merge back into one sketch.
+        """
+        for voter in self.voters:
+            self.vote(voter, {self.question.id: self.question.choice_set.first().id})
+
+        shards = VoterSketch.objects.filter(key=question_sketch_key(self.question.id)).values_list('shard', flat=True)
+        self.assertEqual(sorted(shards), sorted({voter.id % VOTER_SKETCH_SHARDS for voter in self.voters}))
+        self.assertEqual(estimate_voters([question_sketch_key(self.question.id)]), 3)
+
+    def test_reads_do_not_write_and_rebuild_adds_earlier_ballots(self):
+        """
+        Tests that reading counts stores nothing, and that rebuild_voter_sketches adds the ballots
+        recorded without sketches (idempotently).
+        """
+        for voter in self.voters[:2]:
+            create_user_vote(user=voter, question=self.question, choice=self.question.choice_set.first())
+        # As if the ballots were recorded before the sketches existed
+        VoterSketch.objects.all().delete()
+        self.client.force_authenticate(user=self.admin_user)
+        today = timezone.localdate().isoformat()
+        response = self.client.get(reverse('admin_voter_counts'), {'questions': self.question.id, 'from': today, 'to': today})
+        self.assertEqual(response.data['questions'], {self.question.id: 0})
+        self.assertFalse(VoterSketch.objects.exists())
+
+        for _ in range(2):
+            call_command('rebuild_voter_sketches', stdout=io.StringIO())
+            self.assertEqual(estimate_voters([question_sketch_key(self.question.id)]), 2)
+            self.assertEqual(estimate_voters([GLOBAL_SKETCH_KEY]), 2)
+            self.assertEqual(estimate_voters([day_sketch_key(timezone.localdate())]), 2)
+
+    def test_migration_backfills_sketches_from_earlier_ballots(self):
+        """
+        Tests that the backfill migration adds the existing ballots to the sketches, keeping the voters
+        already recorded, and that running it again changes nothing.
+        """
+        backfill_voter_sketches = import_module('polls.migrations.0011_backfill_voter_sketches').backfill_voter_sketches
+        for voter in self.voters[:2]:
+            create_user_vote(user=voter, question=self.question, choice=self.question.choice_set.first())
+        # A voter recorded since the sketches were deployed
+        VoterSketch.objects.create(key=GLOBAL_SKETCH_KEY, shard=0, registers=HyperLogLog().update([self.voters[2].id]).to_bytes())
+
+        for _ in range(2):
+            backfill_voter_sketches(apps, None)
+            self.assertEqual(estimate_voters([GLOBAL_SKETCH_KEY]), 3)
+            self.assertEqual(estimate_voters([question_sketch_key(self.question.id)]), 2)
+            self.assertEqual(estimate_voters([day_sketch_key(timezone.localdate())]), 2)
+        self.assertEqual(VoterSketch.objects.count(), 3)
+
+    def test_voter_counts_endpoint_matches_exact_counts(self):
+        """
+        Tests that the approximate counts agree with ?exact=true on small data.
+        """
+        for voter in self.voters:
+            self.vote(voter, {self.question.id: self.question.choice_set.first().id})
+        today = timezone.localdate().isoformat()
+        params = {'questions': f'{self.question.id},{self.other_question.id}', 'from': today, 'to': today}
+
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse('admin_voter_counts')
+        approximate = self.client.get(url, params).data
+        exact = self.client.get(url, {**params, 'exact': 'true'}).data
+
+        self.assertTrue(approximate['approximate'])
+        self.assertFalse(exact['approximate'])
+        for key in ('total_voters', 'questions', 'days', 'voters_in_range'):
+            self.assertEqual(approximate[key], exact[key], key)
+        self.assertEqual(approximate['questions'], {self.question.id: 3, self.other_question.id: 0})
+
+    def test_voter_counts_endpoint_validates_date_range(self):
+        """
+        Tests that malformed or reversed date ranges return 400 Bad Request.
+        """
+        self.client.force_authenticate(user=self.admin_user)
+        url = reverse('admin_voter_counts')
+        self.assertEqual(self.client.get(url, {'from': '2024-01-02'}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'from': '2024-01-02', 'to': '2024-01-01'}).status_code, 400)
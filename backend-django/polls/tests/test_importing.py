@@ -0,0 +1,180 @@
+import csv
+import io
+import json
+import os
+import tempfile
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from polls.importing import import_questions
+from polls.models import Choice, Question
+from polls.tests.utils import create_test_user_with_profile
+
+CSV_CONTENT = (
+    "question_text,pub_date,choices\n"
+    "Favorite color?,2024-01-01T00:00:00Z,Red|Green|Blue\n"
+    "Favorite animal?,,Dog|Cat\n"
+    ",2024-01-01T00:00:00Z,Missing text\n"
+    "Choiceless question?,,\n"
+)
+
+
+class TestImportQuestions(TestCase):
+    def test_import_csv_creates_questions_and_choices(self):
+        """
+        Tests that CSV rows become questions with their '|'-separated choices.
+        """
+        report = import_questions(io.StringIO(CSV_CONTENT), 'csv')
+
+        self.assertEqual(report.processed, 4)
+        self.assertEqual(report.created, 3)
+        self.assertEqual(Question.objects.count(), 3)
+        color = Question.objects.get(question_text="Favorite color?")
+        self.assertEqual(
+            list(color.choice_set.order_by('id').values_list('choice_text', flat=True)),
+            ["Red", "Green", "Blue"]
+        )
+        self.assertEqual(Question.objects.get(question_text="Choiceless question?").choice_set.count(), 0)
+
+    def test_import_reports_invalid_rows_with_line_numbers(self):
+        """
+        Tests that invalid rows are skipped and reported with their line number.
+        """
+        report = import_questions(io.StringIO(CSV_CONTENT), 'csv')
+
+        self.assertEqual(report.failed, 1)
+        self.assertEqual(report.errors[0]['line'], 4)
+        self.assertEqual(report.errors[0]['errors'][0]['loc'], ('question_text',))
+
+    def test_import_ndjson_reports_malformed_lines(self):
+        """
+        Tests NDJSON import, including lines that are not valid JSON objects.
+        """
+        lines = [
+            json.dumps({"question_text": "Q1", "choices": [{"choice_text": "A", "votes": 2}]}),
+            "{not json",
+            "",
+            "[1, 2]",
+            json.dumps({"question_text": "Q2"}),
+        ]
+        report = import_questions(io.StringIO("\n".join(lines)), 'ndjson')
+
+        self.assertEqual(report.created, 2)
+        self.assertEqual([error['line'] for error in report.errors], [2, 4])
+        self.assertEqual(Choice.objects.get(choice_text="A").votes, 2)
+
+    def test_import_writes_in_chunks(self):
+        """
+        Tests that rows are written chunk by chunk and progress is reported after each chunk.
+        """
+        lines = "\n".join(json.dumps({"question_text": f"Q{i}"}) for i in range(7))
+        progress = []
+        report = import_questions(
+            io.StringIO(lines), 'ndjson', chunk_size=3,
+            on_chunk=lambda r: progress.append((r.chunks, r.processed, Question.objects.count()))
+        )
+
+        self.assertEqual(report.chunks, 3)
+        self.assertEqual(progress, [(1, 3, 3), (2, 6, 6), (3, 7, 7)])
+
+    def test_import_keeps_rows_read_before_a_malformed_record(self):
+        """
+        Tests that a CSV error stops the import at its line, keeping the rows before it.
+        """
+        content = CSV_CONTENT + 'Too long?,,"' + 'x' * (csv.field_size_limit() + 1) + '"\nNever read?,,\n'
+        report = import_questions(io.StringIO(content), 'csv', chunk_size=3)
+
+        self.assertEqual(report.created, 3)
+        self.assertEqual(report.read_error['line'], 6)
+        self.assertFalse(report.as_dict()['complete'])
+        self.assertFalse(Question.objects.filter(question_text="Never read?").exists())
+
+
+class TestAdminImportQuestions(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('admin_import_questions')
+        self.admin_user, self.admin_profile = create_test_user_with_profile(
+            username='admin',
+            email='admin@example.com',
+            google_email='admin@gmail.com',
+            is_admin=True
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_upload_csv_returns_report(self):
+        """
+        Tests that an uploaded CSV is imported and the report is returned.
+        """
+        upload = SimpleUploadedFile("survey.csv", CSV_CONTENT.encode(), content_type="text/csv")
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['created'], 3)
+        self.assertEqual(response.data['failed'], 1)
+        self.assertFalse(response.data['errors_truncated'])
+
+    def test_upload_with_undecodable_tail_returns_partial_report(self):
+        """
+        Tests that rows read before an undecodable part stay imported and the report says where reading stopped.
+        """
+        lines = "".join(json.dumps({"question_text": f"Question number {i}?"}) + "\n" for i in range(1000))
+        upload = SimpleUploadedFile("survey.ndjson", lines.encode() + b'{"question_text": "\xff"}\n')
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 207)
+        self.assertFalse(response.data['complete'])
+        self.assertGreater(response.data['created'], 0)
+        self.assertEqual(response.data['read_error']['line'], response.data['processed'] + 1)
+        self.assertEqual(Question.objects.count(), response.data['created'])
+
+    def test_unreadable_upload_returns_400(self):
+        """
+        Tests that a file that can't be read at all is rejected with its report.
+        """
+        upload = SimpleUploadedFile("survey.csv", b"question_text\n\xff\xfe\n")
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['created'], 0)
+        self.assertEqual(response.data['read_error']['line'], 1)
+
+    def test_upload_with_unknown_format_returns_400(self):
+        """
+        Tests that files with an unknown extension and no explicit format are rejected.
+        """
+        upload = SimpleUploadedFile("survey.txt", b"whatever")
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 400)
+
+    def test_upload_requires_admin(self):
+        """
+        Tests that regular users get 403 Forbidden.
+        """
+        user, _profile = create_test_user_with_profile(username='regular', google_email='regular@gmail.com')
+        self.client.force_authenticate(user=user)
+        upload = SimpleUploadedFile("survey.csv", CSV_CONTENT.encode())
+        response = self.client.post(self.url, {'file': upload}, format='multipart')
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Question.objects.count(), 0)
+
+
+class TestImportQuestionsCommand(TestCase):
+    def test_command_imports_file(self):
+        """
+        Tests that the management command imports a file and prints progress.
+        """
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as csv_file:
+            csv_file.write(CSV_CONTENT)
+        self.addCleanup(os.remove, csv_file.name)
+
+        out = io.StringIO()
+        call_command('import_questions', csv_file.name, '--chunk-size', '2', stdout=out)
+
+        self.assertEqual(Question.objects.count(), 3)
+        self.assertIn('chunk 2', out.getvalue())
+        self.assertIn('Imported 3 of 4 questions', out.getvalue())
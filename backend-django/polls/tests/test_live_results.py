@@ -0,0 +1,143 @@
+import asyncio
+import json
+from unittest.mock import patch
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from polls.pubsub import LocalBroker
+from polls.results import RESULTS_CHANNEL, publish_results
+from polls.tests.utils import (
+    create_question_with_choices,
+    create_test_user_with_profile,
+    make_json_post_request,
+)
+
+
+def parse_event(chunk):
+    fields = dict(line.split(': ', 1) for line in chunk.decode().strip().splitlines())
+    return fields['event'], json.loads(fields['data'])
+
+
+class TestLocalBroker(TestCase):
+    async def test_messages_reach_every_subscriber(self):
+        """
+        Tests that a published message is delivered to each subscriber of the channel only.
+        """
+        broker = LocalBroker()
+        async with broker.subscribe('results') as first, broker.subscribe('results') as second, \
+                broker.subscribe('other') as other:
+            self.assertEqual(broker.publish('results', {'n': 1}), 2)
+            self.assertEqual(await first.get(timeout=1), {'n': 1})
+            self.assertEqual(await second.get(timeout=1), {'n': 1})
+            self.assertIsNone(await other.get(timeout=0.01))
+        self.assertEqual(broker.subscriber_count('results'), 0)
+
+    async def test_slow_subscriber_is_marked_overflowed(self):
+        """
+        Tests that a subscriber whose buffer is full is flagged for a resync instead of blocking publishers.
+        """
+        broker = LocalBroker()
+        async with broker.subscribe('results') as subscription:
+            with patch.object(subscription.queue, '_maxsize', 2):
+                for n in range(3):
+                    broker.publish('results', n)
+                await asyncio.sleep(0)
+            self.assertTrue(subscription.overflowed)
+
+            subscription.reset()
+            self.assertFalse(subscription.overflowed)
+            self.assertIsNone(await subscription.get(timeout=0.01))
+
+
+class TestResultsPublishing(TestCase):
+    def setUp(self):
+        self.question = create_question_with_choices(question_text="Live?", days=-1, choice_texts=["Yes", "No"])
+        self.yes = self.question.choice_set.order_by('id').first()
+        self.voter, _profile = create_test_user_with_profile(username='voter', google_email='voter@gmail.com')
+
+    def test_vote_publishes_counts_once_committed(self):
+        """
+        Tests that a submission publishes the new counts of its questions once, after commit, with one query.
+        """
+        client = APIClient()
+        client.force_authenticate(user=self.voter)
+        # The voter sketches are recorded by a callback of their own
+        with patch('polls.results.get_broker') as get_broker, patch('polls.views.record_ballots'):
+            with self.captureOnCommitCallbacks() as callbacks:
+                make_json_post_request(client, reverse('polls:vote'), {'votes': {self.question.id: self.yes.id}})
+            get_broker.return_value.publish.assert_not_called()
+
+            with self.assertNumQueries(1):
+                for callback in callbacks:
+                    callback()
+
+        get_broker.return_value.publish.assert_called_once()
+        channel, message = get_broker.return_value.publish.call_args.args
+        self.assertEqual(channel, RESULTS_CHANNEL)
+        self.assertEqual(message['questions'][0]['total_votes'], 1)
+        self.assertEqual(message['questions'][0]['choices'][0], {'id': self.yes.id, 'votes': 1, 'percentage': 100.0})
+
+
+class TestResultsStream(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.broker = LocalBroker()
+        patcher = patch('polls.views.get_broker', return_value=self.broker)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.published = create_question_with_choices(question_text="Now", days=-1, choice_texts=["A", "B"])
+        self.scheduled = create_question_with_choices(question_text="Later", days=3, choice_texts=["C"])
+
+    async def test_stream_sends_snapshot_then_changes(self):
+        """
+        Tests that a guest receives the public snapshot, then the changes of published questions only.
+        """
+        response = await self.async_client.get(reverse('polls:results_stream'))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        stream = aiter(response.streaming_content)
+
+        event, snapshot = parse_event(await anext(stream))
+        self.assertEqual(event, 'snapshot')
+        self.assertEqual([q['id'] for q in snapshot['questions_results']], [self.published.id])
+
+        a, b = [choice async for choice in self.published.choice_set.order_by('id')]
+        a.votes = 4
+        await a.asave()
+        with patch('polls.results.get_broker', return_value=self.broker):
+            await sync_to_async(publish_results)([self.scheduled.id])
+            await sync_to_async(publish_results)([self.published.id, self.scheduled.id])
+
+        event, changes = parse_event(await anext(stream))
+        self.assertEqual(event, 'results')
+        self.assertEqual(changes['questions'], [{
+            'id': self.published.id,
+            'total_votes': 4,
+            'choices': [
+                {'id': a.id, 'votes': 4, 'percentage': 100.0},
+                {'id': b.id, 'votes': 0, 'percentage': 0.0},
+            ],
+        }])
+        await stream.aclose()
+
+    def test_stream_is_refused_under_wsgi(self):
+        """
+        Tests that the stream answers 501 Not Implemented when served by a WSGI handler.
+        """
+        response = self.client.get(reverse('polls:results_stream'))
+        self.assertEqual(response.status_code, 501)
+        self.assertIn('error', response.json())
+
+    async def test_idle_stream_sends_keep_alives(self):
+        """
+        Tests that an idle stream emits a comment line after the heartbeat interval.
+        """
+        with self.settings(RESULTS_STREAM_HEARTBEAT=0.01):
+            response = await self.async_client.get(reverse('polls:results_stream'))
+            stream = aiter(response.streaming_content)
+            await anext(stream)
+            self.assertEqual(await anext(stream), b': keep-alive\n\n')
+            await stream.aclose()
@@ -0,0 +1,136 @@
+import os
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from polls.permissions import admin_status_cache_key
+from polls.tests.utils import create_test_user_with_profile
+
+
+def count_profile_queries(queries):
+    return sum('polls_userprofile' in query['sql'] for query in queries)
+
+
+class TestIsPollAdmin(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('admin_dashboard')
+        self.admin_user, self.admin_profile = create_test_user_with_profile(
+            username='admin',
+            email='admin@example.com',
+            google_email='admin@gmail.com',
+            is_admin=True
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    @override_settings(ADMIN_STATUS_CACHE_TIMEOUT=300)
+    def test_admin_status_is_cached_across_requests(self):
+        """
+        Tests that the profile is read on the first admin request only.
+        """
+        with CaptureQueriesContext(connection) as first:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+        with CaptureQueriesContext(connection) as second:
+            self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.assertEqual(count_profile_queries(first), 1)
+        self.assertEqual(count_profile_queries(second), 0)
+
+    def test_admin_status_is_read_per_request_without_a_cache_timeout(self):
+        """
+        Tests that with no ADMIN_STATUS_CACHE_TIMEOUT (the default with a per-worker cache),
+        the profile is read once per request and nothing is cached.
+        """
+        for _ in range(2):
+            with CaptureQueriesContext(connection) as queries:
+                self.assertEqual(self.client.get(self.url).status_code, 200)
+            self.assertEqual(count_profile_queries(queries), 1)
+        self.assertIsNone(cache.get(admin_status_cache_key(self.admin_user.pk)))
+
+    @override_settings(ADMIN_STATUS_CACHE_TIMEOUT=300)
+    def test_profile_save_invalidates_cached_status(self):
+        """
+        Tests that demoting an admin takes effect on their next request.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.admin_profile.is_admin = False
+        self.admin_profile.save()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data, {'error': 'Admin access required'})
+
+    @override_settings(ADMIN_STATUS_CACHE_TIMEOUT=300)
+    def test_profile_delete_invalidates_cached_status(self):
+        """
+        Tests that a deleted profile is reported as missing, not served from the cache.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.admin_profile.delete()
+
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data, {'error': 'User profile not found'})
+
+    def test_unauthenticated_requests_are_rejected(self):
+        """
+        Tests that guests get 403 Forbidden without a profile lookup.
+        """
+        self.client.force_authenticate(user=None)
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self.client.get(self.url).status_code, 403)
+        self.assertEqual(count_profile_queries(queries), 0)
+
+
+class TestIsMainPollAdmin(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('polls:admin_user_management')
+        self.main_admin, _profile = create_test_user_with_profile(
+            username='main',
+            email='main@example.com',
+            google_email='main@gmail.com',
+            is_admin=True
+        )
+        self.other_admin, _profile = create_test_user_with_profile(
+            username='other',
+            email='other@example.com',
+            google_email='other@gmail.com',
+            is_admin=True
+        )
+
+    @patch.dict(os.environ, {'MAIN_ADMIN_EMAIL': 'main@gmail.com'})
+    def test_only_main_admin_manages_admins(self):
+        """
+        Tests that other admins get 'Main admin access required'.
+        """
+        self.client.force_authenticate(user=self.main_admin)
+        self.assertEqual(self.client.get(self.url).status_code, 200)
+
+        self.client.force_authenticate(user=self.other_admin)
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(response.data, {'error': 'Main admin access required'})
+
+    @patch.dict(os.environ, {'MAIN_ADMIN_EMAIL': 'main@gmail.com'})
+    def test_poll_closure_reads_are_public(self):
+        """
+        Tests that poll status is readable by anyone, while closing it needs the main admin.
+        """
+        url = reverse('polls:poll_closure')
+        self.assertEqual(self.client.get(url).status_code, 200)
+
+        self.client.force_authenticate(user=self.other_admin)
+        self.assertEqual(self.client.post(url).status_code, 403)
+
+        self.client.force_authenticate(user=self.main_admin)
+        self.assertEqual(self.client.post(url).status_code, 200)
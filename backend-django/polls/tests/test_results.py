@@ -0,0 +1,228 @@
+import io
+from datetime import timedelta
+from unittest.mock import patch
+
+import numpy as np
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from polls.models import Question, QuestionResult, QuestionResultTombstone
+from polls.results import drop_question_results, refresh_question_results, tally_votes
+from polls.tests.utils import (
+    create_question_with_choices,
+    create_test_user_with_profile,
+    make_json_post_request,
+)
+
+
+class TestQuestionResults(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.question = create_question_with_choices(question_text="Favorite color?", days=-1, choice_texts=["Red", "Blue"])
+        self.red, self.blue = self.question.choice_set.order_by('id')
+        self.voter, _profile = create_test_user_with_profile(username='voter', google_email='voter@gmail.com')
+
+    def vote(self, votes):
+        self.client.force_authenticate(user=self.voter)
+        response = make_json_post_request(self.client, reverse('polls:vote'), {'votes': votes})
+        self.assertEqual(response.status_code, 200)
+
+    def test_results_follow_votes(self):
+        """
+        Tests that a submission updates the question's result row and its version.
+        """
+        version = QuestionResult.objects.get(question_id=self.question.id).version
+        self.vote({self.question.id: self.red.id})
+
+        result = QuestionResult.objects.get(question_id=self.question.id)
+        self.assertEqual(result.total_votes, 1)
+        self.assertEqual([(c['choice_text'], c['votes'], c['percentage']) for c in result.choices],
+                         [("Red", 1, 100.0), ("Blue", 0, 0.0)])
+        self.assertGreater(result.version, version)
+
+        self.vote({self.question.id: self.blue.id})
+        result.refresh_from_db()
+        self.assertEqual([c['votes'] for c in result.choices], [0, 1])
+
+    def test_results_follow_catalog_changes(self):
+        """
+        Tests that new choices, renames and deletions are reflected in the result rows.
+        """
+        self.question.choice_set.create(choice_text="Green", votes=2)
+        self.red.choice_text = "Crimson"
+        self.red.save()
+
+        result = QuestionResult.objects.get(question_id=self.question.id)
+        self.assertEqual([c['choice_text'] for c in result.choices], ["Crimson", "Blue", "Green"])
+        self.assertEqual((result.choice_count, result.total_votes), (3, 2))
+
+        self.question.delete()
+        self.assertFalse(QuestionResult.objects.filter(question_id=self.question.id).exists())
+
+    def test_summary_is_a_single_read(self):
+        """
+        Tests that the guest results summary is served with one query.
+        """
+        self.vote({self.question.id: self.red.id})
+        create_question_with_choices(question_text="Hidden future question", days=3, choice_texts=["A"])
+        self.client.force_authenticate(user=None)
+        # Caches the poll status (open), looked up once per cache lifetime (see polls.frozen)
+        self.client.get(reverse('polls:client_poll_list'))
+
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('summary'))
+
+        self.assertEqual(response.data['total_questions'], 1)
+        self.assertEqual(response.data['total_votes_all_questions'], 1)
+        self.assertEqual(response.data['questions_results'][0]['choices'][0]['percentage'], 100.0)
+
+    def test_rebuild_command_recovers_results(self):
+        """
+        Tests that the rebuild command recomputes rows that drifted or went missing.
+        """
+        QuestionResult.objects.all().delete()
+
+        out = io.StringIO()
+        call_command('rebuild_question_results', stdout=out)
+
+        self.assertIn('Rebuilt results of 1 questions', out.getvalue())
+        self.assertEqual(QuestionResult.objects.get(question_id=self.question.id).choice_count, 2)
+
+    def test_question_delete_drops_its_row_once(self):
+        """
+        Tests that deleting a question drops its result row once, without refreshing it for each of its choices.
+        """
+        for i in range(10):
+            self.question.choice_set.create(choice_text=f"Color {i}")
+        question_id = self.question.id
+
+        with (
+            patch('polls.signals.refresh_question_results') as refresh,
+            patch('polls.signals.drop_question_results', wraps=drop_question_results) as drop,
+        ):
+            self.question.delete()
+
+        refresh.assert_not_called()
+        drop.assert_called_once_with([question_id])
+        self.assertFalse(QuestionResult.objects.filter(question_id=question_id).exists())
+
+    def test_results_are_saved_without_an_upsert_conflict_target(self):
+        """
+        Tests that rows are updated and inserted on backends whose upsert takes no conflict target (MySQL).
+        """
+        other = create_question_with_choices(question_text="Favorite shape?", days=-1, choice_texts=["Circle"])
+        QuestionResult.objects.filter(question_id=other.id).delete()
+
+        with patch.object(connection.features, 'supports_update_conflicts_with_target', False):
+            self.vote({self.question.id: self.red.id})
+            refresh_question_results([other.id])
+            self.assertEqual(QuestionResult.objects.get(question_id=other.id).choice_count, 1)
+
+            other_id = other.id
+            other.delete()
+            version = QuestionResultTombstone.objects.get(question_id=other_id).version
+            drop_question_results([other_id])
+
+        self.assertEqual(QuestionResult.objects.get(question_id=self.question.id).total_votes, 1)
+        self.assertFalse(QuestionResult.objects.filter(question_id=other_id).exists())
+        self.assertGreater(QuestionResultTombstone.objects.get(question_id=other_id).version, version)
+
+    def test_tally_votes_groups_flat_columns(self):
+        """
+        Tests the vectorized per-question totals and percentages, including a question without votes.
+        """
+        ids, choice_counts, totals, percentages = tally_votes(
+            np.array([3, 3, 3, 7, 7, 9]), np.array([1, 1, 2, 0, 0, 5])
+        )
+
+        self.assertEqual(ids.tolist(), [3, 7, 9])
+        self.assertEqual(choice_counts.tolist(), [3, 2, 1])
+        self.assertEqual(totals.tolist(), [4, 0, 5])
+        self.assertEqual(percentages.tolist(), [25.0, 25.0, 50.0, 0.0, 0.0, 100.0])
+
+    def test_benchmark_command_leaves_no_data(self):
+        """
+        Tests that the benchmark reports both methods and rolls its synthetic catalog back.
+        """
+        out = io.StringIO()
+        call_command('benchmark_results', questions=20, choices=3, repeat=1, stdout=out)
+
+        self.assertIn('20 questions x 3 choices', out.getvalue())
+        self.assertEqual(Question.objects.count(), 1)
+
+
+class TestResultsSummaryChanges(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.url = reverse('summary')
+        self.admin, _profile = create_test_user_with_profile(
+            username='admin', email='admin@example.com', google_email='admin@gmail.com', is_admin=True
+        )
+        self.voter, _profile = create_test_user_with_profile(username='voter', google_email='voter@gmail.com')
+        self.quiet = create_question_with_choices(question_text="Quiet", days=-2, choice_texts=["A", "B"])
+        self.busy = create_question_with_choices(question_text="Busy", days=-1, choice_texts=["C", "D"])
+
+    def changes_since(self, version, user=None):
+        self.client.force_authenticate(user=user)
+        response = self.client.get(self.url, {'since': version})
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def test_since_returns_only_changed_questions(self):
+        """
+        Tests that after a vote only the voted question is returned, and nothing after the new version.
+        """
+        version = self.client.get(self.url).data['version']
+        with patch('polls.results.CHANGES_OVERLAP_NS', 0):
+            self.assertEqual(self.changes_since(version)['questions_results'], [])
+
+            self.client.force_authenticate(user=self.voter)
+            make_json_post_request(self.client, reverse('polls:vote'), {'votes': {self.busy.id: self.busy.choice_set.first().id}})
+
+            changes = self.changes_since(version)
+            self.assertEqual([(q['id'], q['total_votes']) for q in changes['questions_results']], [(self.busy.id, 1)])
+            self.assertEqual((changes['removed'], changes['reset']), ([], False))
+            self.assertEqual(self.changes_since(changes['version'])['questions_results'], [])
+
+    def test_since_reports_deleted_and_hidden_questions(self):
+        """
+        Tests that deleted questions are removed for everyone and rescheduled ones for guests only.
+        """
+        version = self.client.get(self.url).data['version']
+        quiet_id = self.quiet.id
+        self.quiet.delete()
+        self.busy.pub_date = timezone.now() + timedelta(days=1)
+        self.busy.save()
+
+        guest_changes = self.changes_since(version)
+        self.assertEqual(guest_changes['questions_results'], [])
+        self.assertEqual(sorted(guest_changes['removed']), sorted([quiet_id, self.busy.id]))
+
+        admin_changes = self.changes_since(version, user=self.admin)
+        self.assertEqual([q['id'] for q in admin_changes['questions_results']], [self.busy.id])
+        self.assertEqual(admin_changes['removed'], [quiet_id])
+
+    def test_since_older_than_tombstones_resets(self):
+        """
+        Tests that a version older than the tombstone retention gets the full summary back.
+        """
+        changes = self.changes_since(0)
+        self.assertTrue(changes['reset'])
+        self.assertEqual(changes['total_questions'], 2)
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
+
+    def test_since_out_of_range_is_rejected(self):
+        """
+        Tests that a version too large to be a timestamp gets the same 400 as a non-integer one.
+        """
+        for since in ['99999999999999999999999', str(2**63)]:
+            response = self.client.get(self.url, {'since': since})
+            self.assertEqual(response.status_code, 400)
+            self.assertEqual(response.data, {"error": "'since' must be a version number"})
+        self.assertFalse(self.changes_since(2**63 - 1)['reset'])
@@ -0,0 +1,174 @@
+import io
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from polls.search import (
+    InvertedIndexBackend,
+    MySQLFulltextBackend,
+    get_search_backend,
+    query_terms,
+    search_questions,
+)
+from polls.tests.utils import (
+    create_question_with_choices,
+    create_test_user_with_profile,
+    make_json_put_request,
+)
+
+
+class SearchDataMixin:
+    """
+    The native indexes (FTS5, InnoDB FULLTEXT) are not Django models: they are emptied
+    before each test, and InnoDB only sees committed rows, so the tests using them are
+    TransactionTestCases.
+    """
+
+    def create_search_data(self):
+        get_search_backend().clear()
+        self.pets = create_question_with_choices(
+            question_text="Favorite pet?",
+            days=-1,
+            choice_texts=["Dog", "Cat", "Parrot"]
+        )
+        self.colors = create_question_with_choices(
+            question_text="Favorite color for a cat collar?",
+            days=-1,
+            choice_texts=["Red", "Blue"]
+        )
+        self.food = create_question_with_choices(
+            question_text="Best breakfast?",
+            days=5,
+            choice_texts=["Pancakes", "Eggs"]
+        )
+
+
+class TestSearchIndex(SearchDataMixin, TransactionTestCase):
+    def setUp(self):
+        self.create_search_data()
+
+    def test_query_terms_strip_search_syntax(self):
+        """
+        Tests that user queries are reduced to plain word terms.
+        """
+        self.assertEqual(query_terms('cat* OR "dog" NEAR(cat)'), ['cat', 'or', 'dog', 'near'])
+
+    def test_search_ranks_question_text_above_choice_text(self):
+        """
+        Tests that every term must match and that matches in the question text rank first.
+        """
+        self.assertEqual(search_questions("cat", 10), (2, [self.colors.id, self.pets.id]))
+        self.assertEqual(search_questions("favorite blue", 10), (1, [self.colors.id]))
+        self.assertEqual(search_questions("pan", 10), (1, [self.food.id]))
+        self.assertEqual(search_questions("   ", 10), (0, []))
+
+    def test_search_is_paginated(self):
+        """
+        Tests that limit and offset are applied by the index.
+        """
+        total, first_page = search_questions("favorite", 1, 0)
+        _total, second_page = search_questions("favorite", 1, 1)
+
+        self.assertEqual(total, 2)
+        self.assertEqual(len(first_page + second_page), 2)
+        self.assertNotEqual(first_page, second_page)
+
+    def test_index_follows_question_and_choice_changes(self):
+        """
+        Tests that edits, renamed choices and deletions are reflected in the index.
+        """
+        cat = self.pets.choice_set.get(choice_text="Cat")
+        cat.choice_text = "Hamster"
+        cat.save()
+        self.assertEqual(search_questions("hamster", 10), (1, [self.pets.id]))
+
+        self.food.question_text = "Best lunch?"
+        self.food.save()
+        self.assertEqual(search_questions("breakfast", 10), (0, []))
+
+        self.colors.delete()
+        self.assertEqual(search_questions("cat", 10), (0, []))
+
+    def test_inverted_index_fallback(self):
+        """
+        Tests the portable SearchTerm backend after a rebuild.
+        """
+        with patch('polls.search.get_search_backend', return_value=InvertedIndexBackend()):
+            call_command('rebuild_search_index', stdout=io.StringIO())
+            self.assertEqual(search_questions("cat", 10), (2, [self.colors.id, self.pets.id]))
+            self.assertEqual(search_questions("favorite blue", 10), (1, [self.colors.id]))
+
+
+class TestAdminDashboardSearch(SearchDataMixin, TransactionTestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.admin_user, _profile = create_test_user_with_profile(
+            username='admin',
+            email='admin@example.com',
+            google_email='admin@gmail.com',
+            is_admin=True
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.create_search_data()
+
+    def test_dashboard_search_returns_ranked_page(self):
+        """
+        Tests that /admin/?q= returns matching questions, including hidden ones, best match first.
+        """
+        response = self.client.get(reverse('admin_dashboard'), {'q': 'cat', 'page_size': 1, 'page': 5})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['count'], 2)
+        self.assertEqual(response.data['page'], 2)
+        self.assertEqual(response.data['query'], 'cat')
+        self.assertEqual([q['id'] for q in response.data['results']], [self.pets.id])
+
+    def test_bulk_edit_reindexes_question(self):
+        """
+        Tests that a question edited through the admin API is found by its new choices.
+        """
+        url = reverse('admin_question_detail', args=[self.food.id])
+        response = make_json_put_request(self.client, url, {
+            "question_text": "Best breakfast?",
+            "pub_date": timezone.now().isoformat(),
+            "choices": [{"choice_text": "Waffles", "votes": 0}]
+        })
+        self.assertEqual(response.status_code, 200)
+
+        response = self.client.get(reverse('admin_dashboard'), {'q': 'waffles'})
+        self.assertEqual([q['id'] for q in response.data['results']], [self.food.id])
+        self.assertEqual(self.client.get(reverse('admin_dashboard'), {'q': 'pancakes'}).data['count'], 0)
+
+
+class TestMySQLUnindexedTerms(TestCase):
+    def test_terms_the_fulltext_index_may_miss_are_scanned(self):
+        """
+        Tests that terms shorter than the minimum token size, or prefixes of stopwords, are not left to MATCH.
+        """
+        backend = MySQLFulltextBackend(min_token_size=3, stopwords={'the', 'about'})
+        self.assertEqual(backend.split_terms(['cat', 'ok', 'the', 'abo', 'pancakes']), (['cat', 'pancakes'], ['ok', 'the', 'abo']))
+
+
+@skipUnless(connection.vendor == 'mysql', 'InnoDB FULLTEXT backend')
+class TestMySQLFulltextSearch(SearchDataMixin, TransactionTestCase):
+    def setUp(self):
+        self.create_search_data()
+        self.short = create_question_with_choices(question_text="Is it ok?", days=-1, choice_texts=["Yes", "No"])
+        self.common = create_question_with_choices(question_text="The one about it?", days=-1, choice_texts=["Sure"])
+
+    def test_short_and_common_words_match_like_the_portable_backend(self):
+        """
+        Tests that words InnoDB leaves out of its index (short words, stopwords) are still found.
+        """
+        self.assertIsInstance(get_search_backend(), MySQLFulltextBackend)
+        self.assertEqual(search_questions("ok", 10), (1, [self.short.id]))
+        self.assertEqual(search_questions("no", 10), (1, [self.short.id]))
+        self.assertEqual(search_questions("the about", 10), (1, [self.common.id]))
+        total, question_ids = search_questions("favorite ca", 10)
+        self.assertEqual((total, sorted(question_ids)), (2, sorted([self.pets.id, self.colors.id])))
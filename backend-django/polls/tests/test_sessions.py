@@ -0,0 +1,99 @@
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.contrib.sessions.models import Session
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from polls.middleware import REFRESHED_AT_KEY
+from polls.tests.utils import create_test_user_with_profile
+
+
+class TestSessionRefresh(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.user, _profile = create_test_user_with_profile()
+        self.client.force_login(self.user)
+        self.url = reverse('polls:user_votes')
+        # The first request stamps the login session with its refresh time
+        self.client.get(self.url)
+
+    def expire_date(self):
+        return Session.objects.get(session_key=self.client.session.session_key).expire_date
+
+    def test_unchanged_session_is_not_written(self):
+        """
+        Tests that requests within the refresh interval neither save the session nor re-send its cookie.
+        """
+        expire_date = self.expire_date()
+        for _ in range(3):
+            response = self.client.get(self.url)
+            self.assertEqual(response.status_code, 200)
+            self.assertNotIn('sessionid', response.cookies)
+        self.assertEqual(self.expire_date(), expire_date)
+
+    def test_session_is_refreshed_after_the_interval(self):
+        """
+        Tests that a session last saved longer than SESSION_REFRESH_INTERVAL ago is saved with a new expiry.
+        """
+        expire_date = self.expire_date()
+        refreshed_at = self.client.session[REFRESHED_AT_KEY]
+
+        later = refreshed_at + 3600
+        with self.settings(SESSION_REFRESH_INTERVAL=3600), patch('polls.middleware.time.time', return_value=later):
+            response = self.client.get(self.url)
+
+        self.assertIn('sessionid', response.cookies)
+        self.assertEqual(self.client.session[REFRESHED_AT_KEY], later)
+        self.assertGreaterEqual(self.expire_date(), expire_date)
+
+    def test_changed_session_is_written(self):
+        """
+        Tests that a modified session is still saved right away (e.g. logging out).
+        """
+        session_key = self.client.session.session_key
+        self.client.post(reverse('polls:simple_logout'))
+        self.assertFalse(Session.objects.filter(session_key=session_key).exists())
+
+    def test_unknown_session_cookie_creates_no_session(self):
+        """
+        Tests that a cookie naming no stored session doesn't make the refresh create one.
+        """
+        client = Client()
+        client.cookies['sessionid'] = 'no-such-session'
+        sessions = Session.objects.count()
+        client.get(self.url)
+        self.assertEqual(Session.objects.count(), sessions)
+
+
+class TestSessionCommands(TestCase):
+    def test_purge_deletes_expired_sessions_in_batches(self):
+        """
+        Tests that only expired sessions are purged, across several batches.
+        """
+        now = timezone.now()
+        Session.objects.bulk_create(
+            [Session(session_key=f'expired{i}', session_data='', expire_date=now - timedelta(days=1)) for i in range(5)]
+            + [Session(session_key='active', session_data='', expire_date=now + timedelta(days=1))]
+        )
+        out = StringIO()
+        call_command('purge_sessions', batch_size=2, stdout=out)
+
+        self.assertIn('Purged 5 expired sessions', out.getvalue())
+        self.assertEqual(list(Session.objects.values_list('session_key', flat=True)), ['active'])
+
+    def test_benchmark_counts_fewer_writes(self):
+        """
+        Tests that the benchmark reports both configurations and leaves no session behind.
+        """
+        out = StringIO()
+        call_command('benchmark_sessions', requests=20, stdout=out)
+
+        self.assertIn('every request: 1.000 reads, 1.000 writes per request', out.getvalue())
+        self.assertIn('20 requests: 19 fewer session writes', out.getvalue())
+        self.assertFalse(Session.objects.exists())
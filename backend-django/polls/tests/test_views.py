@@ -1,10 +1,15 @@
-from django.test import TestCase, Client
+import io
+from django.test import TestCase, Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.core.cache import cache
+from django.db import connection, models, DatabaseError
+from unittest.mock import patch
 from django.urls import reverse
 from django.utils import timezone
 from rest_framework.test import APIClient
 from datetime import timedelta
 
-from polls.models import Question, UserVote, UserProfile
+from polls.models import Question, Choice, QuestionResult, UserVote, UserProfile, VoteBucket
 from polls.tests.utils import (
     make_json_post_request, 
     create_question_with_choices, 
@@ -12,7 +17,10 @@ from polls.tests.utils import (
     create_test_user_with_profile,
     create_user_vote
 )
-from polls.views import ADMIN_QUESTIONS_PER_PAGE
+from polls.bulk_operations import apply_bulk_operation, dependent_relations
+from polls.hll import record_ballots
+from polls.search import search_questions
+from polls.views import ADMIN_QUESTIONS_PER_PAGE, MAX_BATCH_IDS
 
 # --- Client Views ---
 
@@ -148,6 +156,68 @@ class TestClientPollDetail(TestCase):
         response = self.client.get(url)
         self.assertEqual(response.status_code, 404)
     
+# --- client_poll_batch ---
+class TestClientPollBatch(TestCase):
+    def setUp(self):
+        self.client = Client()
+        self.url = reverse('polls:client_poll_batch')
+        self.question_1 = create_question_with_choices(
+            question_text="Batch question 1",
+            days=-2,
+            choice_texts=["A", "B"]
+        )
+        self.question_2 = create_question_with_choices(
+            question_text="Batch question 2",
+            days=-1,
+            choice_texts=["C", "D", "E"]
+        )
+        self.future_question = create_question_with_choices(
+            question_text="Future batch question",
+            days=5,
+            choice_texts=["F"]
+        )
+
+    def test_client_poll_batch_returns_requested_questions_in_order(self):
+        """
+        Tests that the batch view returns the visible questions in the requested order.
+        """
+        response = self.client.get(self.url, {'ids': f"{self.question_2.id},{self.question_1.id}"})
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([q['id'] for q in response_data['results']], [self.question_2.id, self.question_1.id])
+        self.assertEqual(len(response_data['results'][0]['choices']), 3)
+        self.assertEqual(response_data['missing'], [])
+
+    def test_client_poll_batch_reports_missing_and_hidden_ids_inline(self):
+        """
+        Tests that nonexistent and future questions are listed under 'missing' instead of a 404.
+        """
+        response = self.client.get(self.url, {'ids': f"{self.question_1.id},{self.future_question.id},9999"})
+        response_data = response.json()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response_data['count'], 1)
+        self.assertEqual(response_data['missing'], [self.future_question.id, 9999])
+
+    def test_client_poll_batch_uses_two_queries(self):
+        """
+        Tests that the number of queries doesn't depend on the number of ids.
+        """
+        ids = ",".join(str(q.id) for q in (self.question_1, self.question_2, self.future_question))
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'ids': ids})
+        self.assertEqual(response.status_code, 200)
+
+    def test_client_poll_batch_rejects_invalid_ids(self):
+        """
+        Tests that missing, malformed or too many ids return 400 Bad Request.
+        """
+        self.assertEqual(self.client.get(self.url).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'ids': '1,abc'}).status_code, 400)
+        too_many = ",".join(str(i) for i in range(1, MAX_BATCH_IDS + 2))
+        self.assertEqual(self.client.get(self.url, {'ids': too_many}).status_code, 400)
+
 # Note: TestVoteView has been replaced by TestVoteWithAuthentication
 # which provides comprehensive testing of the authenticated voting system
 
@@ -281,6 +351,118 @@ class TestAdminCreateQuestion(TestCase):
         self.assertEqual(question.question_text, "Test choiceless question")
         self.assertEqual(question.choice_set.count(), 0)
     
+    def test_admin_create_question_writes_question_and_choices_in_two_queries(self):
+        """
+        Tests that the question and all of its choices are inserted with two INSERT statements.
+        """
+        request_data = {
+            "question_text": "Survey question",
+            "choices": [{"choice_text": f"Choice {i}"} for i in range(10)]
+        }
+        with CaptureQueriesContext(connection) as queries:
+            response = make_json_post_request(self.client, self.url, request_data)
+        self.assertEqual(response.status_code, 201)
+
+        # Derived rows (search index, materialized results) are written separately
+        inserts = [
+            q['sql'] for q in queries.captured_queries
+            if q['sql'].startswith(('INSERT INTO "polls_question"', 'INSERT INTO "polls_choice"'))
+        ]
+        self.assertEqual(len(inserts), 2)
+        self.assertEqual(Question.objects.get(pk=response.data['id']).choice_set.count(), 10)
+
+    def test_admin_create_question_leaves_nothing_behind_on_failure(self):
+        """
+        Tests that a failure while writing the choices rolls back the question too.
+        """
+        request_data = {
+            "question_text": "Doomed question",
+            "choices": [{"choice_text": "Choice 1"}]
+        }
+        with (
+            patch('polls.models.Choice.objects.bulk_create', side_effect=DatabaseError("boom")),
+            self.assertRaises(DatabaseError),
+        ):
+            make_json_post_request(self.client, self.url, request_data)
+        self.assertFalse(Question.objects.filter(question_text="Doomed question").exists())
+
+
+# --- admin_create_questions_bulk ---
+class TestAdminCreateQuestionsBulk(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('admin_create_questions_bulk')
+        self.admin_user, self.admin_profile = create_test_user_with_profile(
+            username='admin',
+            email='admin@example.com',
+            google_email='admin@gmail.com',
+            is_admin=True
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+    def test_bulk_create_creates_all_questions_and_choices(self):
+        """
+        Tests that a list of questions is created with their choices, in request order.
+        """
+        request_data = {
+            "questions": [
+                {"question_text": f"Survey question {i}", "choices": [{"choice_text": "Yes"}, {"choice_text": "No"}]}
+                for i in range(20)
+            ] + [{"question_text": "Choiceless survey question"}]
+        }
+        response = make_json_post_request(self.client, self.url, request_data)
+
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(len(response.data['ids']), 21)
+        self.assertEqual(Question.objects.count(), 21)
+        self.assertEqual(Choice.objects.count(), 40)
+        self.assertEqual(Question.objects.get(pk=response.data['ids'][3]).question_text, "Survey question 3")
+
+    def test_bulk_create_without_returned_ids_indexes_and_refreshes_once(self):
+        """
+        Tests that on databases not returning ids from bulk inserts (MySQL), where questions are
+        saved one by one, the batch is still indexed and refreshed once rather than per question.
+        """
+        request_data = {
+            "questions": [{"question_text": f"Survey question {i}", "choices": [{"choice_text": "Yes"}]} for i in range(5)]
+        }
+        with (
+            patch.object(type(connection.features), 'can_return_rows_from_bulk_insert', False),
+            patch('polls.signals.index_questions') as index_questions,
+            patch('polls.signals.refresh_question_results') as refresh_question_results,
+        ):
+            response = make_json_post_request(self.client, self.url, request_data)
+
+        self.assertEqual(response.status_code, 201)
+        index_questions.assert_called_once_with(response.data['ids'])
+        refresh_question_results.assert_called_once_with(response.data['ids'])
+
+    def test_bulk_create_rejects_whole_batch_on_invalid_question(self):
+        """
+        Tests that one invalid question fails the whole request and nothing is created.
+        """
+        request_data = {
+            "questions": [
+                {"question_text": "Valid question"},
+                {"choices": [{"choice_text": "Missing question text"}]}
+            ]
+        }
+        response = make_json_post_request(self.client, self.url, request_data)
+
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['errors'][0]['loc'], ['questions', 1, 'question_text'])
+        self.assertEqual(Question.objects.count(), 0)
+
+    def test_bulk_create_requires_admin(self):
+        """
+        Tests that regular users get 403 Forbidden.
+        """
+        user, _profile = create_test_user_with_profile(username='regular', google_email='regular@gmail.com')
+        self.client.force_authenticate(user=user)
+        response = make_json_post_request(self.client, self.url, {"questions": [{"question_text": "Nope"}]})
+        self.assertEqual(response.status_code, 403)
+        self.assertEqual(Question.objects.count(), 0)
+
 # --- admin_dashboard ---
 class TestAdminDashboard(TestCase):
     def setUp(self):
@@ -399,6 +581,40 @@ class TestAdminDashboard(TestCase):
         response_invalid_page_size_number_data = response_invalid_page_size_number.json()
         self.assertEqual(response_invalid_page_size_number_data["page_size"], ADMIN_QUESTIONS_PER_PAGE)
 
+    def test_admin_dashboard_orders_questions_by_bucket(self):
+        """
+        Tests that published questions come first (old to new), then future questions
+        with choices, then choiceless ones.
+        """
+        response = self.client.get(self.url, {'page_size': 20})
+        ids = [q["id"] for q in response.data["results"]]
+
+        self.assertEqual(ids[0], self.question_5.id)  # Oldest published question
+        self.assertEqual(ids[-3], self.question_1_current.id)  # Newest published question
+        self.assertEqual(ids[-2], self.question_4_future.id)
+        self.assertEqual(ids[-1], self.question_3_choiceless.id)
+
+    def test_admin_dashboard_returns_bucket_counts(self):
+        """
+        Tests that per-bucket counts are returned with the page.
+        """
+        response = self.client.get(self.url)
+        self.assertEqual(response.data["bucket_counts"], {
+            'published': 17,
+            'future_with_choices': 1,
+            'choiceless': 1,
+            'future_choiceless': 0,
+        })
+
+    def test_admin_dashboard_query_count_is_independent_of_catalog_size(self):
+        """
+        Tests that a page is served by a fixed number of queries:
+        profile, bucket counts, page rows and the page's choices.
+        """
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {"page": 2})
+        self.assertEqual(len(response.data["results"]), 9)
+
 # --- admin_question_detail ---
 class TestAdminQuestionDetail(TestCase):
     def setUp(self):
@@ -486,6 +702,104 @@ class TestAdminQuestionDetail(TestCase):
         self.question.refresh_from_db()
         self.assertEqual(self.question.question_text, "Detail test question")
 
+    def test_put_keeps_live_vote_counters_of_unchanged_choices(self):
+        """
+        Tests that a stale 'votes' value sent back for an unchanged choice doesn't overwrite its counter.
+        """
+        choice_a = self.question.choice_set.get(choice_text="Choice A")
+        choice_a.votes = 7
+        choice_a.save()
+        new_data = {
+            "question_text": self.question.question_text,
+            "pub_date": timezone.now().isoformat(),
+            "choices": [
+                {"id": choice_a.id, "choice_text": "Choice A", "votes": 0},
+            ]
+        }
+        response = make_json_put_request(self.client, self.url, new_data)
+        self.assertEqual(response.status_code, 200)
+        choice_a.refresh_from_db()
+        self.assertEqual(choice_a.votes, 7)
+        self.assertEqual(self.question.choice_set.count(), 1)
+
+    def test_put_renamed_choice_recounts_votes_from_ballots(self):
+        """
+        Tests that renaming a choice recomputes its counter from the recorded votes.
+        """
+        choice_a = self.question.choice_set.get(choice_text="Choice A")
+        choice_a.votes = 7
+        choice_a.save()
+        create_user_vote(user=self.admin_user, question=self.question, choice=choice_a)
+        new_data = {
+            "question_text": self.question.question_text,
+            "pub_date": timezone.now().isoformat(),
+            "choices": [
+                {"id": choice_a.id, "choice_text": "Renamed A", "votes": 0},
+            ]
+        }
+        response = make_json_put_request(self.client, self.url, new_data)
+        self.assertEqual(response.status_code, 200)
+        choice_a.refresh_from_db()
+        self.assertEqual(choice_a.choice_text, "Renamed A")
+        self.assertEqual(choice_a.votes, 1)
+
+    def test_put_rejects_choices_of_other_questions(self):
+        """
+        Tests that a PUT can't update a choice belonging to another question.
+        """
+        other_question = create_question_with_choices(
+            question_text="Other question",
+            days=0,
+            choice_texts=["Other"]
+        )
+        other_choice = other_question.choice_set.get()
+        new_data = {
+            "question_text": "Hijack attempt",
+            "pub_date": timezone.now().isoformat(),
+            "choices": [{"id": other_choice.id, "choice_text": "Hijacked", "votes": 0}]
+        }
+        response = make_json_put_request(self.client, self.url, new_data)
+        self.assertEqual(response.status_code, 400)
+        other_choice.refresh_from_db()
+        self.assertEqual(other_choice.choice_text, "Other")
+        self.question.refresh_from_db()
+        self.assertEqual(self.question.question_text, "Detail test question")
+
+    def test_put_query_count_is_independent_of_number_of_choices(self):
+        """
+        Tests that editing a 50-choice question costs as many queries as editing a 2-choice one.
+        """
+        large_question = create_question_with_choices(
+            question_text="Large question",
+            days=0,
+            choice_texts=[f"Choice {i}" for i in range(50)]
+        )
+
+        def edit_all_choices(question):
+            choices = list(question.choice_set.order_by('id'))
+            new_data = {
+                "question_text": f"{question.question_text} (edited)",
+                "pub_date": timezone.now().isoformat(),
+                "choices": [
+                    {"id": choice.id, "choice_text": f"{choice.choice_text} (edited)", "votes": 0}
+                    for choice in choices[1:]
+                ] + [{"choice_text": "Added", "votes": 0}]
+            }
+            url = reverse('admin_question_detail', args=[question.id])
+            with CaptureQueriesContext(connection) as queries:
+                response = make_json_put_request(self.client, url, new_data)
+            self.assertEqual(response.status_code, 200)
+            return len(queries)
+
+        # Both edits should see the admin status already cached
+        self.client.get(reverse('admin_question_detail', args=[self.question.id]))
+        small_question_queries = edit_all_choices(self.question)
+        large_question_queries = edit_all_choices(large_question)
+
+        self.assertEqual(small_question_queries, large_question_queries)
+        self.assertEqual(large_question.choice_set.count(), 50)
+        self.assertEqual(large_question.choice_set.filter(choice_text__endswith="(edited)").count(), 49)
+
     def test_delete_existing_question_returns_204_no_content(self):
         """
         Tests that a DELETE request for a valid question ID returns a 204 No Content.
@@ -494,6 +808,27 @@ class TestAdminQuestionDetail(TestCase):
         self.assertEqual(response.status_code, 204)
         self.assertFalse(Question.objects.filter(pk=self.question.id).exists())
 
+    @override_settings(ADMIN_STATUS_CACHE_TIMEOUT=300)
+    def test_delete_query_count_is_independent_of_number_of_choices(self):
+        """
+        Tests that deleting a question costs the same number of queries with 2 or 50 choices,
+        and leaves it neither in the search index nor in the results.
+        """
+        large_question = create_question_with_choices(
+            question_text="Large detail question", days=0, choice_texts=[f"Choice {i}" for i in range(50)]
+        )
+        # Caches the admin status, so both measured requests skip the profile lookup
+        self.client.get(self.url)
+        with CaptureQueriesContext(connection) as small:
+            self.client.delete(self.url)
+        with CaptureQueriesContext(connection) as large:
+            response = self.client.delete(reverse('admin_question_detail', args=[large_question.id]))
+
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(len(small), len(large))
+        self.assertFalse(QuestionResult.objects.filter(question_id=large_question.id).exists())
+        self.assertEqual(search_questions("Large", limit=10), (0, []))
+
     def test_delete_nonexistent_question_returns_404_not_found(self):
         """
         Tests that a DELETE request for a non-existent question ID returns a 404 Not Found.
@@ -501,6 +836,50 @@ class TestAdminQuestionDetail(TestCase):
         response = self.client.delete(self.non_existent_url)
         self.assertEqual(response.status_code, 404)
 
+# --- admin_question_batch ---
+class TestAdminQuestionBatch(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('admin_question_batch')
+        self.admin_user, self.admin_profile = create_test_user_with_profile(
+            username='admin',
+            email='admin@example.com',
+            google_email='admin@gmail.com',
+            is_admin=True
+        )
+        self.client.force_authenticate(user=self.admin_user)
+
+        self.published = create_question_with_choices(
+            question_text="Published question",
+            days=-1,
+            choice_texts=["A", "B"]
+        )
+        self.future_choiceless = create_question_with_choices(
+            question_text="Future choiceless question",
+            days=5,
+            choice_texts=[]
+        )
+
+    def test_admin_question_batch_returns_hidden_questions(self):
+        """
+        Tests that admins can fetch future and choiceless questions in one request.
+        """
+        response = self.client.get(self.url, {'ids': f"{self.published.id},{self.future_choiceless.id},999"})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([q['id'] for q in response.data['results']], [self.published.id, self.future_choiceless.id])
+        self.assertEqual(response.data['results'][1]['note_choiceless'], "This question has no choices")
+        self.assertEqual(response.data['missing'], [999])
+
+    def test_admin_question_batch_requires_admin(self):
+        """
+        Tests that regular users get 403 Forbidden.
+        """
+        user, _profile = create_test_user_with_profile(username='regular', google_email='regular@gmail.com')
+        self.client.force_authenticate(user=user)
+        response = self.client.get(self.url, {'ids': str(self.published.id)})
+        self.assertEqual(response.status_code, 403)
+
 # --- admin_results_summary ---
 class TestAdminResultsSummary(TestCase):
     def setUp(self):
@@ -590,6 +969,48 @@ class TestAdminResultsSummary(TestCase):
         self.assertEqual(q3_data['total_votes'], 0)
         self.assertEqual(len(q3_data['choices']), 0)
 
+    def test_results_summary_cursor_pagination(self):
+        """
+        Tests that following next_cursor walks every question once, in summary order.
+        """
+        full_order = [q['id'] for q in self.client.get(self.url).data['questions_results']]
+
+        seen = []
+        params = {'page_size': 2}
+        while True:
+            response = self.client.get(self.url, params)
+            self.assertEqual(response.status_code, 200)
+            self.assertLessEqual(len(response.data['questions_results']), 2)
+            seen.extend(q['id'] for q in response.data['questions_results'])
+            if response.data['next_cursor'] is None:
+                break
+            params = {'page_size': 2, 'cursor': response.data['next_cursor']}
+
+        self.assertEqual(seen, full_order)
+        self.assertEqual(self.client.get(self.url, {'cursor': 'not-a-cursor'}).status_code, 400)
+
+    def test_results_summary_collapsed_then_expanded(self):
+        """
+        Tests that collapsed mode returns totals only and that expand=choices loads the choices of given ids.
+        """
+        response = self.client.get(self.url, {'collapsed': 'true', 'page_size': 10})
+        q2_data = {q['id']: q for q in response.data['questions_results']}[self.q2.id]
+        self.assertEqual((q2_data['total_votes'], q2_data['choice_count']), (20, 3))
+        self.assertNotIn('choices', q2_data)
+
+        response = self.client.get(self.url, {'expand': 'choices', 'ids': f'{self.q2.id},{self.q3_choiceless.id}'})
+        expanded = {q['id']: q for q in response.data['questions_results']}
+        self.assertEqual([c['votes'] for c in expanded[self.q2.id]['choices']], [10, 0, 10])
+        self.assertEqual(expanded[self.q3_choiceless.id]['choices'], [])
+
+    def test_results_summary_expand_hides_unpublished_from_guests(self):
+        """
+        Tests that guests cannot expand questions they don't see in the summary.
+        """
+        self.client.force_authenticate(user=None)
+        response = self.client.get(self.url, {'expand': 'choices', 'ids': f'{self.q2.id},{self.q3_choiceless.id}'})
+        self.assertEqual([q['id'] for q in response.data['questions_results']], [self.q2.id])
+
 
 # --- Authentication Views ---
 
@@ -689,6 +1110,62 @@ class TestUserInfo(TestCase):
         response = self.client.get(self.url)
         self.assertEqual(response.data['has_voted'], True)
 
+    def test_user_info_warm_call_is_cached(self):
+        """
+        Tests that a repeated user_info call reads neither the database nor writes to stdout.
+        """
+        user, _profile = create_test_user_with_profile()
+        self.client.force_authenticate(user=user)
+        cold = self.client.get(self.url)
+
+        with self.assertNumQueries(0), patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            response = self.client.get(self.url)
+        self.assertEqual(response.data, cold.data)
+        self.assertEqual(stdout.getvalue(), '')
+
+    def test_user_info_follows_profile_and_vote_changes(self):
+        """
+        Tests that the cached payload is dropped when the user's profile or ballots change,
+        including ballots cleared in bulk.
+        """
+        user, _profile = create_test_user_with_profile()
+        question = create_question_with_choices(question_text="Cached?", days=-1, choice_texts=["Yes", "No"])
+        self.client.force_authenticate(user=user)
+        self.client.get(self.url)
+
+        profile = UserProfile.objects.get(user=user)
+        profile.google_name = "After"
+        profile.save()
+        create_user_vote(user=user, question=question, choice=question.choice_set.first())
+        response = self.client.get(self.url)
+        self.assertEqual(response.data['name'], "After")
+        self.assertEqual(response.data['has_voted'], True)
+
+        apply_bulk_operation('clear_votes', [question.id])
+        self.assertEqual(self.client.get(self.url).data['has_voted'], False)
+
+    def test_user_info_follows_ballots_deleted_with_their_choice_or_question(self):
+        """
+        Tests that the cached payload is dropped when the user's ballots are deleted along with
+        their choice or question, which sends no UserVote delete signals.
+        """
+        user, _profile = create_test_user_with_profile()
+        questions = [
+            create_question_with_choices(question_text=f"Cached {i}?", days=-1, choice_texts=["Yes", "No"])
+            for i in range(2)
+        ]
+        self.client.force_authenticate(user=user)
+        create_user_vote(user=user, question=questions[0], choice=questions[0].choice_set.first())
+        self.assertEqual(self.client.get(self.url).data['has_voted'], True)
+
+        questions[0].choice_set.first().delete()
+        self.assertEqual(self.client.get(self.url).data['has_voted'], False)
+
+        create_user_vote(user=user, question=questions[1], choice=questions[1].choice_set.first())
+        self.assertEqual(self.client.get(self.url).data['has_voted'], True)
+        questions[1].delete()
+        self.assertEqual(self.client.get(self.url).data['has_voted'], False)
+
 
 # --- admin_stats ---
 class TestAdminStats(TestCase):
@@ -766,10 +1243,12 @@ class TestAdminStats(TestCase):
             choice_texts=[]
         )
         
-        # Create votes
-        create_user_vote(user=user1, question=question1, choice=question1.choice_set.first())
-        create_user_vote(user=user2, question=question1, choice=question1.choice_set.last())
-        create_user_vote(user=user1, question=question2, choice=question2.choice_set.first())
+        # Create votes, and add them to the voter sketches as vote() does once a submission commits
+        record_ballots([
+            create_user_vote(user=user1, question=question1, choice=question1.choice_set.first()),
+            create_user_vote(user=user2, question=question1, choice=question1.choice_set.last()),
+            create_user_vote(user=user1, question=question2, choice=question2.choice_set.first()),
+        ])
         
         self.client.force_authenticate(user=admin_user)
         response = self.client.get(self.url)
@@ -785,6 +1264,34 @@ class TestAdminStats(TestCase):
         self.assertEqual(hidden['choiceless'], 1)    # choiceless_question
         self.assertEqual(hidden['unpublished_choiceless'], 0)  # None
         self.assertEqual(hidden['total'], 2)  # 1 + 1 + 0
+        self.assertEqual(response.data['visible_to_clients'], 2)
+
+    @override_settings(ADMIN_STATUS_CACHE_TIMEOUT=300)
+    def test_admin_stats_are_computed_in_two_queries_and_cached(self):
+        """
+        Tests that exact stats take one aggregate per table and are served from cache until something changes.
+        """
+        admin_user, _profile = create_test_user_with_profile(username="admin", google_email="admin@gmail.com", is_admin=True)
+        voter, _profile = create_test_user_with_profile(username="voter", google_email="voter@gmail.com")
+        question = create_question_with_choices(question_text="Question", days=-1, choice_texts=["A", "B"])
+        create_question_with_choices(question_text="Future choiceless", days=5, choice_texts=[])
+        self.client.force_authenticate(user=admin_user)
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as first:
+            response = self.client.get(self.url, {'exact': 'true'})
+        with self.assertNumQueries(0):
+            cached_response = self.client.get(self.url, {'exact': 'true'})
+
+        stats_queries = [q for q in first if 'polls_userprofile' not in q['sql']]
+        self.assertEqual(len(stats_queries), 2)
+        self.assertEqual(cached_response.data, response.data)
+        self.assertEqual(response.data['hidden_questions']['unpublished_choiceless'], 1)
+
+        create_user_vote(user=voter, question=question, choice=question.choice_set.first())
+        with self.assertNumQueries(2):
+            response = self.client.get(self.url, {'exact': 'true'})
+        self.assertEqual(response.data['total_votes'], 1)
 
 
 # --- logout ---
@@ -811,6 +1318,18 @@ class TestLogout(TestCase):
         self.assertEqual(response.status_code, 200)
         self.assertEqual(response.data['message'], "Logout successful")
 
+    def test_logout_does_not_print_session_contents(self):
+        """
+        Tests that logging out writes nothing to stdout.
+        """
+        user, _profile = create_test_user_with_profile()
+        self.client.force_authenticate(user=user)
+
+        with patch('sys.stdout', new_callable=io.StringIO) as stdout:
+            response = self.client.post(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(stdout.getvalue(), '')
+
 
 # --- vote (updated with authentication) ---
 class TestVoteWithAuthentication(TestCase):
@@ -954,4 +1473,188 @@ class TestVoteWithAuthentication(TestCase):
         # Should still only have one vote per question
         self.assertEqual(UserVote.objects.filter(user=user, question=self.question).count(), 1)
         vote = UserVote.objects.get(user=user, question=self.question)
-        self.assertEqual(vote.choice, self.choice_green)  # Should be the new choice
\ No newline at end of file
+        self.assertEqual(vote.choice, self.choice_green)  # Should be the new choice
+
+    def test_vote_counters_are_updated_in_place_in_choice_order(self):
+        """
+        Tests that vote counters are incremented by the database rather than overwritten with a value
+        read earlier, one choice after the other in id order.
+        """
+        user, _profile = create_test_user_with_profile()
+        self.client.force_authenticate(user=user)
+        later = create_question_with_choices(question_text="Later question", days=-1, choice_texts=["X"])
+        later_choice = later.choice_set.get()
+        # Counted meanwhile by another submission
+        Choice.objects.filter(pk=self.choice_blue.pk).update(votes=10)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = make_json_post_request(
+                self.client, self.url, {"votes": {later.id: later_choice.id, self.question.id: self.choice_blue.id}}
+            )
+
+        self.assertEqual(response.status_code, 200)
+        counter_updates = [q['sql'] for q in queries if q['sql'].startswith('UPDATE "polls_choice"')]
+        self.assertEqual(len(counter_updates), 2)
+        self.assertTrue(all('"votes" + 1' in sql for sql in counter_updates), counter_updates)
+        self.assertTrue(counter_updates[0].endswith(f'= {self.choice_blue.pk}'), counter_updates)
+        self.choice_blue.refresh_from_db()
+        self.assertEqual(self.choice_blue.votes, 11)
+
+    def test_vote_rejected_submission_keeps_previous_votes(self):
+        """
+        Tests that a submission with an unknown or mismatched choice changes nothing:
+        ballots, vote counts, results and vote history stay as they were.
+        """
+        user, _profile = create_test_user_with_profile()
+        self.client.force_authenticate(user=user)
+        response = make_json_post_request(self.client, self.url, {"votes": {self.question.id: self.choice_blue.id}})
+        self.assertEqual(response.status_code, 200)
+        other = create_question_with_choices(question_text="Other?", days=-1, choice_texts=["X"])
+        buckets = list(VoteBucket.objects.values_list('choice_id', 'delta'))
+
+        for votes, status_code in [
+            ({self.question.id: self.choice_green.id, other.id: 999999}, 404),
+            ({self.question.id: self.choice_green.id, other.id: self.choice_blue.id}, 400),
+        ]:
+            response = make_json_post_request(self.client, self.url, {"votes": votes})
+            self.assertEqual(response.status_code, status_code)
+
+            self.assertEqual(list(UserVote.objects.filter(user=user).values_list('choice_id', flat=True)), [self.choice_blue.id])
+            self.assertEqual(
+                list(self.question.choice_set.order_by('id').values_list('votes', flat=True)), [1, 0]
+            )
+            result = QuestionResult.objects.get(question_id=self.question.id)
+            self.assertEqual([choice['votes'] for choice in result.choices], [1, 0])
+            self.assertEqual(list(VoteBucket.objects.values_list('choice_id', 'delta')), buckets)
+
+# --- admin_question_bulk ---
+class TestAdminQuestionBulk(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.url = reverse('admin_question_bulk')
+        self.admin_user, self.admin_profile = create_test_user_with_profile(
+            username="admin",
+            google_email="admin@gmail.com",
+            is_admin=True
+        )
+        self.client.force_authenticate(user=self.admin_user)
+        self.voter, _profile = create_test_user_with_profile(username="voter", email="voter@example.com",
+                                                             google_email="voter@gmail.com")
+        self.questions = [
+            create_question_with_choices(question_text=f"Bulk question {i}", days=-1, choice_texts=["A", "B"])
+            for i in range(3)
+        ]
+        for question in self.questions:
+            choice = question.choice_set.first()
+            create_user_vote(user=self.voter, question=question, choice=choice)
+            choice.votes = 1
+            choice.save()
+
+    def test_bulk_delete_reports_per_id_outcomes(self):
+        """
+        Tests that questions are deleted with their choices and ballots, and unknown ids are reported.
+        """
+        ids = [self.questions[0].id, self.questions[1].id, 999999]
+        response = make_json_post_request(self.client, self.url, {"operation": "delete", "ids": ids})
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [(result['id'], result['status']) for result in response.data['results']],
+            [(ids[0], 'deleted'), (ids[1], 'deleted'), (999999, 'not_found')]
+        )
+        self.assertEqual(response.data['counts'], {'deleted': 2, 'not_found': 1})
+        self.assertEqual(list(Question.objects.values_list('id', flat=True)), [self.questions[2].id])
+        self.assertEqual(Choice.objects.count(), 2)
+        self.assertEqual(UserVote.objects.count(), 1)
+
+    @override_settings(ADMIN_STATUS_CACHE_TIMEOUT=300)
+    def test_bulk_delete_query_count_is_independent_of_number_of_questions(self):
+        """
+        Tests that deleting many questions costs the same number of queries as deleting one.
+        """
+        many = [
+            create_question_with_choices(question_text=f"Extra {i}", days=-1, choice_texts=["X", "Y"]).id
+            for i in range(20)
+        ]
+        # Caches the admin status, so both measured requests skip the profile lookup
+        make_json_post_request(self.client, self.url, {"operation": "delete", "ids": [999999]})
+        with CaptureQueriesContext(connection) as one:
+            make_json_post_request(self.client, self.url, {"operation": "delete", "ids": [self.questions[0].id]})
+        with CaptureQueriesContext(connection) as twenty:
+            make_json_post_request(self.client, self.url, {"operation": "delete", "ids": many})
+
+        self.assertEqual(len(one), len(twenty))
+        self.assertFalse(Question.objects.filter(id__in=many).exists())
+
+    def test_bulk_delete_skips_per_row_receivers_for_one_batched_invalidation(self):
+        """
+        Tests that deleted questions and choices trigger none of their per-row receivers,
+        the batch being re-indexed and refreshed once.
+        """
+        ids = [question.id for question in self.questions]
+        with (
+            patch('polls.signals.remove_questions') as remove_questions,
+            patch('polls.signals.drop_question_results') as drop_question_results,
+            patch('polls.signals.index_questions') as index_questions,
+            patch('polls.signals.refresh_question_results') as refresh_question_results,
+        ):
+            response = make_json_post_request(self.client, self.url, {"operation": "delete", "ids": ids})
+
+        self.assertEqual(response.data['counts'], {'deleted': 3})
+        remove_questions.assert_not_called()
+        drop_question_results.assert_not_called()
+        index_questions.assert_called_once_with(ids)
+        # From catalog_changed, then from votes_changed (which names no question)
+        self.assertEqual([call.args[0] for call in refresh_question_results.call_args_list], [ids, ()])
+
+    def test_bulk_delete_covers_every_relation_of_questions_and_choices(self):
+        """
+        Tests that the rows deleted before the questions and choices are those of every model
+        referencing them, with an on_delete that set-based deletes can reproduce.
+        """
+        related = {
+            relation.related_model
+            for relation in Question._meta.related_objects + Choice._meta.related_objects
+            if relation.related_model is not Choice
+        }
+        self.assertEqual({model for model, _relation, _lookup in dependent_relations()}, related)
+        for _model, relation, _lookup in dependent_relations():
+            self.assertIn(relation.on_delete, (models.CASCADE, models.SET_NULL), relation)
+
+    def test_bulk_delete_leaves_no_rows_referencing_deleted_questions(self):
+        """
+        Tests that no row of a model referencing Question or Choice survives a bulk delete.
+        """
+        ids = [question.id for question in self.questions]
+        response = make_json_post_request(self.client, self.url, {"operation": "delete", "ids": ids})
+
+        self.assertEqual(response.status_code, 200)
+        for model, _relation, lookup in dependent_relations():
+            self.assertFalse(model._base_manager.filter(**{f'{lookup}__in': ids}).exists(), model)
+
+    def test_bulk_set_pub_date_and_clear_votes(self):
+        """
+        Tests rescheduling questions and clearing their votes.
+        """
+        ids = [question.id for question in self.questions[:2]]
+        pub_date = timezone.now() + timezone.timedelta(days=7)
+        response = make_json_post_request(self.client, self.url, {
+            "operation": "set_pub_date", "ids": ids, "pub_date": pub_date.isoformat()
+        })
+        self.assertEqual(response.data['counts'], {'updated': 2})
+        self.assertEqual(Question.objects.filter(pub_date=pub_date).count(), 2)
+
+        response = make_json_post_request(self.client, self.url, {"operation": "clear_votes", "ids": ids})
+        self.assertEqual(response.data['counts'], {'votes_cleared': 2})
+        self.assertEqual(UserVote.objects.filter(question_id__in=ids).count(), 0)
+        self.assertEqual(Choice.objects.filter(question_id__in=ids, votes__gt=0).count(), 0)
+        self.assertEqual(UserVote.objects.count(), 1)
+
+    def test_bulk_operation_validation(self):
+        """
+        Tests that unknown operations and a missing pub_date return 400 Bad Request.
+        """
+        ids = [self.questions[0].id]
+        self.assertEqual(make_json_post_request(self.client, self.url, {"operation": "archive", "ids": ids}).status_code, 400)
+        self.assertEqual(make_json_post_request(self.client, self.url, {"operation": "set_pub_date", "ids": ids}).status_code, 400)
+        self.assertEqual(make_json_post_request(self.client, self.url, {"operation": "delete", "ids": []}).status_code, 400)
@@ -4,6 +4,7 @@ from django.test import Client
 from django.contrib.auth.models import User
 from polls.models import Question, Choice, UserProfile, UserVote
 import json
+import time
 
 def create_question(question_text: str, days: int=0) -> Question:
     """
@@ -149,4 +150,46 @@ def create_complete_voting_scenario() -> dict:
         'vote': vote,
         'all_choices': list(question.choice_set.all())
     }
-    
\ No newline at end of file
+    
+
+class SharedCacheProxy:
+    """
+    Minimal stand-in for a shared HTTP cache (CDN / reverse proxy) in front of a test client.
+    A response is stored only if it is `public` with an `s-maxage` and carries no Set-Cookie,
+    keyed by path and the request headers named in its Vary header.
+    `origin_hits` counts the requests that actually reached Django.
+    """
+    def __init__(self, client: Client):
+        self.client = client
+        self.origin_hits = 0
+        self._store: dict[tuple, tuple] = {}
+
+    def _vary_key(self, path: str, vary: tuple[str, ...], headers: dict) -> tuple:
+        values = []
+        for header in vary:
+            if header.lower() == 'cookie':
+                values.append(self.client.cookies.output(header='', sep=';').strip())
+            else:
+                values.append(headers.get(f"HTTP_{header.upper().replace('-', '_')}", ''))
+        return (path, vary, tuple(values))
+
+    def get(self, path: str, **headers):
+        for key, (response, expires_at) in self._store.items():
+            cached_path, vary, _ = key
+            if cached_path == path and key == self._vary_key(path, vary, headers) and time.monotonic() < expires_at:
+                return response
+
+        self.origin_hits += 1
+        response = self.client.get(path, **headers)
+
+        cache_control = response.headers.get('Cache-Control', '')
+        directives = dict(
+            (part.split('=', 1) + [''])[:2]
+            for part in (d.strip() for d in cache_control.split(','))
+            if part
+        )
+        if 'public' in directives and 's-maxage' in directives and not response.cookies:
+            vary = tuple(v.strip() for v in response.headers.get('Vary', '').split(',') if v.strip())
+            expires_at = time.monotonic() + int(directives['s-maxage'])
+            self._store[self._vary_key(path, vary, headers)] = (response, expires_at)
+        return response
@@ -7,7 +7,10 @@ urlpatterns = [
     path('', views.client_poll_list, name='client_poll_list'),
     # TODO: the client_poll_detail url might not be used in the frontend.
     path('<int:pk>/', views.client_poll_detail, name='client_poll_detail'),
+    path('batch/', views.client_poll_batch, name='client_poll_batch'),
     path('vote/', views.vote, name='vote'),
+    path('results/stream/', views.results_stream, name='results_stream'),
+    path('results/frozen/<str:digest>/', views.frozen_results_summary, name='frozen_results_summary'),
     path('user-votes/', views.user_votes, name='user_votes'),
     path('admin-user-management/', views.admin_user_management, name='admin_user_management'),
     path('poll-closure/', views.poll_closure, name='poll_closure'),
@@ -0,0 +1,67 @@
+"""
+The user_info payload of authenticated users (who they are, whether they are an
+admin, whether they have voted), requested on every page load.
+
+It is cached per user; polls.signals drops a user's entry when their user row,
+profile or ballots change, and the bulk operations that delete ballots without
+signals drop the entries of the voters they affect.
+"""
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from polls.models import UserProfile, UserVote
+
+
+def user_info_cache_key(user_id):
+    return f'polls:user-info:{user_id}'
+
+
+def invalidate_user_info(user_ids):
+    """
+    Drops the cached payloads of the given users, now and when the current
+    transaction commits (in case a concurrent request re-cached the old value meanwhile).
+    """
+    keys = [user_info_cache_key(user_id) for user_id in set(user_ids)]
+    if not keys:
+        return
+    cache.delete_many(keys)
+    transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def has_user_voted(user):
+    """
+    Check if user has voted on any poll.
+    This is used by the user_info endpoint and home page logic.
+    """
+    return UserVote.objects.filter(user=user).exists()
+
+
+def get_user_info(user):
+    """The user_info payload of an authenticated user."""
+    key = user_info_cache_key(user.pk)
+    info = cache.get(key)
+    if info is not None:
+        return info
+
+    profile = UserProfile.objects.filter(user=user).values_list('google_email', 'google_name', 'is_admin').first()
+    if profile is not None:
+        google_email, google_name, is_admin = profile
+        info = {
+            'authenticated': True,
+            'email': google_email,
+            'name': google_name,
+            'is_admin': is_admin,
+            'has_voted': has_user_voted(user)
+        }
+    else:
+        # Fallback for users without profiles (shouldn't happen in OAuth flow)
+        info = {
+            'authenticated': True,
+            'email': user.email,
+            'name': user.username,
+            'is_admin': False,
+            'has_voted': False
+        }
+    cache.set(key, info, settings.USER_INFO_CACHE_TIMEOUT)
+    return info
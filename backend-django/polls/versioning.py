@@ -0,0 +1,90 @@
+"""
+Cache versions of the poll catalog (questions and choices) and of the votes.
+
+Cached snapshots include the versions they were computed from in their cache key,
+so bumping a version makes every dependent snapshot unreachable at once, with no
+key bookkeeping. Versions start from the current time in nanoseconds, so a
+version lost to eviction or a cache restart is never reused.
+
+Writes that go through Model.save()/delete() bump the versions via the receivers
+in polls.signals. Bulk writes (bulk_create, bulk_update, QuerySet.update/delete)
+send catalog_changed / votes_changed themselves; so do the batches written inside
+batched_writes(), which silences the per-row receivers of questions and choices.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.core.cache import cache
+from django.db import transaction
+from django.dispatch import Signal
+
+CATALOG = 'catalog'
+VOTES = 'votes'
+
+# Sent after questions or choices were written without Model.save()/delete()
+catalog_changed = Signal()
+# Sent after ballots were written without Model.save()/delete()
+votes_changed = Signal()
+
+_batched_writes = ContextVar('polls_batched_writes', default=False)
+
+
+@contextmanager
+def batched_writes():
+    """
+    Within the block, saving or deleting questions and choices row by row triggers
+    none of their per-row receivers (polls.signals): the caller sends catalog_changed /
+    votes_changed once for the whole batch, after the block.
+    """
+    token = _batched_writes.set(True)
+    try:
+        yield
+    finally:
+        _batched_writes.reset(token)
+
+
+def in_batched_writes():
+    return _batched_writes.get()
+
+
+def version_cache_key(name):
+    return f'polls:version:{name}'
+
+
+def get_version(name):
+    version = cache.get(version_cache_key(name))
+    if version is None:
+        version = time.time_ns()
+        # add() keeps the value of a concurrent initializer, if any
+        if not cache.add(version_cache_key(name), version, timeout=None):
+            version = cache.get(version_cache_key(name), version)
+    return version
+
+
+def bump_version(name):
+    try:
+        return cache.incr(version_cache_key(name))
+    except ValueError:
+        # Not in the cache (yet): start a fresh, never-used version
+        version = time.time_ns()
+        cache.set(version_cache_key(name), version, timeout=None)
+        return version
+
+
+def mark_changed(*names):
+    """
+    Bumps the versions now, and again when the current transaction commits, so a
+    snapshot computed from pre-commit data in the meantime is not kept.
+    """
+    def bump_all():
+        for name in names:
+            bump_version(name)
+
+    bump_all()
+    transaction.on_commit(bump_all)
+
+
+def versioned_cache_key(prefix, *names):
+    """Builds a cache key for a snapshot that depends on the given versions."""
+    return ':'.join([f'polls:{prefix}'] + [f'{name}{get_version(name)}' for name in names])
@@ -1,33 +1,94 @@
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.paginator import Paginator, PageNotAnInteger, EmptyPage
+from django.db import transaction
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import Case, Count, Exists, F, IntegerField, Min, OuterRef, Q, Value, When
+from django.db.models.functions import TruncDate
+from django.core.serializers.json import DjangoJSONEncoder
+from django.core.handlers.asgi import ASGIRequest
+from django.http import JsonResponse, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.urls import reverse
 from django.utils import timezone
 from django.contrib.auth.models import User
 from django.contrib.auth import logout as django_logout
 from django.views.decorators.csrf import ensure_csrf_cookie, csrf_exempt
+from django.views.decorators.http import require_GET
+from asgiref.sync import sync_to_async
 from rest_framework.request import Request
 from rest_framework.response import Response
 from rest_framework import status
 from rest_framework.decorators import api_view, permission_classes, authentication_classes
 from rest_framework.authentication import SessionAuthentication
 from rest_framework.permissions import IsAuthenticated
+import datetime
+from collections import Counter
+import base64
+import io
+import json
+import logging
 import os
+import time
 
 from pydantic import ValidationError
 
-from polls.models import Question, Choice, UserProfile, UserVote, AdminUserManagement, PollStatus
+from polls.models import Question, Choice, UserProfile, UserVote, AdminUserManagement, PollStatus, QuestionResult
 from polls.schemas import (
+    BulkQuestionOperationSchema,
     NewQuestionSchema, 
+    NewQuestionsBatchSchema,
     PollSubmissionSchema, 
     QuestionAdminSchema, 
-    QuestionUpdateSchema,
-    ResultsSummarySchema
+    QuestionUpdateSchema
 )
 from polls.serializers import serialize_question_with_choices, serialize_question_with_choices_admin
+from polls.caching import frozen_response, get_or_refresh, guest_cacheable, immutable_response
+from polls.permissions import IsMainPollAdmin, IsMainPollAdminOrReadOnly, IsPollAdmin, get_admin_status
+from polls.versioning import CATALOG, VOTES, catalog_changed, get_version, versioned_cache_key, votes_changed
+from polls.exporting import CONTENT_TYPES, EXPORT_DATASETS, EXPORT_FORMATS, export_filename, stream_export
+from polls.bulk_operations import apply_bulk_operation
+from polls.importing import IMPORT_FORMATS, detect_format, import_questions
+from polls.analytics import describe_crosstab, get_ballot_matrix
+from polls.bitmaps import load_bitmaps, question_choice_ids, segment_bitmap, update_bitmaps
+from polls.frozen import (
+    freeze,
+    get_frozen_results,
+    get_frozen_user_votes,
+    get_snapshot,
+    mark_open,
+)
+from polls.history import RESOLUTION_LENGTHS, RESOLUTIONS, record_vote_deltas, vote_history
+from polls.pubsub import get_broker
+from polls.results import RESULTS_CHANNEL, build_results_summary, changed_results, serialize_choices, serialize_result
+from polls.search import search_questions
+from polls.user_info import get_user_info, invalidate_user_info
+from polls.hll import (
+    GLOBAL_SKETCH_KEY,
+    day_sketch_key,
+    estimate_voters,
+    load_sketches,
+    question_sketch_key,
+    record_ballots,
+)
+
 
+logger = logging.getLogger(__name__)
 
 QUESTIONS_PER_PAGE = 5
 ADMIN_QUESTIONS_PER_PAGE = 10
+MAX_BATCH_IDS = 100
+MAX_VOTER_COUNT_DAYS = 366
+MAX_HISTORY_BUCKETS = 10_000
+MAX_CROSSTAB_QUESTIONS = 200
+SUMMARY_PAGE_SIZE = 20
+MAX_SUMMARY_PAGE_SIZE = 100
+
+# Admin ordering buckets, in display order
+BUCKET_PUBLISHED = 0
+BUCKET_FUTURE_WITH_CHOICES = 1
+BUCKET_CHOICELESS = 2
+BUCKET_FUTURE_CHOICELESS = 3
 
 class CsrfExemptSessionAuthentication(SessionAuthentication):
     """DRF SessionAuthentication that skips CSRF checks for unsafe methods."""
@@ -35,46 +96,32 @@ class CsrfExemptSessionAuthentication(SessionAuthentication):
         return
 
 def get_ordered_questions_for_admin():
-    """Get questions ordered by admin dashboard requirements"""
+    """
+    Get questions ordered by admin dashboard requirements, as a single queryset:
+    published with choices, future with choices, choiceless, future choiceless,
+    each by pub_date with id as the fallback.
+    The bucket is a CASE annotation, so slicing the queryset paginates in the database.
+    """
     now = timezone.now()
-    
-    # Published questions (old to new)
-    published = Question.objects.filter(
-        pub_date__lte=now,
-        choice__isnull=False
-    ).distinct().order_by('pub_date', 'id')
-    
-    # Future questions with choices (by pub_date, fallback to id)
-    future_with_choices = Question.objects.filter(
-        pub_date__gt=now,
-        choice__isnull=False
-    ).distinct().order_by('pub_date', 'id')
-    
-    # Get all question IDs that have choices
-    questions_with_choices = Question.objects.filter(
-        choice__isnull=False
-    ).values_list('id', flat=True).distinct()
-    
-    # Choiceless questions - published (by pub_date, fallback to id)
-    choiceless = Question.objects.filter(
-        pub_date__lte=now
-    ).exclude(
-        id__in=questions_with_choices
-    ).order_by('pub_date', 'id')
-    
-    # Future choiceless questions
-    future_choiceless = Question.objects.filter(
-        pub_date__gt=now
-    ).exclude(
-        id__in=questions_with_choices
-    ).order_by('pub_date', 'id')
-    
-    return {
-        'published': published,
-        'future_with_choices': future_with_choices,
-        'choiceless': choiceless,
-        'future_choiceless': future_choiceless
-    }
+    return Question.objects.annotate(
+        has_choices=Exists(Choice.objects.filter(question=OuterRef('pk'))),
+        bucket=Case(
+            When(has_choices=True, pub_date__lte=now, then=Value(BUCKET_PUBLISHED)),
+            When(has_choices=True, then=Value(BUCKET_FUTURE_WITH_CHOICES)),
+            When(pub_date__lte=now, then=Value(BUCKET_CHOICELESS)),
+            default=Value(BUCKET_FUTURE_CHOICELESS),
+            output_field=IntegerField(),
+        ),
+    ).order_by('bucket', 'pub_date', 'id')
+
+def count_questions_by_bucket(questions_queryset):
+    """Per-bucket counts for a queryset from get_ordered_questions_for_admin(), in one aggregate query."""
+    return questions_queryset.order_by().aggregate(
+        published=Count('id', filter=Q(bucket=BUCKET_PUBLISHED)),
+        future_with_choices=Count('id', filter=Q(bucket=BUCKET_FUTURE_WITH_CHOICES)),
+        choiceless=Count('id', filter=Q(bucket=BUCKET_CHOICELESS)),
+        future_choiceless=Count('id', filter=Q(bucket=BUCKET_FUTURE_CHOICELESS)),
+    )
 
 def get_ordered_questions_for_client():
     """Get questions ordered for client view (published only)"""
@@ -83,12 +130,56 @@ def get_ordered_questions_for_client():
         choice__isnull=False
     ).distinct().order_by('pub_date', 'id')
 
+def get_ordered_results_for_admin():
+    """QuestionResult rows in the admin dashboard order (see get_ordered_questions_for_admin)."""
+    now = timezone.now()
+    return QuestionResult.objects.annotate(
+        bucket=Case(
+            When(choice_count__gt=0, pub_date__lte=now, then=Value(BUCKET_PUBLISHED)),
+            When(choice_count__gt=0, then=Value(BUCKET_FUTURE_WITH_CHOICES)),
+            When(pub_date__lte=now, then=Value(BUCKET_CHOICELESS)),
+            default=Value(BUCKET_FUTURE_CHOICELESS),
+            output_field=IntegerField(),
+        ),
+    ).order_by('bucket', 'pub_date', 'question_id')
+
+def get_ordered_results_for_client():
+    """QuestionResult rows of published questions with choices, in the client order."""
+    return QuestionResult.objects.filter(
+        pub_date__lte=timezone.now(),
+        choice_count__gt=0
+    ).order_by('pub_date', 'question_id')
+
+def parse_batch_ids(raw_ids):
+    """
+    Parses the comma-separated `ids` query parameter of the batch endpoints.
+    Returns (ids, error): ids are de-duplicated and keep the requested order.
+    """
+    if not raw_ids:
+        return None, "Query parameter 'ids' is required"
+    try:
+        ids = list(dict.fromkeys(int(part) for part in raw_ids.split(',') if part.strip()))
+    except ValueError:
+        return None, "Query parameter 'ids' must be a comma-separated list of integers"
+    if not ids:
+        return None, "Query parameter 'ids' is required"
+    if len(ids) > MAX_BATCH_IDS:
+        return None, f"At most {MAX_BATCH_IDS} ids can be requested at once"
+    return ids, None
+
 # --- Client Views ---
 @api_view(["GET"])
+@guest_cacheable
 def client_poll_list(request: Request):
     """
     Returns a paginated list of published questions with standardized ordering.
+    While the poll is closed, it is served from the frozen results (see polls.frozen).
     """
+    frozen = get_frozen_results(build_frozen_snapshot)
+    if frozen:
+        digest, snapshot = frozen
+        return frozen_response(request, paginate_frozen_questions(request, snapshot['questions']), digest)
+
     # Use standardized ordering for client view
     questions_queryset = get_ordered_questions_for_client()
 
@@ -136,7 +227,29 @@ def client_poll_list(request: Request):
 
     return Response(response_data, status=status.HTTP_200_OK)
 
+
+def paginate_frozen_questions(request, questions):
+    # Same pages as client_poll_list, over the frozen list of serialized questions
+    if request.query_params.get('page_size') == 'all':
+        return {'count': len(questions), 'next': None, 'previous': None, 'page': 1, 'total_pages': 1, 'results': questions}
+    paginator = Paginator(questions, QUESTIONS_PER_PAGE)
+    try:
+        page_obj = paginator.page(request.query_params.get('page', 1))
+    except PageNotAnInteger:
+        page_obj = paginator.page(1)
+    except EmptyPage:
+        page_obj = paginator.page(paginator.num_pages)
+    return {
+        'count': paginator.count,
+        'next': page_obj.next_page_number() if page_obj.has_next() else None,
+        'previous': page_obj.previous_page_number() if page_obj.has_previous() else None,
+        'page': page_obj.number,
+        'total_pages': paginator.num_pages,
+        'results': list(page_obj),
+    }
+
 @api_view(["GET"])
+@guest_cacheable
 def client_poll_detail(_request: Request, pk):
     """
     Returns a single question with choices.
@@ -150,6 +263,32 @@ def client_poll_detail(_request: Request, pk):
     serialized_question = serialize_question_with_choices(question).model_dump()
     return Response(serialized_question, status=status.HTTP_200_OK)
 
+@api_view(["GET"])
+@guest_cacheable
+def client_poll_batch(request: Request):
+    """
+    Returns several published questions with choices in one response (?ids=1,2,3).
+    Runs two queries regardless of the number of ids: one for the questions, one for their choices.
+    Ids that don't exist or aren't visible to clients are reported under 'missing' instead of a 404.
+    """
+    ids, error = parse_batch_ids(request.query_params.get('ids'))
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+    questions = get_ordered_questions_for_client().filter(id__in=ids).prefetch_related("choice_set")
+    questions_by_id = {question.id: question for question in questions}
+
+    results = [
+        serialize_question_with_choices(questions_by_id[question_id]).model_dump()
+        for question_id in ids
+        if question_id in questions_by_id
+    ]
+    return Response({
+        'count': len(results),
+        'results': results,
+        'missing': [question_id for question_id in ids if question_id not in questions_by_id]
+    }, status=status.HTTP_200_OK)
+
 @api_view(["POST"])
 @permission_classes([IsAuthenticated])
 @csrf_exempt
@@ -165,13 +304,7 @@ def vote(request: Request):
     The endpoint removes ALL existing votes for the user, then adds the new votes.
     This ensures atomic vote updates and allows users to change or remove their votes.
     """
-    # Debug authentication
-    print(f"Vote request - User: {request.user}, Authenticated: {request.user.is_authenticated}")
-    print(f"Session key: {request.session.session_key}")
-    print(f"Session data: {dict(request.session)}")
-    
     if not request.user.is_authenticated:
-        print("User not authenticated for vote")
         return Response({"error": "Authentication required"}, status=status.HTTP_403_FORBIDDEN)
     
     # Check if poll is closed
@@ -179,43 +312,70 @@ def vote(request: Request):
         return Response({"error": "Poll is closed. No further votes accepted."}, status=status.HTTP_403_FORBIDDEN)
     
     try:
-        # Print the raw data for debugging
-        print("Received data:", request.data)
         submission = PollSubmissionSchema.model_validate(request.data)
     except ValidationError as e:
-        # Print the validation error's JSON to the console
-        print("Pydantic ValidationError:", e.json())
         return Response({"error": e.json()}, status=status.HTTP_400_BAD_REQUEST)
 
     votes_dict = submission.votes
 
-    # Step 1: Remove ALL existing votes for this user
-    existing_votes = UserVote.objects.filter(user=request.user).select_related('choice')
-    for existing_vote in existing_votes:
-        # Decrement vote count for each existing choice
-        existing_vote.choice.votes -= 1
-        existing_vote.choice.save()
-    
-    # Delete all existing user votes
-    existing_votes.delete()
-    
-    # Step 2: Add new votes (if any provided)
-    if votes_dict:
+    # Both steps run in one transaction, together with the results they update
+    with transaction.atomic():
+        # Step 1: Remove ALL existing votes for this user
+        existing_votes = UserVote.objects.filter(user=request.user)
+        changed_question_ids = set()
+        # Net change per (question_id, choice_id), for the vote counters and the vote history
+        vote_deltas = Counter()
+        # {choice_id: user ids} for the voter bitmaps
+        removed_voters, added_voters = {}, {}
+        for question_id, choice_id in existing_votes.values_list('question_id', 'choice_id'):
+            changed_question_ids.add(question_id)
+            vote_deltas[question_id, choice_id] -= 1
+            removed_voters.setdefault(choice_id, set()).add(request.user.id)
+
+        # Delete all existing user votes (UserVote deletes send no signals, see polls.signals)
+        existing_votes.delete()
+        invalidate_user_info([request.user.id])
+
+        # Step 2: Add new votes (if any provided)
+        error = None
+        new_ballots = []
         for question_id, choice_id in votes_dict.items():
             try:
                 choice = Choice.objects.select_related("question").get(pk=choice_id)
             except ObjectDoesNotExist:
-                return Response({"error": "Choice with this ID was not found"}, status=status.HTTP_404_NOT_FOUND)
+                error = Response({"error": "Choice with this ID was not found"}, status=status.HTTP_404_NOT_FOUND)
+                break
 
             if choice.question_id != question_id:
-                return Response({"error": "Choice does not belong to this question"}, status=status.HTTP_400_BAD_REQUEST)
-            
+                error = Response({"error": "Choice does not belong to this question"}, status=status.HTTP_400_BAD_REQUEST)
+                break
+
             # Record new vote
-            UserVote.objects.create(user=request.user, question=choice.question, choice=choice)
-            
-            # Increment vote count
-            choice.votes += 1
-            choice.save()
+            new_ballots.append(UserVote.objects.create(user=request.user, question=choice.question, choice=choice))
+            changed_question_ids.add(choice.question_id)
+            vote_deltas[choice.question_id, choice.id] += 1
+            added_voters.setdefault(choice.id, set()).add(request.user.id)
+            removed_voters.get(choice.id, set()).discard(request.user.id)
+
+        if error:
+            # The submission is rejected as a whole: the user keeps their previous votes
+            transaction.set_rollback(True)
+            return error
+
+        # Counters are updated in place, so concurrent submissions don't lose each other's
+        # votes, and in choice id order, so they lock the rows in the same order
+        for (_question_id, choice_id), delta in sorted(vote_deltas.items(), key=lambda item: item[0][1]):
+            if delta:
+                Choice.objects.filter(pk=choice_id).update(votes=F('votes') + delta)
+        # Re-submitting the same choices cancels out and records nothing
+        record_vote_deltas(vote_deltas)
+        update_bitmaps(added_voters, removed_voters)
+        # Refreshes the results of every question touched, once each
+        votes_changed.send(sender=UserVote, question_ids=changed_question_ids)
+        # Once per submission, after the vote's locks are released: the shared sketch rows
+        # are locked in a short transaction of their own
+        if new_ballots:
+            transaction.on_commit(lambda: record_ballots(new_ballots))
 
     return Response({"message": "Votes updated successfully"}, status=status.HTTP_200_OK)
 
@@ -228,6 +388,20 @@ def user_votes(request: Request):
     """
     if not request.user.is_authenticated:
         return Response({"error": "Authentication required"}, status=status.HTTP_403_FORBIDDEN)
+
+    frozen = get_frozen_results(build_frozen_snapshot)
+    if frozen:
+        # The poll is closed: the user's votes can't change either
+        digest, snapshot = frozen
+        user_votes_dict = get_frozen_user_votes(
+            digest, request.user.id,
+            lambda: dict(UserVote.objects.filter(user=request.user).values_list('question_id', 'choice_id'))
+        )
+        results = [
+            {**question, 'user_selected_choice_id': user_votes_dict.get(question['id'])}
+            for question in snapshot['questions']
+        ]
+        return Response({'count': len(results), 'results': results}, status=status.HTTP_200_OK)
     
     # Get questions using standardized ordering
     questions_queryset = get_ordered_questions_for_client().prefetch_related("choice_set")
@@ -251,73 +425,110 @@ def user_votes(request: Request):
     
 # --- Admin Views ---
 @api_view(["POST"])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsPollAdmin])
 @csrf_exempt
 @authentication_classes([CsrfExemptSessionAuthentication])
 def admin_create_question(request: Request):
     """
     Creates a new question with choices.
     """
-    # Check if user is admin
-    try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        if not user_profile.is_admin:
-            return Response({"error": "Admin access required"}, status=status.HTTP_403_FORBIDDEN)
-    except UserProfile.DoesNotExist:
-        return Response({"error": "User profile not found"}, status=status.HTTP_403_FORBIDDEN)
-    
     try:
         validated_data = NewQuestionSchema.model_validate(request.data)
     except ValidationError as e:
         return Response({"errors": e.errors()}, status=status.HTTP_400_BAD_REQUEST)
-    
-    # DEBUG
-    print("Validated Data:", validated_data)
 
-    # Create the question
-    question = Question.objects.create(
-        question_text=validated_data.question_text,
-        pub_date=validated_data.pub_date
-    )
-    
-    # DEBUG
-    print("Created Question:", question)
-    print("Question ID:", question.id)
+    # The question and its choices are written together or not at all
+    [question] = Question.create_with_choices([validated_data])
+
+    return Response({"message": "Question created successfully", "id": question.id}, status=status.HTTP_201_CREATED)
+
+@api_view(["POST"])
+@permission_classes([IsPollAdmin])
+@csrf_exempt
+@authentication_classes([CsrfExemptSessionAuthentication])
+def admin_create_questions_bulk(request: Request):
+    """
+    Creates several questions with their choices in one request ({"questions": [...]}).
+    Every question is validated first; then all of them are written in a single transaction.
+    """
+    try:
+        validated_data = NewQuestionsBatchSchema.model_validate(request.data)
+    except ValidationError as e:
+        return Response({"errors": e.errors()}, status=status.HTTP_400_BAD_REQUEST)
+
+    questions = Question.create_with_choices(validated_data.questions)
+
+    return Response({
+        "message": f"{len(questions)} questions created successfully",
+        "ids": [question.id for question in questions]
+    }, status=status.HTTP_201_CREATED)
     
-    # Create choices for the question
-    for choice in validated_data.choices:
-        Choice.objects.create(
-            question=question,
-            choice_text=choice.choice_text,
-            votes=choice.votes
+@api_view(["POST"])
+@permission_classes([IsPollAdmin])
+@csrf_exempt
+@authentication_classes([CsrfExemptSessionAuthentication])
+def admin_import_questions(request: Request):
+    """
+    Imports questions from an uploaded CSV or NDJSON file (multipart field 'file').
+    The file is streamed and written in chunks (see polls.importing); the response reports
+    how many rows were processed and created, and the errors of the rows that were skipped.
+    If the file stops being readable part way, the rows before that point stay imported and
+    the report gives the line reading stopped at: 207 when some questions were created, 400 otherwise.
+    """
+    upload = request.FILES.get('file')
+    if upload is None:
+        return Response({"error": "A 'file' upload is required"}, status=status.HTTP_400_BAD_REQUEST)
+
+    import_format = detect_format(upload.name, request.query_params.get('format'))
+    if import_format is None:
+        return Response(
+            {"error": f"Unsupported format, expected one of {', '.join(IMPORT_FORMATS)}"},
+            status=status.HTTP_400_BAD_REQUEST
         )
-    
-    return Response({"message": "Question created successfully"}, status=status.HTTP_201_CREATED)
-    
+
+    lines = io.TextIOWrapper(upload.file, encoding='utf-8-sig', newline='')
+    report = import_questions(lines, import_format)
+
+    if report.read_error is not None:
+        read_error = report.read_error
+        return Response(
+            {"error": f"Could not read file from line {read_error['line']}: {read_error['error']}", **report.as_dict()},
+            status=status.HTTP_207_MULTI_STATUS if report.created else status.HTTP_400_BAD_REQUEST
+        )
+    return Response(report.as_dict(), status=status.HTTP_200_OK)
+
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsPollAdmin])
+def admin_export(request: Request):
+    """
+    Streams an export of questions, choices and results (?dataset=results, default)
+    or of individual ballots (?dataset=ballots) as CSV or NDJSON (?format=csv|ndjson).
+    ?compress=gzip returns a gzip file. Memory use is constant, see polls.exporting.
+    """
+    export_format = request.query_params.get('format', 'csv')
+    dataset = request.query_params.get('dataset', 'results')
+    compress = request.query_params.get('compress') == 'gzip'
+    if export_format not in EXPORT_FORMATS:
+        return Response({"error": f"format must be one of {', '.join(EXPORT_FORMATS)}"}, status=status.HTTP_400_BAD_REQUEST)
+    if dataset not in EXPORT_DATASETS:
+        return Response({"error": f"dataset must be one of {', '.join(EXPORT_DATASETS)}"}, status=status.HTTP_400_BAD_REQUEST)
+
+    response = StreamingHttpResponse(
+        stream_export(dataset, export_format, compress),
+        content_type='application/gzip' if compress else CONTENT_TYPES[export_format]
+    )
+    response['Content-Disposition'] = f'attachment; filename="{export_filename(dataset, export_format, compress)}"'
+    return response
+
+@api_view(['GET'])
+@permission_classes([IsPollAdmin])
 def admin_dashboard(request: Request):
     """
     Returns a paginated list of questions with standardized ordering.
+    With ?q=..., returns the questions whose text or choices match every search
+    term instead, best match first (see polls.search).
     """
-    # Check if user is admin
-    try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        if not user_profile.is_admin:
-            return Response({"error": "Admin access required"}, status=status.HTTP_403_FORBIDDEN)
-    except UserProfile.DoesNotExist:
-        return Response({"error": "User profile not found"}, status=status.HTTP_403_FORBIDDEN)
-    
-    # Use standardized ordering for admin dashboard
-    ordered_questions = get_ordered_questions_for_admin()
-    
-    # Combine all question types in the desired order
-    questions_queryset = (
-        list(ordered_questions['published']) +
-        list(ordered_questions['future_with_choices']) +
-        list(ordered_questions['choiceless']) +
-        list(ordered_questions['future_choiceless'])
-    )
+    search_query = request.query_params.get('q', '').strip()
 
     try:
         page_size = int(request.query_params.get('page_size', ADMIN_QUESTIONS_PER_PAGE))
@@ -325,26 +536,39 @@ def admin_dashboard(request: Request):
             page_size = ADMIN_QUESTIONS_PER_PAGE
     except ValueError: 
         page_size = ADMIN_QUESTIONS_PER_PAGE
-    
-    # Manual pagination for the list
-    total_count = len(questions_queryset)
-    total_pages = (total_count + page_size - 1) // page_size  # Ceiling division
-    
+
     try:
-        page_number = int(request.query_params.get('page', 1))
-        if page_number < 1:
-            page_number = 1
-        elif page_number > total_pages and total_pages > 0:
-            page_number = total_pages
+        page_number = max(int(request.query_params.get('page', 1)), 1)
     except ValueError:
         page_number = 1
-    
-    # Calculate slice indices
-    start_index = (page_number - 1) * page_size
-    end_index = start_index + page_size
-    
-    # Get the page slice
-    page_questions = questions_queryset[start_index:end_index]
+
+    if search_query:
+        # Ranking and pagination happen in the search index
+        total_count, page_ids = search_questions(search_query, page_size, (page_number - 1) * page_size)
+        total_pages = (total_count + page_size - 1) // page_size
+        if page_number > total_pages > 0:
+            page_number = total_pages
+            total_count, page_ids = search_questions(search_query, page_size, (page_number - 1) * page_size)
+        questions_by_id = Question.objects.prefetch_related("choice_set").in_bulk(page_ids)
+        page_questions = [questions_by_id[question_id] for question_id in page_ids if question_id in questions_by_id]
+        bucket_counts = None
+    else:
+        # Use standardized ordering for admin dashboard
+        questions_queryset = get_ordered_questions_for_admin()
+        bucket_counts = count_questions_by_bucket(questions_queryset)
+
+        # Manual pagination, applied as LIMIT/OFFSET in the database
+        total_count = sum(bucket_counts.values())
+        total_pages = (total_count + page_size - 1) // page_size  # Ceiling division
+        if page_number > total_pages > 0:
+            page_number = total_pages
+
+        # Calculate slice indices
+        start_index = (page_number - 1) * page_size
+        end_index = start_index + page_size
+
+        # Get the page slice
+        page_questions = questions_queryset.prefetch_related("choice_set")[start_index:end_index]
     
     serialized_questions = [
         serialize_question_with_choices_admin(q).model_dump()
@@ -359,27 +583,22 @@ def admin_dashboard(request: Request):
         'page': page_number,
         'total_pages': total_pages,
         'page_size': page_size,
+        'bucket_counts': bucket_counts,
         'results': serialized_questions
     }
+    if search_query:
+        response_data['query'] = search_query
 
     return Response(response_data, status=status.HTTP_200_OK)
 
 @api_view(['GET', 'PUT', 'DELETE'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsPollAdmin])
 @csrf_exempt
 @authentication_classes([CsrfExemptSessionAuthentication])
 def admin_question_detail(request: Request, pk):
     """
     Handles read, update and delete operations for a single question.
     """
-    # Check if user is admin
-    try:
-        user_profile = UserProfile.objects.get(user=request.user)
-        if not user_profile.is_admin:
-            return Response({"error": "Admin access required"}, status=status.HTTP_403_FORBIDDEN)
-    except UserProfile.DoesNotExist:
-        return Response({"error": "User profile not found"}, status=status.HTTP_403_FORBIDDEN)
-    
     question = get_object_or_404(
         Question.objects.prefetch_related("choice_set").distinct(), 
         pk=pk,
@@ -396,51 +615,117 @@ def admin_question_detail(request: Request, pk):
         except ValidationError as e:
             return Response({"errors": e.errors()}, status=status.HTTP_400_BAD_REQUEST)
 
-        # Update the question's text and publication date
-        question.question_text = validated_data.question_text
-        question.pub_date = validated_data.pub_date
-        question.save()
-
-        # Get existing choice IDs for deletion check
-        existing_choice_ids = set(question.choice_set.values_list('id', flat=True))
+        existing_choices = {choice.id: choice for choice in question.choice_set.all()}
         incoming_choice_ids = {c.id for c in validated_data.choices if c.id is not None}
-        
-        # Delete choices that are not in the new data
-        choices_to_delete_ids = existing_choice_ids - incoming_choice_ids
-        Choice.objects.filter(id__in=choices_to_delete_ids).delete()
+        unknown_choice_ids = incoming_choice_ids - existing_choices.keys()
+        if unknown_choice_ids:
+            return Response(
+                {"error": f"Choices {sorted(unknown_choice_ids)} do not belong to this question"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
 
-        # Update or create choices
+        # Only choices whose text changed are written back; unchanged ones keep their live vote counters
+        renamed_choices = []
+        new_choices = []
         for choice_data in validated_data.choices:
-            if choice_data.id is not None:
-                # Update existing choice
-                Choice.objects.filter(id=choice_data.id).update(
-                    choice_text=choice_data.choice_text,
-                    votes=choice_data.votes
-                )
-            else:
-                # Create new choice
-                Choice.objects.create(
+            if choice_data.id is None:
+                new_choices.append(Choice(
                     question=question,
                     choice_text=choice_data.choice_text,
-                    votes=choice_data.votes
+                    votes=choice_data.votes or 0
+                ))
+                continue
+            choice = existing_choices[choice_data.id]
+            if choice.choice_text != choice_data.choice_text:
+                choice.choice_text = choice_data.choice_text
+                renamed_choices.append(choice)
+        choices_to_delete_ids = existing_choices.keys() - incoming_choice_ids
+
+        # Apply the whole edit atomically, with a query count independent of the number of choices
+        with transaction.atomic():
+            question.question_text = validated_data.question_text
+            question.pub_date = validated_data.pub_date
+            question.save(update_fields=['question_text', 'pub_date'])
+
+            if choices_to_delete_ids:
+                Choice.objects.filter(id__in=choices_to_delete_ids).delete()
+
+            if renamed_choices:
+                # A renamed choice is a different answer: recount its votes from the recorded ballots
+                ballot_counts = dict(
+                    UserVote.objects.filter(choice__in=renamed_choices)
+                    .values('choice')
+                    .annotate(total=Count('id'))
+                    .values_list('choice', 'total')
                 )
+                for choice in renamed_choices:
+                    choice.votes = ballot_counts.get(choice.id, 0)
+                Choice.objects.bulk_update(renamed_choices, ['choice_text', 'votes'])
+
+            if new_choices:
+                Choice.objects.bulk_create(new_choices)
+        catalog_changed.send(sender=Question, question_ids=[question.id])
 
         return Response({"message": "Question updated successfully"}, status=status.HTTP_200_OK)
 
     elif request.method == 'DELETE':
-        # Debug authentication
-        print(f"Delete request - User: {request.user}, Authenticated: {request.user.is_authenticated}")
-        print(f"Session key: {request.session.session_key}")
-        print(f"Session data: {dict(request.session)}")
-        
         if not request.user.is_authenticated:
-            print("User not authenticated for delete")
             return Response({"error": "Authentication required"}, status=status.HTTP_403_FORBIDDEN)
         
         question.delete()
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 @api_view(['GET'])
+@permission_classes([IsPollAdmin])
+def admin_question_batch(request: Request):
+    """
+    Admin counterpart of client_poll_batch: returns any questions (including future
+    and choiceless ones) by id, with missing ids reported inline.
+    """
+    ids, error = parse_batch_ids(request.query_params.get('ids'))
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+    questions = Question.objects.filter(id__in=ids).prefetch_related("choice_set")
+    questions_by_id = {question.id: question for question in questions}
+
+    results = [
+        QuestionAdminSchema.model_validate(questions_by_id[question_id]).model_dump()
+        for question_id in ids
+        if question_id in questions_by_id
+    ]
+    return Response({
+        'count': len(results),
+        'results': results,
+        'missing': [question_id for question_id in ids if question_id not in questions_by_id]
+    }, status=status.HTTP_200_OK)
+
+@api_view(['POST'])
+@permission_classes([IsPollAdmin])
+@csrf_exempt
+@authentication_classes([CsrfExemptSessionAuthentication])
+def admin_question_bulk(request: Request):
+    """
+    Applies one operation to many questions:
+    {"operation": "delete" | "set_pub_date" | "clear_votes", "ids": [...], "pub_date": ...}.
+    Runs as set-based SQL in batched transactions (see polls.bulk_operations) and
+    reports the outcome of every id.
+    """
+    try:
+        validated_data = BulkQuestionOperationSchema.model_validate(request.data)
+    except ValidationError as e:
+        return Response({"errors": e.errors(include_url=False, include_context=False)}, status=status.HTTP_400_BAD_REQUEST)
+
+    outcomes = apply_bulk_operation(validated_data.operation, validated_data.ids, validated_data.pub_date)
+
+    return Response({
+        'operation': validated_data.operation,
+        'counts': dict(Counter(outcomes.values())),
+        'results': [{'id': question_id, 'status': outcome} for question_id, outcome in outcomes.items()]
+    }, status=status.HTTP_200_OK)
+
+@api_view(['GET'])
+@guest_cacheable
 def admin_results_summary(request: Request):
     """
     Returns a summary of questions with their results, including vote counts and percentages.
@@ -449,58 +734,270 @@ def admin_results_summary(request: Request):
     - Guests/unauthenticated: Only published questions with choices
     - Authenticated users: Only published questions with choices
     - Admins: All questions (including unpublished and choiceless)
+
+    Results are read from the materialized QuestionResult rows (see polls.results),
+    and cached per audience: a changed catalog or vote count, or an expired entry,
+    is rebuilt by one worker while the others keep serving the previous summary.
+
+    So that clients can fetch only what they show:
+    - ?page_size=N returns the first N questions and a `next_cursor`, to pass as
+      ?cursor=... for the next page (null on the last page). Pages are read by keyset,
+      so each one costs the same whatever its position and the size of the catalog.
+    - ?collapsed=true leaves out the choices, adding a `choice_count` per question.
+    - ?expand=choices&ids=1,2,3 returns the choices of the given (visible) questions only.
+    - ?since=<version> returns only the questions that changed after that version
+      (counts, text, choices or visibility) and the ids of those that were `removed`,
+      with the `version` to pass next time. Every summary response includes its version.
+      `reset: true` means the version is too old: the response holds the full summary.
+
+    While the poll is closed, the full summary is served from the frozen results
+    (see polls.frozen); the public one is also available, cacheable forever, at
+    its content-addressed URL (frozen_results_summary).
     """
-    # Check if user is admin
-    is_admin = False
-    if request.user.is_authenticated:
+    # Users without a profile are treated as regular users
+    is_admin = get_admin_status(request).is_admin
+    params = request.query_params
+
+    if not params:
+        frozen = get_frozen_results(build_frozen_snapshot)
+        if frozen:
+            digest, snapshot = frozen
+            audience = 'admin' if is_admin else 'public'
+            response = frozen_response(request, snapshot['summaries'][audience], f'{audience}-{digest}')
+            if not is_admin:
+                frozen_url = reverse('polls:frozen_results_summary', args=[digest])
+                response['Link'] = f'<{frozen_url}>; rel="alternate"'
+            return response
+
+    if 'since' in params:
         try:
-            # Query profile from DB to get latest values (avoid stale cache)
-            profile = UserProfile.objects.get(user=request.user)
-            is_admin = profile.is_admin
-        except UserProfile.DoesNotExist:
-            # User is authenticated but has no profile - treat as regular user
-            is_admin = False
-    
+            since = int(params['since'])
+        except ValueError:
+            since = None
+        # Versions are nanosecond timestamps in 64-bit columns: anything larger can't be one
+        if since is None or since >= 2**63:
+            return Response({"error": "'since' must be a version number"}, status=status.HTTP_400_BAD_REQUEST)
+        version = time.time_ns()
+        visible = None if is_admin else Q(pub_date__lte=timezone.now(), choice_count__gt=0)
+        changes = changed_results(get_ordered_results(is_admin), since, visible)
+        if changes is None:
+            return Response({**get_results_summary(is_admin), 'reset': True}, status=status.HTTP_200_OK)
+        changed, removed_ids = changes
+        return Response({
+            'version': version,
+            'reset': False,
+            'questions_results': [serialize_result(result) for result in changed],
+            'removed': removed_ids,
+        }, status=status.HTTP_200_OK)
+
+    if 'expand' in params:
+        if params['expand'] != 'choices':
+            return Response({"error": "Only 'expand=choices' is supported"}, status=status.HTTP_400_BAD_REQUEST)
+        question_ids, error = parse_batch_ids(params.get('ids'))
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        results = get_ordered_results(is_admin).filter(question_id__in=question_ids)
+        return Response({
+            'questions_results': [
+                {'id': result.question_id, 'total_votes': result.total_votes, 'choices': serialize_choices(result)}
+                for result in results
+            ]
+        }, status=status.HTTP_200_OK)
+
+    collapsed = params.get('collapsed') == 'true'
+    if 'cursor' not in params and 'page_size' not in params:
+        if collapsed:
+            results = get_ordered_results(is_admin).defer('choices')
+            return Response({
+                'total_questions': len(results),
+                'total_votes_all_questions': sum(result.total_votes for result in results),
+                'questions_results': [serialize_result(result, collapsed=True) for result in results],
+            }, status=status.HTTP_200_OK)
+        summary = get_results_summary(is_admin)
+        return Response(summary, status=status.HTTP_200_OK)
+
+    try:
+        page_size = min(int(params.get('page_size', SUMMARY_PAGE_SIZE)), MAX_SUMMARY_PAGE_SIZE)
+    except ValueError:
+        page_size = SUMMARY_PAGE_SIZE
+    if page_size <= 0:
+        page_size = SUMMARY_PAGE_SIZE
+
+    results = get_ordered_results(is_admin)
+    if collapsed:
+        results = results.defer('choices')
+    if params.get('cursor'):
+        try:
+            results = results.filter(summary_cursor_filter(is_admin, decode_cursor(params['cursor'])))
+        except ValueError:
+            return Response({"error": "Invalid cursor"}, status=status.HTTP_400_BAD_REQUEST)
+
+    page = list(results[:page_size + 1])
+    next_cursor = None
+    if len(page) > page_size:
+        page = page[:page_size]
+        next_cursor = encode_cursor(summary_cursor_position(is_admin, page[-1]))
+    return Response({
+        'questions_results': [serialize_result(result, collapsed) for result in page],
+        'next_cursor': next_cursor,
+    }, status=status.HTTP_200_OK)
+
+
+def build_frozen_snapshot():
+    """Everything the results endpoints serve while the poll is closed (see polls.frozen)."""
+    summaries = {}
+    for audience, is_admin in (('admin', True), ('public', False)):
+        summary = compute_results_summary(is_admin)
+        # Per-computation, so left out to keep the content (and digest) of the same results stable
+        del summary['version']
+        summaries[audience] = summary
+    questions = get_ordered_questions_for_client().prefetch_related('choice_set')
+    return {
+        'summaries': summaries,
+        'questions': [serialize_question_with_choices(question).model_dump() for question in questions],
+    }
+
+
+@api_view(['GET'])
+def frozen_results_summary(request: Request, digest):
+    """
+    The public results summary of a closed poll, by the digest of its frozen
+    snapshot: its content never changes, so it may be cached forever.
+    404 once the poll is reopened (or the results are frozen again).
+    """
+    snapshot = get_snapshot(digest, build_frozen_snapshot)
+    if snapshot is None:
+        return Response({"error": "No such frozen results"}, status=status.HTTP_404_NOT_FOUND)
+    return immutable_response(snapshot['summaries']['public'], digest)
+
+
+def get_ordered_results(is_admin):
+    # Admins see everything; guests and regular users only published questions with choices
+    return get_ordered_results_for_admin() if is_admin else get_ordered_results_for_client()
+
+
+def summary_cursor_position(is_admin, result):
+    # The sort key of a row (see get_ordered_results_for_admin/_for_client)
+    position = [result.pub_date.isoformat(), result.question_id]
+    return [result.bucket] + position if is_admin else position
+
+
+def summary_cursor_filter(is_admin, position):
+    """Q() of the rows after `position` in the summary order. Raises ValueError for a malformed position."""
+    if len(position) != (3 if is_admin else 2):
+        raise ValueError("Cursor doesn't match this summary")
+    *bucket, pub_date, question_id = position
+    try:
+        pub_date = datetime.datetime.fromisoformat(pub_date)
+        question_id = int(question_id)
+        bucket = [int(value) for value in bucket]
+    except TypeError as e:
+        raise ValueError("Malformed cursor") from e
+    after = Q(pub_date__gt=pub_date) | Q(pub_date=pub_date, question_id__gt=question_id)
     if is_admin:
-        # Admins see everything with standardized ordering
-        ordered_questions = get_ordered_questions_for_admin()
-        questions = (
-            list(ordered_questions['published']) +
-            list(ordered_questions['future_with_choices']) +
-            list(ordered_questions['choiceless']) +
-            list(ordered_questions['future_choiceless'])
+        after = Q(bucket__gt=bucket[0]) | Q(after, bucket=bucket[0])
+    return after
+
+
+def encode_cursor(position):
+    return base64.urlsafe_b64encode(json.dumps(position).encode()).decode()
+
+
+def decode_cursor(cursor):
+    try:
+        position = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (ValueError, TypeError) as e:
+        raise ValueError("Malformed cursor") from e
+    if isinstance(position, list):
+        return position
+    raise ValueError("Malformed cursor")
+
+
+def get_results_summary(is_admin):
+    return get_or_refresh(
+        f"polls:results-summary:{'admin' if is_admin else 'public'}",
+        lambda: compute_results_summary(is_admin),
+        timeout=settings.RESULTS_SUMMARY_CACHE_TIMEOUT,
+        stale_timeout=settings.RESULTS_SUMMARY_STALE_TIMEOUT,
+        version=(get_version(CATALOG), get_version(VOTES)),
+    )
+
+
+def compute_results_summary(is_admin):
+    # Taken before reading, so changes made meanwhile are reported after this version
+    version = time.time_ns()
+    return {**build_results_summary(get_ordered_results(is_admin)), 'version': version}
+
+
+def format_event(event, data):
+    return f"event: {event}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+async def stream_results(is_admin):
+    async with get_broker().subscribe(RESULTS_CHANNEL) as subscription:
+        # Subscribed before the snapshot is read, so no change in between is missed
+        yield format_event('snapshot', await sync_to_async(get_results_summary)(is_admin))
+        while True:
+            message = await subscription.get(timeout=settings.RESULTS_STREAM_HEARTBEAT)
+            if subscription.overflowed:
+                # Too slow to keep up with the changes: start over from a snapshot
+                subscription.reset()
+                yield format_event('snapshot', await sync_to_async(get_results_summary)(is_admin))
+                continue
+            if message is None:
+                # Keeps proxies from closing an idle connection
+                yield ": keep-alive\n\n"
+                continue
+
+            questions = message['questions']
+            if not is_admin:
+                now = timezone.now()
+                questions = [q for q in questions if q['pub_date'] <= now and q['choices']]
+            if questions:
+                yield format_event('results', {
+                    'questions': [
+                        {'id': q['id'], 'total_votes': q['total_votes'], 'choices': q['choices']} for q in questions
+                    ]
+                })
+
+
+@require_GET
+async def results_stream(request):
+    """
+    Streams live results as Server-Sent Events.
+
+    The stream starts with a `snapshot` event, holding the results summary of the
+    viewer's audience (see admin_results_summary). Each time votes change, a
+    `results` event follows with the new total and per-choice votes and percentages
+    of the questions that changed:
+        {"questions": [{"id": 1, "total_votes": 3, "choices": [{"id": 2, "votes": 1, "percentage": 33.3}]}]}
+    Changes are read once and fanned out by the pub/sub broker (polls.pubsub), so
+    open viewers cost no database queries between changes.
+
+    Needs an ASGI server: a WSGI worker would buffer the endless stream while
+    holding the worker, so it answers 501 there and clients poll the summary (?since=).
+    """
+    if not isinstance(request, ASGIRequest):
+        return JsonResponse(
+            {"error": "Live results need the ASGI server; poll the results summary with ?since= instead"},
+            status=501
         )
-    else:
-        # Guests and regular users only see published questions with standardized ordering
-        questions = list(get_ordered_questions_for_client())
-    
-    serialized_summary = ResultsSummarySchema.model_validate(list(questions))
-    
-    return Response(serialized_summary.model_dump(), status=status.HTTP_200_OK)
+    is_admin = (await sync_to_async(get_admin_status)(request)).is_admin
+    response = StreamingHttpResponse(stream_results(is_admin), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    # Disables response buffering in nginx
+    response['X-Accel-Buffering'] = 'no'
+    return response
 
 
 @api_view(['GET', 'POST', 'DELETE'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsMainPollAdmin])
 @csrf_exempt
 @authentication_classes([CsrfExemptSessionAuthentication])
 def admin_user_management(request: Request):
     """Manage admin users - only main admin can add/remove admins"""
-    if not request.user.is_authenticated:
-        return Response({'error': 'Authentication required'}, status=401)
-    
-    try:
-        profile = request.user.userprofile
-        if not profile.is_admin:
-            return Response({'error': 'Admin access required'}, status=403)
-        
-        # Check if user is main admin
-        main_admin_email = AdminUserManagement.get_main_admin_email()
-        if profile.google_email != main_admin_email:
-            return Response({'error': 'Main admin access required'}, status=403)
-            
-    except UserProfile.DoesNotExist:
-        return Response({'error': 'Admin access required'}, status=403)
-    
+    main_admin_email = AdminUserManagement.get_main_admin_email()
+
     if request.method == 'GET':
         # Get all admin users
         admin_users = UserProfile.objects.filter(is_admin=True).values(
@@ -530,7 +1027,7 @@ def admin_user_management(request: Request):
             return Response({'error': 'Cannot remove main admin'}, status=400)
         
         # Additional check: prevent main admin from removing themselves
-        if email == profile.google_email:
+        if email == get_admin_status(request).google_email:
             return Response({'error': 'Main admin cannot remove their own privileges'}, status=400)
         
         try:
@@ -544,6 +1041,8 @@ def admin_user_management(request: Request):
 
 
 @api_view(['GET', 'POST', 'DELETE'])
+@guest_cacheable
+@permission_classes([IsMainPollAdminOrReadOnly])
 @csrf_exempt
 @authentication_classes([CsrfExemptSessionAuthentication])
 def poll_closure(request: Request):
@@ -560,27 +1059,17 @@ def poll_closure(request: Request):
             'closed_by': status.closed_by.email if status and status.closed_by else None
         })
     
-    # For POST and DELETE, require authentication and main admin access
-    if not request.user.is_authenticated:
-        return Response({'error': 'Authentication required'}, status=401)
-    
-    try:
-        profile = request.user.userprofile
-        if not profile.is_admin:
-            return Response({'error': 'Admin access required'}, status=403)
-        
-        # Check if user is main admin
-        main_admin_email = AdminUserManagement.get_main_admin_email()
-        if profile.google_email != main_admin_email:
-            return Response({'error': 'Main admin access required'}, status=403)
-            
-    except UserProfile.DoesNotExist:
-        return Response({'error': 'Admin access required'}, status=403)
-    
+    # POST and DELETE are limited to the main admin by IsMainPollAdminOrReadOnly
     if request.method == 'POST':
         # Close the poll
-        status = PollStatus.close_poll(request.user)
+        with transaction.atomic():
+            status = PollStatus.close_poll(request.user)
+        # Votes in flight when the poll closed have committed by now or will discard
+        # this snapshot when they do (see polls.signals). Frozen directly rather than
+        # through the pointer, which a concurrent reader may have set back to OPEN.
+        digest = freeze(build_frozen_snapshot())
         return Response({
+            'results_digest': digest,
             'message': 'Poll closed successfully',
             'closed_at': status.closed_at,
             'closed_by': request.user.email
@@ -588,7 +1077,9 @@ def poll_closure(request: Request):
     
     elif request.method == 'DELETE':
         # Reopen the poll
-        status = PollStatus.reopen_poll(request.user)
+        with transaction.atomic():
+            status = PollStatus.reopen_poll(request.user)
+        mark_open()
         return Response({
             'message': 'Poll reopened successfully',
             'reopened_at': timezone.now(),
@@ -684,8 +1175,6 @@ def simple_logout(request: Request):
     Simple logout test endpoint - clears everything aggressively.
     """
     try:
-        print("Simple logout called")
-        
         # Clear everything
         request.session.flush()
         
@@ -696,10 +1185,9 @@ def simple_logout(request: Request):
         for key in list(request.session.keys()):
             del request.session[key]
         
-        print("Simple logout completed")
         return Response({"message": "Simple logout successful"}, status=status.HTTP_200_OK)
     except Exception as e:
-        print(f"Simple logout error: {str(e)}")
+        logger.exception("Simple logout failed")
         return Response({"error": f"Simple logout failed: {str(e)}"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
 
@@ -757,99 +1245,300 @@ def fix_user_profile(request: Request):
 def user_info(request: Request):
     """
     Get current user information for the home page.
-    Returns user details, admin status, and voting status.
+    Returns user details, admin status, and voting status (cached per user, see polls.user_info).
     Also ensures CSRF cookie is sent for subsequent POST requests.
     """
-    # Debug logging
-    print(f"User info request - User: {request.user}, Authenticated: {request.user.is_authenticated}")
-    print(f"Session key: {request.session.session_key}")
-    print(f"Session data: {dict(request.session)}")
-    
+    # Debug logging; the session is only read when it is enabled
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug(
+            "User info request - User: %s, Authenticated: %s, Session key: %s, Session data: %s",
+            request.user, request.user.is_authenticated, request.session.session_key, dict(request.session)
+        )
+
     if request.user.is_authenticated:
-        try:
-            profile = request.user.userprofile
-            main_admin_email = AdminUserManagement.get_main_admin_email()
-            print(f"User profile found: {profile.google_email}")
-            print(f"User is_admin flag: {profile.is_admin}")
-            print(f"Main admin email from env: {main_admin_email}")
-            print(f"Match: {profile.google_email == main_admin_email}")
-            
-            return Response({
-                'authenticated': True,
-                'email': profile.google_email,
-                'name': profile.google_name,
-                'is_admin': profile.is_admin,
-                'has_voted': has_user_voted(request.user)
-            })
-        except UserProfile.DoesNotExist:
-            print(f"UserProfile not found for user: {request.user.username}")
-            # Fallback for users without profiles (shouldn't happen in OAuth flow)
-            return Response({
-                'authenticated': True,
-                'email': request.user.email,
-                'name': request.user.username,
-                'is_admin': False,
-                'has_voted': False
-            })
-    print("User not authenticated")
+        return Response(get_user_info(request.user))
     return Response({'authenticated': False})
 
 
-def has_user_voted(user):
-    """
-    Check if user has voted on any poll.
-    This is used by the user_info endpoint and home page logic.
-    """
-    return UserVote.objects.filter(user=user).exists()
-
-
 @api_view(['GET'])
-@permission_classes([IsAuthenticated])
+@permission_classes([IsPollAdmin])
 def admin_stats(request: Request):
     """
     Get admin statistics for the admin dashboard.
     Returns comprehensive statistics including voter counts and hidden questions.
+    The figures are cached until the catalog or the votes change (see compute_admin_stats).
+    total_voters is estimated from a HyperLogLog sketch (counting everyone who has voted);
+    ?exact=true counts the distinct voters of the current ballots instead.
+    """
+    exact = request.query_params.get('exact') == 'true'
+    cache_key = versioned_cache_key('admin-stats-exact' if exact else 'admin-stats', CATALOG, VOTES)
+    stats = cache.get(cache_key)
+    if stats is None:
+        stats, timeout = compute_admin_stats(exact)
+        cache.set(cache_key, stats, timeout)
+    return Response(stats)
+
+
+def compute_admin_stats(exact=False):
+    """
+    Computes the admin_stats figures with one aggregate over questions and one over ballots.
+    Returns (stats, timeout): the snapshot must also expire when the next scheduled
+    question is published, since that changes the figures without any write.
     """
-    try:
-        profile = request.user.userprofile
-        if not profile.is_admin:
-            return Response({'error': 'Admin access required'}, status=403)
-    except UserProfile.DoesNotExist:
-        return Response({'error': 'Admin access required'}, status=403)
-    
-    # Calculate statistics
     now = timezone.now()
-    total_voters = UserVote.objects.values('user').distinct().count()
-    total_votes = UserVote.objects.count()
-    total_questions = Question.objects.count()
-
-    # Hidden questions breakdown (avoid double-counting overlaps)
-    unpublished_questions = Question.objects.filter(pub_date__gt=now).count()
-    choiceless_questions = Question.objects.filter(choice__isnull=True).distinct().count()
-    unpublished_choiceless = Question.objects.filter(
-        pub_date__gt=now,
-        choice__isnull=True
-    ).distinct().count()
+    choiceless = Q(has_choices=False)
+    unpublished = Q(pub_date__gt=now)
+    question_counts = Question.objects.annotate(
+        has_choices=Exists(Choice.objects.filter(question=OuterRef('pk')))
+    ).aggregate(
+        total_questions=Count('id'),
+        unpublished=Count('id', filter=unpublished),
+        choiceless=Count('id', filter=choiceless),
+        unpublished_choiceless=Count('id', filter=unpublished & choiceless),
+        next_publication=Min('pub_date', filter=unpublished),
+    )
+    if exact:
+        vote_counts = UserVote.objects.aggregate(
+            total_votes=Count('id'),
+            total_voters=Count('user', distinct=True),
+        )
+    else:
+        vote_counts = UserVote.objects.aggregate(total_votes=Count('id'))
+        vote_counts['total_voters'] = estimate_voters([GLOBAL_SKETCH_KEY])
 
     # Union size: |A ∪ B| = |A| + |B| - |A ∩ B|
-    hidden_total = unpublished_questions + choiceless_questions - unpublished_choiceless
-    hidden_total = max(hidden_total, 0)
+    hidden_total = (
+        question_counts['unpublished'] + question_counts['choiceless'] - question_counts['unpublished_choiceless']
+    )
+    stats = {
+        'total_voters': vote_counts['total_voters'],
+        'total_voters_approximate': not exact,
+        'total_votes': vote_counts['total_votes'],
+        'total_questions': question_counts['total_questions'],
+        # Visible to clients = published with choices
+        'visible_to_clients': question_counts['total_questions'] - hidden_total,
+        'hidden_questions': {
+            'unpublished': question_counts['unpublished'],
+            'choiceless': question_counts['choiceless'],
+            'unpublished_choiceless': question_counts['unpublished_choiceless'],
+            'total': hidden_total
+        }
+    }
+
+    timeout = settings.ADMIN_STATS_CACHE_TIMEOUT
+    if question_counts['next_publication'] is not None:
+        until_publication = (question_counts['next_publication'] - now).total_seconds()
+        timeout = max(1, min(timeout, int(until_publication) + 1))
+    return stats, timeout
+
+
+@api_view(['GET'])
+@permission_classes([IsPollAdmin])
+def admin_voter_counts(request: Request):
+    """
+    Distinct voter counts, overall and optionally per question (?questions=1,2,3) and
+    per day over a date range (?from=YYYY-MM-DD&to=YYYY-MM-DD, both inclusive).
+    Counts are HyperLogLog estimates read from stored sketches (see polls.hll);
+    ?exact=true counts them from the ballots instead.
+    """
+    exact = request.query_params.get('exact') == 'true'
+
+    question_ids = []
+    if request.query_params.get('questions'):
+        question_ids, error = parse_batch_ids(request.query_params['questions'])
+        if error:
+            return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+    days = []
+    if request.query_params.get('from') or request.query_params.get('to'):
+        try:
+            first_day = datetime.date.fromisoformat(request.query_params.get('from', ''))
+            last_day = datetime.date.fromisoformat(request.query_params.get('to', ''))
+        except ValueError:
+            return Response({"error": "'from' and 'to' must both be YYYY-MM-DD dates"}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= (last_day - first_day).days < MAX_VOTER_COUNT_DAYS:
+            return Response(
+                {"error": f"The date range must be ordered and span at most {MAX_VOTER_COUNT_DAYS} days"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        days = [first_day + datetime.timedelta(days=offset) for offset in range((last_day - first_day).days + 1)]
+
+    response_data = {'approximate': not exact}
+    if exact:
+        response_data['total_voters'] = UserVote.objects.values('user').distinct().count()
+        per_question = dict(
+            UserVote.objects.filter(question_id__in=question_ids)
+            .values('question').annotate(voters=Count('user', distinct=True)).values_list('question', 'voters')
+        )
+        ballots_in_range = (
+            UserVote.objects.filter(voted_at__date__range=(days[0], days[-1])) if days else UserVote.objects.none()
+        )
+        per_day = dict(
+            ballots_in_range.annotate(day=TruncDate('voted_at')).values('day')
+            .annotate(voters=Count('user', distinct=True)).values_list('day', 'voters')
+        )
+        range_voters = ballots_in_range.values('user').distinct().count()
+    else:
+        sketches = load_sketches(
+            [GLOBAL_SKETCH_KEY]
+            + [question_sketch_key(question_id) for question_id in question_ids]
+            + [day_sketch_key(day) for day in days]
+        )
+        response_data['total_voters'] = sketches[GLOBAL_SKETCH_KEY].count()
+        per_question = {question_id: sketches[question_sketch_key(question_id)].count() for question_id in question_ids}
+        per_day = {day: sketches[day_sketch_key(day)].count() for day in days}
+        # Sketches merge losslessly, so the union over the range is estimated as well
+        range_voters = estimate_voters([day_sketch_key(day) for day in days]) if days else None
+
+    if question_ids:
+        response_data['questions'] = {question_id: per_question.get(question_id, 0) for question_id in question_ids}
+    if days:
+        response_data['days'] = [{'day': day, 'voters': per_day.get(day, 0)} for day in days]
+        response_data['voters_in_range'] = range_voters
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsPollAdmin])
+def admin_vote_history(request: Request):
+    """
+    Vote history of some questions (?questions=1,2,3) for charts: the net change in
+    each choice's votes per time bucket (?resolution=minute|hour|day, default hour),
+    between ?from and ?to (ISO dates or datetimes; default: the last 24 hours).
+    Read from the VoteBucket time series (see polls.history); buckets older than
+    the retention of the requested resolution are returned at their coarser one.
+    """
+    question_ids, error = parse_batch_ids(request.query_params.get('questions'))
+    if error:
+        return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+
+    resolution = request.query_params.get('resolution', 'hour')
+    if resolution not in RESOLUTIONS:
+        return Response(
+            {"error": f"'resolution' must be one of: {', '.join(RESOLUTIONS)}"}, status=status.HTTP_400_BAD_REQUEST
+        )
 
-    # Visible to clients = published with choices
-    visible_to_clients = Question.objects.filter(pub_date__lte=now, choice__isnull=False).distinct().count()
+    try:
+        end = parse_moment(request.query_params.get('to')) or timezone.now()
+        start = parse_moment(request.query_params.get('from')) or end - datetime.timedelta(days=1)
+    except ValueError:
+        return Response({"error": "'from' and 'to' must be ISO dates or datetimes"}, status=status.HTTP_400_BAD_REQUEST)
+    if not start < end:
+        return Response({"error": "'from' must be before 'to'"}, status=status.HTTP_400_BAD_REQUEST)
+    if (end - start) / RESOLUTION_LENGTHS[resolution] > MAX_HISTORY_BUCKETS:
+        return Response(
+            {"error": f"At most {MAX_HISTORY_BUCKETS} buckets can be requested; use a coarser resolution"},
+            status=status.HTTP_400_BAD_REQUEST
+        )
 
+    series = vote_history(question_ids, start, end, resolution)
     return Response({
-        'total_voters': total_voters,
-        'total_votes': total_votes,
-        'total_questions': total_questions,
-        'visible_to_clients': visible_to_clients,
-        'hidden_questions': {
-            'unpublished': unpublished_questions,
-            'choiceless': choiceless_questions,
-            'unpublished_choiceless': unpublished_choiceless,
-            'total': hidden_total
+        'resolution': resolution,
+        'from': start,
+        'to': end,
+        'series': [
+            {
+                'question_id': question_id,
+                'choice_id': choice_id,
+                'buckets': [{'start': bucket_start, 'votes': votes} for bucket_start, votes in buckets],
+            }
+            for (question_id, choice_id), buckets in series.items()
+        ],
+    }, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsPollAdmin])
+def admin_crosstab(request: Request):
+    """
+    Cross-tabulates the ballots of two questions (?q1=1&q2=2): counts[i][j] is the
+    number of voters who chose the i-th choice of q1 and the j-th choice of q2, and
+    row_percentages[i][j] their share of the voters who chose the i-th choice of q1
+    (among those who answered both).
+    ?pairs=all does so for every pair of ?questions=1,2,3 (default: every question
+    with choices, up to MAX_CROSSTAB_QUESTIONS).
+    Computed in memory from the ballot matrix (see polls.analytics).
+    """
+    matrix = get_ballot_matrix()
+
+    if request.query_params.get('pairs') == 'all':
+        if request.query_params.get('questions'):
+            question_ids, error = parse_batch_ids(request.query_params['questions'])
+            if error:
+                return Response({"error": error}, status=status.HTTP_400_BAD_REQUEST)
+        else:
+            question_ids = sorted(matrix.choices)
+        if len(question_ids) > MAX_CROSSTAB_QUESTIONS:
+            return Response(
+                {"error": f"At most {MAX_CROSSTAB_QUESTIONS} questions can be cross-tabulated at once"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+    else:
+        try:
+            question_ids = [int(request.query_params['q1']), int(request.query_params['q2'])]
+        except (KeyError, ValueError):
+            return Response(
+                {"error": "Query parameters 'q1' and 'q2' (question ids) are required"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+    missing = [question_id for question_id in question_ids if question_id not in matrix.choices]
+    if missing:
+        return Response({"error": f"Questions not found or without choices: {missing}"}, status=status.HTTP_404_NOT_FOUND)
+
+    response_data = {'questions': {question_id: matrix.choices[question_id] for question_id in question_ids}}
+    if request.query_params.get('pairs') == 'all':
+        response_data['pairs'] = [describe_crosstab(*crosstab) for crosstab in matrix.all_crosstabs(question_ids)]
+    else:
+        response_data.update(describe_crosstab(*question_ids, matrix.crosstab(*question_ids)))
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+@api_view(['GET'])
+@permission_classes([IsPollAdmin])
+def admin_segment(request: Request):
+    """
+    Counts a segment of voters: those who chose every choice in ?chose=1,2, answered
+    every question in ?answered=3,4 and none of the questions in ?skipped=5 (any
+    combination, at least one). ?breakdown=<question id> also counts how the segment
+    voted on that question. Computed on the voter bitmaps (see polls.bitmaps).
+    """
+    criteria = {}
+    for name in ('chose', 'answered', 'skipped'):
+        criteria[name] = []
+        if request.query_params.get(name):
+            criteria[name], error = parse_batch_ids(request.query_params[name])
+            if error:
+                return Response({"error": f"'{name}': {error}"}, status=status.HTTP_400_BAD_REQUEST)
+    if not any(criteria.values()):
+        return Response(
+            {"error": "At least one of 'chose', 'answered' or 'skipped' is required"}, status=status.HTTP_400_BAD_REQUEST
+        )
+    try:
+        breakdown_id = int(request.query_params['breakdown']) if request.query_params.get('breakdown') else None
+    except ValueError:
+        return Response({"error": "'breakdown' must be a question id"}, status=status.HTTP_400_BAD_REQUEST)
+
+    segment = segment_bitmap(**criteria)
+    response_data = {**criteria, 'voters': segment.bit_count()}
+    if breakdown_id is not None:
+        choice_ids = question_choice_ids([breakdown_id])[breakdown_id]
+        bitmaps = load_bitmaps(choice_ids)
+        response_data['breakdown'] = {
+            'question_id': breakdown_id,
+            'choices': [
+                {'id': choice_id, 'voters': (segment & bitmaps.get(choice_id, 0)).bit_count()} for choice_id in choice_ids
+            ],
         }
-    })
+    return Response(response_data, status=status.HTTP_200_OK)
+
+
+def parse_moment(value):
+    """Parses an ISO date or datetime query parameter; naive values are in the current time zone."""
+    if not value:
+        return None
+    moment = datetime.datetime.fromisoformat(value)
+    return timezone.make_aware(moment) if timezone.is_naive(moment) else moment
 
 
 @csrf_exempt
@@ -861,10 +1550,12 @@ def logout_view(request: Request):
     CSRF exempt because user is already authenticated.
     """
     try:
-        # Debug logging
-        print(f"Logout request - User: {request.user}, Authenticated: {request.user.is_authenticated}")
-        print(f"Session key before: {request.session.session_key}")
-        print(f"Session data before: {dict(request.session)}")
+        # Debug logging; the session is only read when it is enabled
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(
+                "Logout request - User: %s, Authenticated: %s, Session key: %s",
+                request.user, request.user.is_authenticated, request.session.session_key
+            )
         
         # Check if user is authenticated
         if not request.user.is_authenticated:
@@ -880,12 +1571,9 @@ def logout_view(request: Request):
         for key in list(request.session.keys()):
             del request.session[key]
         
-        print(f"Session key after: {request.session.session_key}")
-        print(f"Session data after: {dict(request.session)}")
-        print("Logout successful")
         return Response({"message": "Logout successful"}, status=status.HTTP_200_OK)
-    except Exception as e:
-        print(f"Logout error: {str(e)}")
+    except Exception:
+        logger.exception("Logout failed")
         return Response({"error": "Logout failed"}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
     
     